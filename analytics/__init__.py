@@ -0,0 +1,5 @@
+"""
+MODUS Trading Dashboard - Analytics
+NumPy engines behind the data-driven parts of the user guides. Everything
+here works on whole (symbol, day) arrays at once; nothing loops per bar
+"""
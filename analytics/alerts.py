@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Price Alert Engine
+Evaluates the dashboard's price alerts (above, below, equals) server-side
+against a stream of ticks, so they fire without a browser tab open
+
+Prices are fixed-point integers in units of 1/PRICE_SCALE dollar, and each
+condition keeps one sorted array of (symbol << PRICE_BITS | target) keys
+covering every symbol. As in the dashboard an alert fires when its
+condition becomes true, not while it stays true, and re-arms once it is
+false again. So a tick that moves a symbol from p0 to p1 fires exactly the
+above-alerts with targets in [p0, p1), the below-alerts in (p1, p0] and the
+equals-alerts whose 0.1% band p1 entered. Each is a contiguous run of the
+sorted keys found with two binary searches, whatever the number of alerts.
+
+Ticks are processed in batches: the batch is grouped by symbol (keeping
+time order within a symbol), every tick gets its symbol's previous price,
+and the searches for all ticks of all symbols are single np.searchsorted
+calls.
+
+Usage:
+    python -m analytics.alerts                               # 1M alerts, 2M synthetic ticks
+    python -m analytics.alerts --write-ticks ticks.npz --ticks 5000000
+    python -m analytics.alerts --replay ticks.npz --alerts 2000000
+"""
+
+import argparse
+import functools
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from analytics.fixtures import _rng
+
+ABOVE, BELOW, EQUALS = 0, 1, 2
+KINDS = (ABOVE, BELOW, EQUALS)
+# Dashboard condition names -> kind
+CONDITIONS = {
+    'above': ABOVE, 'crosses_above': ABOVE,
+    'below': BELOW, 'crosses_below': BELOW,
+    'equals': EQUALS,
+}
+CONDITION_NAMES = ('above', 'below', 'equals')
+
+# 1/10000 dollar, the finest US equity tick size
+PRICE_SCALE = 10_000
+PRICE_BITS = 40
+MAX_PRICE = (1 << PRICE_BITS) - 1
+# Last-price placeholder for a symbol that has not ticked yet
+UNKNOWN = -1
+
+BATCH_TICKS = 1 << 16
+
+# Alerts that fired in a batch, in time order: tick indexes into the batch and alert ids
+Triggers = namedtuple('Triggers', 'tick alert')
+
+# Section 1: Prices and conditions
+
+def to_fixed(prices):
+    """Dollar prices as fixed-point int64"""
+    fixed = np.rint(np.asarray(prices, dtype=np.float64) * PRICE_SCALE).astype(np.int64)
+    if fixed.size and (fixed.min() < 0 or fixed.max() > MAX_PRICE):
+        raise ValueError(f"prices must be between 0 and {MAX_PRICE / PRICE_SCALE:,.0f}")
+    return fixed
+
+def equals_band(price):
+    """Targets t with |price - t| < 0.1% of t, as inclusive fixed-point bounds (empty when lo > hi)"""
+    return price * 1000 // 1001 + 1, (price * 1000 - 1) // 999
+
+def holds(kind, target, price):
+    """Whether each alert's condition is true at price"""
+    return np.select(
+        [kind == ABOVE, kind == BELOW],
+        [price > target, price < target],
+        (999 * target < 1000 * price) & (1000 * price < 1001 * target),
+    )
+
+def _expand(lo, hi):
+    """Every index in [lo[i], hi[i]) for all i, and the i each one came from"""
+    counts = np.maximum(hi - lo, 0)
+    owner = np.repeat(np.arange(len(lo)), counts)
+    starts = np.cumsum(counts) - counts
+    return np.arange(counts.sum()) - starts[owner] + lo[owner], owner
+
+# Section 2: The alert book
+
+class AlertBook:
+    """Price alerts of many symbols, each condition's thresholds in one sorted key array
+
+    Alert ids are positions in the order alerts were added. Adding and
+    removing alerts is cheapest in bulk: new alerts are merged into the
+    sorted keys before the next batch of ticks.
+    """
+
+    def __init__(self):
+        self.symbols = {}
+        self.tickers = []
+        self.last = np.empty(0, dtype=np.int64)
+        self.symbol = np.empty(0, dtype=np.int64)
+        self.kind = np.empty(0, dtype=np.int8)
+        self.target = np.empty(0, dtype=np.int64)
+        self.enabled = np.empty(0, dtype=bool)
+        self._index = {kind: (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)) for kind in KINDS}
+        self._pending = []
+        # Alerts added while their condition already held; they fire on the symbol's next tick if it still does
+        self._due = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.symbol) + sum(len(ids) for ids in self._pending)
+
+    def symbol_ids(self, tickers):
+        """Ids of tickers, registering new ones"""
+        tickers = np.atleast_1d(tickers).tolist()
+        ids = np.fromiter((self.symbols.setdefault(t, len(self.symbols)) for t in tickers),
+                          dtype=np.int64, count=len(tickers))
+        if len(self.symbols) > len(self.tickers):
+            self.tickers = list(self.symbols)
+            self.last = np.concatenate([self.last, np.full(len(self.tickers) - len(self.last), UNKNOWN)])
+        return ids
+
+    def add(self, tickers, conditions, prices):
+        """Add alerts (one or many); return their ids"""
+        tickers, conditions, prices = np.broadcast_arrays(*(np.atleast_1d(a) for a in (tickers, conditions, prices)))
+        try:
+            kind = np.fromiter((CONDITIONS[c] for c in conditions.tolist()), dtype=np.int8, count=len(conditions))
+        except KeyError as e:
+            raise ValueError(f"unknown alert condition {e.args[0]!r}") from None
+        target = to_fixed(prices)
+        start = len(self)
+        ids = np.arange(start, start + len(target))
+        self._pending.append((ids, self.symbol_ids(tickers), kind, target))
+        return ids
+
+    def remove(self, ids):
+        """Disable alerts by id and drop them from the sorted keys"""
+        self.commit()
+        ids = np.atleast_1d(ids)
+        self.enabled[ids] = False
+        for kind, (keys, alerts) in self._index.items():
+            keep = self.enabled[alerts]
+            self._index[kind] = keys[keep], alerts[keep]
+        self._due = self._due[self.enabled[self._due]]
+
+    def _keys(self, ids):
+        return (self.symbol[ids] << PRICE_BITS) | self.target[ids]
+
+    def commit(self):
+        """Merge alerts added since the last batch into the sorted keys (process does this itself)"""
+        if not self._pending:
+            return
+        ids, symbol, kind, target = (np.concatenate(parts) for parts in zip(*self._pending))
+        self._pending = []
+        self.symbol = np.concatenate([self.symbol, symbol])
+        self.kind = np.concatenate([self.kind, kind])
+        self.target = np.concatenate([self.target, target])
+        self.enabled = np.concatenate([self.enabled, np.ones(len(ids), dtype=bool)])
+        # Sort only the new keys, then insert them into each sorted index in one pass
+        for k in KINDS:
+            new = ids[kind == k]
+            new = new[np.argsort(self._keys(new), kind='stable')]
+            keys, alerts = self._index[k]
+            at = np.searchsorted(keys, self._keys(new), side='right')
+            self._index[k] = np.insert(keys, at, self._keys(new)), np.insert(alerts, at, new)
+        last = self.last[symbol]
+        self._due = np.concatenate([self._due, ids[(last != UNKNOWN) & holds(kind, target, last)]])
+
+    # Section 3: Evaluating ticks
+
+    def _hits(self, kind, symbol, lo, hi, tick):
+        """Alerts of one kind with targets in [lo, hi] on each tick's symbol"""
+        keys, alerts = self._index[kind]
+        base = symbol << PRICE_BITS
+        start = np.searchsorted(keys, base | np.clip(lo, 0, MAX_PRICE), side='left')
+        end = np.searchsorted(keys, base | np.clip(hi, 0, MAX_PRICE), side='right')
+        found, owner = _expand(start, np.where(lo <= hi, end, start))
+        return tick[owner], alerts[found]
+
+    def process(self, symbol, price):
+        """Fire alerts for a batch of ticks (symbol ids and fixed-point prices, in time order)"""
+        self.commit()
+        symbol, price = np.asarray(symbol, dtype=np.int64), np.asarray(price, dtype=np.int64)
+        if not len(price):
+            return Triggers(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        tick = np.argsort(symbol, kind='stable')
+        s, p = symbol[tick], price[tick]
+        first = np.concatenate(([True], s[1:] != s[:-1]))
+        last = np.concatenate((s[1:] != s[:-1], [True]))
+        prev = np.empty_like(p)
+        prev[1:] = p[:-1]
+        prev[first] = self.last[s[first]]
+        unknown = prev == UNKNOWN
+
+        # A symbol's first tick fires whatever holds there: nothing held before it
+        band_lo, band_hi = equals_band(p)
+        prev_lo, prev_hi = equals_band(prev)
+        prev_lo, prev_hi = np.where(unknown, 1, prev_lo), np.where(unknown, 0, prev_hi)
+        hits = [
+            self._hits(ABOVE, s, np.where(unknown, 0, prev), p - 1, tick),
+            self._hits(BELOW, s, p + 1, np.where(unknown, MAX_PRICE, prev), tick),
+            # the part of the new band below and above the old one
+            self._hits(EQUALS, s, band_lo, np.minimum(band_hi, prev_lo - 1), tick),
+            self._hits(EQUALS, s, np.maximum(band_lo, prev_hi + 1), band_hi, tick),
+        ]
+
+        if len(self._due):
+            first_tick = np.full(len(self.last), -1)
+            first_tick[s[first]] = tick[first]
+            at = first_tick[self.symbol[self._due]]
+            ticked = at >= 0
+            due, at = self._due[ticked], at[ticked]
+            fire = holds(self.kind[due], self.target[due], price[at])
+            hits.append((at[fire], due[fire]))
+            self._due = self._due[~ticked]
+
+        self.last[s[last]] = p[last]
+        ticks = np.concatenate([h[0] for h in hits])
+        alerts = np.concatenate([h[1] for h in hits])
+        keep = self.enabled[alerts]
+        ticks, alerts = ticks[keep], alerts[keep]
+        order = np.lexsort((alerts, ticks))
+        return Triggers(ticks[order], alerts[order])
+
+    def describe(self, alert, price=None):
+        text = (f"{self.tickers[self.symbol[alert]]} {CONDITION_NAMES[self.kind[alert]]} "
+                f"${self.target[alert] / PRICE_SCALE:,.2f}")
+        return text if price is None else f"{text} (now ${price / PRICE_SCALE:,.2f})"
+
+def replay(book, symbol, price, batch=BATCH_TICKS):
+    """Run a whole tick stream through book in batches; return (triggers, seconds)"""
+    fired = []
+    start = time.perf_counter()
+    for i in range(0, len(price), batch):
+        triggers = book.process(symbol[i:i + batch], price[i:i + batch])
+        fired.append(Triggers(triggers.tick + i, triggers.alert))
+    elapsed = time.perf_counter() - start
+    return Triggers(*(np.concatenate(parts) for parts in zip(*fired))), elapsed
+
+# Section 4: Synthetic alerts and ticks
+
+def base_prices(tickers, seed=0):
+    """Seeded starting price of each ticker, $5 to $1,000 (read-only)"""
+    return _base_prices(tuple(tickers), seed)
+
+@functools.lru_cache(maxsize=8)
+def _base_prices(tickers, seed):
+    # One generator per ticker is slow for thousands of tickers; ticks and alerts share the result
+    prices = np.exp([_rng(seed, 'alerts', t).uniform(np.log(5), np.log(1000)) for t in tickers])
+    prices.flags.writeable = False
+    return prices
+
+def synthetic_ticks(tickers, count, seed=0):
+    """Seeded tick stream: (symbol index, dollar price) arrays in time order
+
+    Busy symbols tick more often (Zipf-like), and each symbol's price is a
+    random walk in cents from its base price.
+    """
+    rng = _rng(seed, 'ticks', len(tickers), count)
+    weights = 1 / np.arange(1, len(tickers) + 1) ** 0.8
+    symbol = rng.choice(len(tickers), size=count, p=weights / weights.sum())
+    steps = rng.normal(0, 0.0005, count)
+    order = np.argsort(symbol, kind='stable')
+    walk = np.cumsum(steps[order])
+    starts = np.flatnonzero(np.concatenate(([True], symbol[order][1:] != symbol[order][:-1])))
+    walk -= np.repeat(walk[starts] - steps[order][starts], np.diff(np.append(starts, count)))
+    price = np.empty(count)
+    price[order] = base_prices(tickers, seed)[symbol[order]] * np.exp(walk)
+    return symbol, np.round(price, 2)
+
+def synthetic_alerts(tickers, count, seed=0):
+    """Seeded alerts within 5% of each symbol's base price: (tickers, conditions, prices)"""
+    rng = _rng(seed, 'alert-book', len(tickers), count)
+    symbol = rng.integers(len(tickers), size=count)
+    conditions = rng.choice(['above', 'below', 'equals'], size=count, p=[0.45, 0.45, 0.1])
+    prices = np.round(base_prices(tickers, seed)[symbol] * rng.uniform(0.95, 1.05, count), 2)
+    return np.asarray(tickers)[symbol], conditions, prices
+
+def write_ticks(path, tickers, symbol, price):
+    np.savez(path, tickers=np.asarray(tickers), symbol=symbol.astype(np.int32), price=price)
+
+def read_ticks(path):
+    """(tickers, symbol index, dollar price) from a file written by write_ticks"""
+    with np.load(path) as data:
+        return list(data['tickers']), data['symbol'].astype(np.int64), data['price']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate price alerts against a tick stream")
+    parser.add_argument('--alerts', type=int, default=1_000_000, help="synthetic alerts (default: 1,000,000)")
+    parser.add_argument('--symbols', type=int, default=5000, help="synthetic symbols (default: 5,000)")
+    parser.add_argument('--ticks', type=int, default=2_000_000, help="synthetic ticks (default: 2,000,000)")
+    parser.add_argument('--batch', type=int, default=BATCH_TICKS, help=f"ticks per batch (default: {BATCH_TICKS})")
+    parser.add_argument('--replay', metavar='FILE', help="replay ticks from a .npz written by --write-ticks")
+    parser.add_argument('--write-ticks', metavar='FILE', help="write a synthetic tick file and exit")
+    parser.add_argument('--show', type=int, default=5, help="triggers to print (default: 5)")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        tickers, symbol, price = read_ticks(args.replay)
+    else:
+        tickers = [f"SYN{i}" for i in range(args.symbols)]
+        symbol, price = synthetic_ticks(tickers, args.ticks)
+    if args.write_ticks:
+        write_ticks(args.write_ticks, tickers, symbol, price)
+        print(f"Created: {args.write_ticks} ({len(price):,} ticks of {len(tickers):,} symbols)")
+        return 0
+
+    start = time.perf_counter()
+    book = AlertBook()
+    book.add(*synthetic_alerts(tickers, args.alerts))
+    book.symbol_ids(tickers)
+    book.commit()
+    loaded = time.perf_counter() - start
+    # Map the file's symbol indexes onto the book's ids once
+    ids = np.array([book.symbols[t] for t in tickers])[symbol]
+    fixed = to_fixed(price)
+    triggers, elapsed = replay(book, ids, fixed, args.batch)
+
+    per_symbol = np.bincount(book.symbol, minlength=len(book.tickers))
+    scanned = per_symbol[ids].sum()
+    print(f"{len(book):,} alerts on {len(tickers):,} symbols, indexed in {loaded:.2f}s")
+    print(f"{len(price):,} ticks in {elapsed:.2f}s: {len(price) / elapsed:,.0f} ticks/s, "
+          f"{scanned / elapsed:,.0f} alert checks/s equivalent, {len(triggers.alert):,} triggers")
+    for t, a in list(zip(triggers.tick, triggers.alert))[:args.show]:
+        print(f"  tick {t:>9,}  alert {a:>9,}  {book.describe(a, fixed[t])}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
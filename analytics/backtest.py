@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Strategy Backtests
+Vectorized versions of the Momentum, Mean Reversion and Breakout strategies
+offered by Backtest and the Daily Pick filters. Indicators, positions, trades
+and metrics are whole-array NumPy operations over a (symbol, day) grid, so
+thousands of symbols over years of daily bars run in seconds
+
+Positions are long-only and decided on the close: a position held at the
+close of day t earns the close-to-close return of day t+1.
+
+Usage:
+    python -m analytics.backtest                        # fixture symbols
+    python -m analytics.backtest --synthetic 3000 --years 5
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from analytics.fixtures import FIXTURE_SYMBOLS, synthetic_bars
+from analytics.indicators import lag, rolling_max, rolling_min, simple_rsi, sma
+from analytics.ohlcv import fixture_store
+
+TRADING_DAYS = 252
+
+BacktestResult = namedtuple(
+    'BacktestResult',
+    'strategy symbols days trades win_rate profit_factor max_drawdown sharpe total_return',
+)
+
+# Section 1: Strategies
+
+def hold(entries, exits):
+    """Position that opens on entry days and closes on exit days
+
+    A day with both signals ends in the position: entries win ties, as the
+    dashboard's Backtest takes an entry signal when it is flat.
+    """
+    days = np.arange(entries.shape[-1])
+    last_entry = np.maximum.accumulate(np.where(entries, days, -1), axis=-1)
+    last_exit = np.maximum.accumulate(np.where(exits, days, -1), axis=-1)
+    return (last_entry >= 0) & (last_entry >= last_exit)
+
+def momentum(bars):
+    """Trend following: long while price leads a rising 20/50-day average stack"""
+    close = bars.close
+    sma20 = sma(close, 20)
+    sma50 = sma(close, 50)
+    return (close > sma20) & (sma20 > sma50) & (close > lag(close, 20))
+
+def mean_reversion(bars):
+    """Buy dips: enter when RSI is oversold, exit once price is back at its 20-day average"""
+    close = bars.close
+    rsi = simple_rsi(close)
+    return hold(rsi < 30, (close > sma(close, 20)) | (rsi > 60))
+
+def breakout(bars):
+    """Range breaks: enter above the prior 20-day high on rising volume, exit below the prior 10-day low"""
+    close = bars.close
+    high20 = lag(rolling_max(bars.high, 20))
+    low10 = lag(rolling_min(bars.low, 10))
+    volume_surge = bars.volume > 1.2 * sma(bars.volume, 20)
+    return hold((close > high20) & volume_surge, close < low10)
+
+# Strategy key (as used by the dashboard's Backtest) -> (label, position function)
+STRATEGIES = {
+    'momentum': ("Momentum", momentum),
+    'meanreversion': ("Mean Reversion", mean_reversion),
+    'breakout': ("Breakout", breakout),
+}
+
+# Section 2: Trades and metrics
+
+def strategy_returns(close, position):
+    """Daily returns earned by holding position, zero while flat"""
+    returns = np.zeros_like(close)
+    returns[:, 1:] = np.where(position[:, :-1], close[:, 1:] / close[:, :-1] - 1, 0.0)
+    return returns
+
+def trade_returns(returns, position):
+    """(symbol index, compounded return) of every round trip, open trades marked at the last close"""
+    symbols, days = position.shape
+    edges = np.diff(position.astype(np.int8), axis=1, prepend=0, append=0)
+    entry_symbol, entry_day = np.nonzero(edges == 1)
+    _, exit_day = np.nonzero(edges == -1)
+    growth = np.zeros((symbols, days + 1))
+    np.cumsum(np.log1p(returns), axis=1, out=growth[:, 1:])
+    # Held from the close of the entry day through the close of the exit day
+    start = growth[entry_symbol, entry_day + 1]
+    end = growth[entry_symbol, np.minimum(exit_day, days - 1) + 1]
+    return entry_symbol, np.expm1(end - start)
+
+def max_drawdown(equity):
+    """Largest peak-to-trough decline of an equity curve, as a fraction of the peak"""
+    peak = np.maximum.accumulate(equity, axis=-1)
+    return np.max(1 - equity / peak, axis=-1)
+
+def sharpe_ratio(returns):
+    """Annualised Sharpe ratio of daily returns, with no risk-free rate"""
+    std = returns.std(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(std > 0, returns.mean(axis=-1) / std * np.sqrt(TRADING_DAYS), 0.0)
+
+def backtest(bars, strategy):
+    """Backtest one strategy over every symbol in bars
+
+    Capital is split equally across symbols and sits in cash while a symbol
+    is flat; drawdown, Sharpe and total return are for that combined book,
+    win rate and profit factor are over all round trips.
+    """
+    position = STRATEGIES[strategy][1](bars)
+    returns = strategy_returns(bars.close, position)
+    _, trades = trade_returns(returns, position)
+    book = returns.mean(axis=0)
+    equity = np.cumprod(1 + book)
+
+    gains = trades[trades > 0].sum()
+    losses = -trades[trades < 0].sum()
+    return BacktestResult(
+        strategy=strategy,
+        symbols=len(bars.symbols),
+        days=len(bars.dates),
+        trades=len(trades),
+        win_rate=float(np.mean(trades > 0)) if len(trades) else 0.0,
+        profit_factor=float(gains / losses) if losses else float('inf'),
+        max_drawdown=float(max_drawdown(equity)),
+        sharpe=float(sharpe_ratio(book)),
+        total_return=float(equity[-1] - 1),
+    )
+
+def run_backtests(bars, strategies=STRATEGIES):
+    """Backtest every strategy over bars"""
+    return [backtest(bars, strategy) for strategy in strategies]
+
+def print_results(results):
+    print(f"{'strategy':<16}{'trades':>8}{'win rate':>10}{'profit f.':>11}{'max dd':>9}{'sharpe':>8}{'return':>9}")
+    for r in results:
+        print(f"{STRATEGIES[r.strategy][0]:<16}{r.trades:>8}{r.win_rate:>10.1%}{r.profit_factor:>11.2f}"
+              f"{r.max_drawdown:>9.1%}{r.sharpe:>8.2f}{r.total_return:>9.1%}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the MODUS strategies over daily bars")
+    parser.add_argument('--synthetic', type=int, metavar='SYMBOLS',
+                        help="backtest this many synthetic symbols instead of the fixture files")
+    parser.add_argument('--years', type=int, default=2, help="years of synthetic bars (default: 2)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.synthetic:
+        end = np.datetime64('2026-01-01')
+        bars = synthetic_bars([f"SYN{i}" for i in range(args.synthetic)],
+                              str(end - np.timedelta64(365 * args.years, 'D')), str(end))
+    else:
+        bars = fixture_store().panel(FIXTURE_SYMBOLS)
+    loaded = time.perf_counter()
+    results = run_backtests(bars)
+    done = time.perf_counter()
+
+    print_results(results)
+    print(f"\n{len(bars.symbols)} symbols x {len(bars.dates)} days: "
+          f"load {loaded - start:.2f}s, backtest {done - loaded:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - AI Consistency Reconciler
+Offline reference for the dashboard's 5-Pass Consistency System: the same
+chart is analysed N times and the structured results are merged into one
+
+Each pass reports a trend, support and resistance levels, a setup and a
+confidence. Trend and setup are decided by confidence-weighted vote. The
+price levels of all passes are pooled, sorted and split wherever two
+neighbours are more than LEVEL_TOLERANCE apart; a cluster becomes a level
+when a majority of passes put a level in it, at the cluster's median
+price. Confidence is the winning trend's mean confidence scaled by its
+share of the vote, so a split decision reports less confidence than any
+single pass.
+
+The passes run concurrently on asyncio against a backend: StubBackend
+(seeded synthetic analyses with model-like scatter, for tests and
+benchmarks) or ApiBackend (the app's /api/analyze endpoint). Pass results
+are cached on disk by a hash of the image, prompt, backend and pass count
+for RESPONSE_TTL seconds, so re-analysing a chart returns at once, and
+concurrent requests for the same chart share one set of passes.
+
+Usage:
+    python -m analytics.consensus chart.png                  # stub backend
+    python -m analytics.consensus chart.png --api https://modus-trading.vercel.app
+    python -m analytics.consensus --bench                    # sequential vs concurrent vs cached
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.request
+from collections import namedtuple
+
+import numpy as np
+
+from analytics.fixtures import _rng
+from analytics.ohlcv import CACHE_DIR
+
+TRENDS = ('BULLISH', 'BEARISH', 'NEUTRAL')
+SETUPS = ('LONG', 'SHORT', 'WAIT')
+PASSES = 5
+
+# Levels within this fraction of their price of the next level are one cluster
+LEVEL_TOLERANCE = 0.005
+# Seconds a chart's pass results are reused
+RESPONSE_TTL = 15 * 60
+RESPONSE_CACHE_FORMAT = 1
+
+ANALYSIS_PROMPT = """***RESPOND WITH ONLY JSON. START WITH { AND END WITH }. NO OTHER TEXT.***
+
+Analyse the chart and report exactly:
+{
+  "trend": "BULLISH or BEARISH or NEUTRAL",
+  "support": [up to 3 support prices read from the price axis],
+  "resistance": [up to 3 resistance prices read from the price axis],
+  "setup": "LONG or SHORT or WAIT",
+  "confidence": 0-100
+}"""
+
+Analysis = namedtuple('Analysis', 'trend support resistance setup confidence')
+Level = namedtuple('Level', 'price passes')
+Consensus = namedtuple('Consensus', 'trend trend_agreement setup setup_agreement support resistance confidence passes')
+
+# Section 1: Pass results
+
+def _prices(value):
+    # A lone level may come back as a bare number or string rather than a list
+    if value is None or value == '':
+        return ()
+    if isinstance(value, (str, int, float)):
+        value = [value]
+    if not isinstance(value, (list, tuple)):
+        raise TypeError(f"expected a list of prices, not {type(value).__name__}")
+    return tuple(sorted(float(p) for p in value))
+
+def parse_analysis(result):
+    """Analysis from one pass's JSON text (fenced or not) or dict; ValueError if malformed"""
+    if isinstance(result, str):
+        first, last = result.find('{'), result.rfind('}')
+        if first == -1 or last < first:
+            raise ValueError("no JSON object in pass result")
+        result = json.loads(result[first:last + 1])
+    if not isinstance(result, dict):
+        raise ValueError(f"pass result is a {type(result).__name__}, not a JSON object")
+    trend = str(result.get('trend', '')).upper()
+    setup = str(result.get('setup', '')).upper()
+    if trend not in TRENDS:
+        raise ValueError(f"unknown trend {result.get('trend')!r}")
+    if setup not in SETUPS:
+        raise ValueError(f"unknown setup {result.get('setup')!r}")
+    try:
+        support = _prices(result.get('support'))
+        resistance = _prices(result.get('resistance'))
+        confidence = min(max(float(result.get('confidence', 50)), 0.0), 100.0)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"malformed pass result: {e}") from None
+    return Analysis(trend, support, resistance, setup, confidence)
+
+# Section 2: Reconciliation
+
+def vote(choices, weights, order):
+    """Winning choice by total weight and its share of all weight; ties go to the earlier choice in order"""
+    totals = dict.fromkeys(order, 0.0)
+    for choice, weight in zip(choices, weights):
+        totals[choice] += weight
+    winner = max(order, key=lambda choice: totals[choice])
+    return winner, totals[winner] / (sum(totals.values()) or 1)
+
+def cluster_levels(level_lists, quorum, tolerance=LEVEL_TOLERANCE):
+    """Levels at least quorum passes agree on, low to high
+
+    level_lists holds each pass's prices. Sorted prices are split where the
+    gap to the next one exceeds tolerance times its price; a cluster counts
+    each pass once however many of its levels fall inside.
+    """
+    sizes = [len(levels) for levels in level_lists]
+    if not sum(sizes):
+        return ()
+    prices = np.concatenate([np.asarray(levels, dtype=np.float64) for levels in level_lists])
+    owners = np.repeat(np.arange(len(level_lists)), sizes)
+    order = np.argsort(prices, kind='stable')
+    prices, owners = prices[order], owners[order]
+    breaks = np.flatnonzero(np.diff(prices) > tolerance * prices[1:]) + 1
+    levels = []
+    for cluster, passes in zip(np.split(prices, breaks), np.split(owners, breaks)):
+        agreeing = len(np.unique(passes))
+        if agreeing >= quorum:
+            levels.append(Level(round(float(np.median(cluster)), 2), agreeing))
+    return tuple(levels)
+
+def reconcile(analyses, quorum=None, tolerance=LEVEL_TOLERANCE):
+    """Merge pass results into one Consensus; quorum defaults to a majority of passes"""
+    if not analyses:
+        raise ValueError("no analyses to reconcile")
+    quorum = quorum or len(analyses) // 2 + 1
+    if not 1 <= quorum <= len(analyses):
+        raise ValueError(f"quorum must be between 1 and {len(analyses)} passes, not {quorum}")
+    weights = [max(a.confidence, 1.0) for a in analyses]
+    trend, trend_share = vote([a.trend for a in analyses], weights, TRENDS)
+    setup, setup_share = vote([a.setup for a in analyses], weights, SETUPS)
+    agreeing = [a.confidence for a in analyses if a.trend == trend]
+    return Consensus(
+        trend, round(trend_share, 3), setup, round(setup_share, 3),
+        cluster_levels([a.support for a in analyses], quorum, tolerance),
+        cluster_levels([a.resistance for a in analyses], quorum, tolerance),
+        round(sum(agreeing) / len(agreeing) * trend_share, 1),
+        len(analyses),
+    )
+
+# Section 3: Backends
+#
+# A backend has a name (part of the cache key) and an async analyze(image, prompt, index) returning
+# the pass's raw result (JSON text or a dict); index is the pass number.
+
+class StubBackend:
+    """Seeded synthetic analyses, no network
+
+    Every image has a hidden "true" reading derived from its hash; each pass
+    reports it with scatter like a model's: levels off by a fraction of a
+    percent, levels missed or invented, and now and then a different trend
+    or setup. The same image, seed and pass index always give the same
+    result.
+    """
+    def __init__(self, seed=0, latency=0.0, flip_rate=0.15, scatter=0.002):
+        self.name = f"stub:{seed}"
+        self.seed = seed
+        self.latency = latency
+        self.flip_rate = flip_rate
+        self.scatter = scatter
+        self.calls = 0
+
+    def truth(self, image):
+        rng = _rng(self.seed, 'consensus', hashlib.sha256(image).hexdigest())
+        price = float(rng.uniform(20, 500))
+        trend = TRENDS[int(rng.integers(3))]
+        steps = np.cumsum(rng.uniform(0.02, 0.05, 3))
+        return {
+            'trend': trend,
+            'support': [round(price * (1 - s), 2) for s in steps],
+            'resistance': [round(price * (1 + s), 2) for s in steps],
+            'setup': SETUPS[TRENDS.index(trend)],
+            'confidence': float(rng.uniform(60, 85)),
+        }
+
+    async def analyze(self, image, prompt, index):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        truth = self.truth(image)
+        rng = _rng(self.seed, 'consensus', hashlib.sha256(image).hexdigest(), index)
+
+        def flip(value, options):
+            return options[int(rng.integers(len(options)))] if rng.random() < self.flip_rate else value
+
+        def read(levels):
+            seen = [round(p * (1 + rng.normal(0, self.scatter)), 2) for p in levels if rng.random() > 0.1]
+            if rng.random() < 0.2:
+                seen.append(round(levels[int(rng.integers(len(levels)))] * rng.uniform(0.97, 1.03), 2))
+            return seen
+
+        result = {
+            'trend': flip(truth['trend'], TRENDS),
+            'support': read(truth['support']),
+            'resistance': read(truth['resistance']),
+            'setup': flip(truth['setup'], SETUPS),
+            'confidence': round(float(np.clip(truth['confidence'] + rng.normal(0, 8), 0, 100))),
+        }
+        return f"```json\n{json.dumps(result)}\n```"
+
+class ApiBackend:
+    """The app's /api/analyze proxy (POST image and prompt, get the model's text back)"""
+    def __init__(self, base_url, provider='anthropic', max_tokens=1500, timeout=45):
+        self.url = base_url.rstrip('/') + '/api/analyze'
+        self.name = f"api:{provider}:{self.url}"
+        self.provider = provider
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+
+    def _post(self, image, prompt):
+        media_type = 'image/png' if image.startswith(b'\x89PNG') else 'image/jpeg'
+        body = json.dumps({
+            'image': f"data:{media_type};base64,{base64.b64encode(image).decode('ascii')}",
+            'prompt': prompt,
+            'provider': self.provider,
+            'maxTokens': self.max_tokens,
+        }).encode('utf-8')
+        request = urllib.request.Request(self.url, body, {'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)['content']
+
+    async def analyze(self, image, prompt, index):
+        return await asyncio.to_thread(self._post, image, prompt)
+
+# Section 4: Response cache
+
+class ResponseCache:
+    """Parsed pass results on disk by content hash, dropped ttl seconds after they were stored"""
+
+    def __init__(self, directory=None, ttl=RESPONSE_TTL, clock=time.time):
+        self.directory = directory or os.path.join(CACHE_DIR, 'consensus')
+        self.ttl = ttl
+        self.clock = clock
+
+    def key(self, image, prompt, backend, passes):
+        digest = hashlib.sha256(repr((RESPONSE_CACHE_FORMAT, backend.name, passes, prompt)).encode('utf-8'))
+        digest.update(image)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Cached analyses for key, or None when missing, expired or malformed"""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except OSError:
+            return None
+        except ValueError:
+            entry = None
+        try:
+            if self.clock() - entry['stored'] <= self.ttl:
+                return [Analysis(a[0], tuple(a[1]), tuple(a[2]), a[3], a[4]) for a in entry['analyses']]
+        except (KeyError, TypeError, IndexError):
+            pass
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        return None
+
+    def put(self, key, analyses):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'stored': self.clock(), 'analyses': [list(a) for a in analyses]}, f)
+        os.replace(tmp_path, self._path(key))
+
+    def evict(self):
+        """Remove every expired entry; return how many were removed"""
+        removed = 0
+        now = self.clock()
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else ():
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    expired = now - json.load(f)['stored'] > self.ttl
+            except (OSError, ValueError, KeyError, TypeError):
+                expired = name.endswith('.tmp')
+            if expired:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+# Section 5: Running the passes
+
+class Reconciler:
+    """Runs N concurrent passes of a chart on a backend and reconciles them, through the cache"""
+
+    def __init__(self, backend, passes=PASSES, cache=None, prompt=ANALYSIS_PROMPT, quorum=None,
+                 tolerance=LEVEL_TOLERANCE):
+        self.backend = backend
+        self.passes = passes
+        self.cache = cache
+        self.prompt = prompt
+        self.quorum = quorum or passes // 2 + 1
+        if not 1 <= self.quorum <= passes:
+            raise ValueError(f"quorum must be between 1 and {passes} passes, not {self.quorum}")
+        self.tolerance = tolerance
+        self._running = {}
+
+    async def _run_passes(self, image):
+        results = await asyncio.gather(
+            *(self.backend.analyze(image, self.prompt, i) for i in range(self.passes)),
+            return_exceptions=True,
+        )
+        analyses, errors = [], []
+        for result in results:
+            if isinstance(result, Exception):
+                errors.append(result)
+                continue
+            try:
+                analyses.append(parse_analysis(result))
+            except ValueError as e:
+                errors.append(e)
+        if len(analyses) < self.quorum:
+            raise RuntimeError(f"only {len(analyses)} of {self.passes} passes succeeded "
+                               f"(first error: {type(errors[0]).__name__}: {errors[0]})")
+        return analyses
+
+    async def analyses(self, image):
+        """Pass results for an image and whether they came from the cache or a running request"""
+        if self.cache:
+            key = self.cache.key(image, self.prompt, self.backend, self.passes)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, True
+        else:
+            key = hashlib.sha256(image).hexdigest()
+        if key in self._running:
+            return await asyncio.shield(self._running[key]), True
+        task = self._running[key] = asyncio.ensure_future(self._run_passes(image))
+        try:
+            analyses = await task
+        finally:
+            del self._running[key]
+        if self.cache:
+            self.cache.put(key, analyses)
+        return analyses, False
+
+    async def reconcile(self, image):
+        analyses, _ = await self.analyses(image)
+        return reconcile(analyses, self.quorum, self.tolerance)
+
+def analyze_chart(image, backend=None, passes=PASSES, cache=None):
+    """Consensus of passes analyses of an image (bytes), for callers outside asyncio"""
+    reconciler = Reconciler(backend or StubBackend(), passes, cache)
+    return asyncio.run(reconciler.reconcile(image))
+
+def format_levels(levels):
+    return ', '.join(f"{level.price:,.2f} ({level.passes})" for level in levels) or "-"
+
+def print_consensus(analyses, consensus):
+    print(f"{'pass':<6}{'trend':<9}{'setup':<7}{'conf':>5}  support / resistance")
+    for i, a in enumerate(analyses, 1):
+        print(f"{i:<6}{a.trend:<9}{a.setup:<7}{a.confidence:>5.0f}  "
+              f"{', '.join(f'{p:,.2f}' for p in a.support)} / {', '.join(f'{p:,.2f}' for p in a.resistance)}")
+    print(f"\nconsensus of {consensus.passes}: {consensus.trend} ({consensus.trend_agreement:.0%} of the vote), "
+          f"{consensus.setup} ({consensus.setup_agreement:.0%}), confidence {consensus.confidence:.1f}")
+    print(f"support    {format_levels(consensus.support)}")
+    print(f"resistance {format_levels(consensus.resistance)}")
+
+async def _bench(latency, passes):
+    image = b'MODUS benchmark chart'
+    stub = StubBackend(latency=latency)
+    start = time.perf_counter()
+    for i in range(passes):
+        await stub.analyze(image, ANALYSIS_PROMPT, i)
+    sequential = time.perf_counter() - start
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        reconciler = Reconciler(stub, passes, ResponseCache(directory))
+        start = time.perf_counter()
+        await reconciler.reconcile(image)
+        concurrent = time.perf_counter() - start
+        start = time.perf_counter()
+        await reconciler.reconcile(image)
+        cached = time.perf_counter() - start
+        # Ten simultaneous requests for a new chart share one set of passes
+        calls = stub.calls
+        await asyncio.gather(*(reconciler.reconcile(b'another chart') for _ in range(10)))
+        shared = stub.calls - calls
+    print(f"{passes} passes at {latency * 1000:.0f}ms each: sequential {sequential * 1000:.0f}ms, "
+          f"concurrent {concurrent * 1000:.0f}ms, cached repeat {cached * 1000:.2f}ms")
+    print(f"10 simultaneous requests for one chart made {shared} backend calls")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run and reconcile N analysis passes of a chart image")
+    parser.add_argument('image', nargs='?', help="chart image file")
+    parser.add_argument('--passes', type=int, default=PASSES, help=f"analysis passes (default: {PASSES})")
+    parser.add_argument('--api', metavar='URL', help="use the /api/analyze endpoint at URL instead of the stub")
+    parser.add_argument('--seed', type=int, default=0, help="stub backend seed")
+    parser.add_argument('--ttl', type=float, default=RESPONSE_TTL, help="seconds to reuse cached passes")
+    parser.add_argument('--no-cache', action='store_true', help="always run the passes")
+    parser.add_argument('--evict', action='store_true', help="remove expired cache entries and exit")
+    parser.add_argument('--bench', action='store_true', help="time sequential, concurrent and cached runs")
+    parser.add_argument('--latency', type=float, default=0.2, help="stub seconds per pass for --bench")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        asyncio.run(_bench(args.latency, args.passes))
+        return 0
+    cache = None if args.no_cache else ResponseCache(ttl=args.ttl)
+    if args.evict:
+        print(f"Removed {cache.evict() if cache else 0} expired entries")
+        return 0
+    if not args.image:
+        parser.error("an image is required (or --bench / --evict)")
+    with open(args.image, 'rb') as f:
+        image = f.read()
+
+    backend = ApiBackend(args.api) if args.api else StubBackend(args.seed)
+    reconciler = Reconciler(backend, args.passes, cache)
+    start = time.perf_counter()
+    analyses, cached = asyncio.run(reconciler.analyses(image))
+    elapsed = time.perf_counter() - start
+    print_consensus(analyses, reconcile(analyses, reconciler.quorum))
+    print(f"\n{'cached' if cached else backend.name} in {elapsed * 1000:.1f}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
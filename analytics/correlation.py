@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Correlation Engine
+Full-period and rolling return correlations for the stockData.js universe.
+Returns are standardised once into a float32 (symbol, day) array that is
+cached on disk and memory-mapped, and correlations come from blocked matrix
+products over it, so no step builds per-pair Python objects
+
+Sector correlation never forms the symbol x symbol matrix at all: with
+each symbol's returns scaled to unit norm, the sum of correlations between
+every member of sector A and every member of sector B is the dot product
+of the two sectors' summed return vectors.
+
+Usage:
+    python -m analytics.correlation                  # sector matrix for the universe
+    python -m analytics.correlation --window 63      # plus rolling sector correlations
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+
+from analytics.fixtures import FIXTURE_END, FIXTURE_START, synthetic_bars
+from analytics.ohlcv import CACHE_DIR
+from analytics.universe import CORE_SECTORS, load_universe
+
+# Bumped whenever cached returns would come out differently for the same inputs
+RETURNS_FORMAT = 1
+
+# Symbols per side of each block of the blocked correlation product
+BLOCK_SIZE = 512
+
+# Section 1: Returns
+
+def log_returns(close):
+    """Daily log returns of a (symbol, day) close array, one day shorter"""
+    return np.diff(np.log(close), axis=-1).astype(np.float32)
+
+def standardise(returns):
+    """Returns scaled per symbol to zero mean and unit norm; flat series become all zero"""
+    z = returns - returns.mean(axis=-1, keepdims=True)
+    norm = np.sqrt(np.einsum('...t,...t->...', z, z))[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(norm > 0, z / norm, 0).astype(np.float32)
+
+def cached_array(key, compute, cache_dir=None):
+    """Array stored as cache_dir/<key>.npy, computed on first use and memory-mapped after"""
+    cache_dir = cache_dir or CACHE_DIR
+    path = os.path.join(cache_dir, f"{key}.npy")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, compute())
+        os.replace(tmp, path)
+    return np.load(path, mmap_mode='r')
+
+def universe_returns(symbols=None, start=FIXTURE_START, end=FIXTURE_END, seed=0):
+    """Standardised returns for the universe (default: every stockData.js symbol)
+
+    Returns (symbols, memory-mapped float32 array). Prices are the seeded
+    synthetic bars with one shared factor per sector.
+    """
+    universe = load_universe()
+    symbols = tuple(symbols or (s.ticker for s in universe))
+    sectors = {s.ticker: s.sector for s in universe}
+    groups = tuple(sectors.get(t) for t in symbols)
+    key = hashlib.sha256(repr((RETURNS_FORMAT, symbols, groups, start, end, seed)).encode('utf-8')).hexdigest()[:24]
+
+    def compute():
+        close = synthetic_bars(symbols, start, end, seed, groups=sectors).close
+        return standardise(log_returns(close))
+
+    return symbols, cached_array(f"returns-{key}", compute)
+
+# Section 2: Correlation
+
+def correlation_blocks(z, block=BLOCK_SIZE):
+    """Yield (row, col, block) tiles of the upper triangle of the correlation matrix of z"""
+    n = len(z)
+    for i in range(0, n, block):
+        zi = np.asarray(z[i:i + block])
+        for j in range(i, n, block):
+            yield i, j, zi @ np.asarray(z[j:j + block]).T
+
+def correlation_matrix(z, out=None, block=BLOCK_SIZE):
+    """Full correlation matrix of standardised returns, written tile by tile into out
+
+    out may be any (n, n) array, including an np.memmap, so the matrix for
+    a very large universe never has to fit in memory.
+    """
+    n = len(z)
+    if out is None:
+        out = np.empty((n, n), dtype=np.float32)
+    for i, j, tile in correlation_blocks(z, block):
+        out[i:i + tile.shape[0], j:j + tile.shape[1]] = tile
+        if i != j:
+            out[j:j + tile.shape[1], i:i + tile.shape[0]] = tile.T
+    return out
+
+def group_correlation(z, labels, groups):
+    """Mean pairwise correlation within and between groups of standardised series
+
+    labels gives each row of z a group; the result is a len(groups) square
+    matrix whose diagonal is the mean correlation between distinct members
+    of a group and whose off-diagonal entries average over all cross pairs.
+    """
+    labels = np.asarray(labels)
+    membership = (labels[None, :] == np.asarray(groups)[:, None]).astype(np.float32)
+    counts = membership.sum(axis=1).astype(np.float64)
+    sums = membership @ z
+    totals = (sums @ sums.T).astype(np.float64)
+    # Each member correlates 1 with itself; drop those from the diagonal
+    pairs = np.outer(counts, counts)
+    np.fill_diagonal(totals, np.diag(totals) - counts)
+    np.fill_diagonal(pairs, counts * (counts - 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(pairs > 0, totals / pairs, np.nan)
+
+def rolling_correlation(x, y, window):
+    """Trailing correlation of each row of x with y over window days, from running sums
+
+    The first window - 1 days are NaN, so the result has x's shape; all of it
+    is NaN when x is shorter than window.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.broadcast_to(np.asarray(y, dtype=np.float64), x.shape)
+    if window > x.shape[-1]:
+        return np.full(x.shape, np.nan)
+
+    def running(values):
+        total = np.cumsum(values, axis=-1)
+        total[..., window:] = total[..., window:] - total[..., :-window]
+        return total[..., window - 1:]
+
+    sx, sy = running(x), running(y)
+    cov = running(x * y) - sx * sy / window
+    var = (running(x * x) - sx * sx / window) * (running(y * y) - sy * sy / window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.where(var > 0, cov / np.sqrt(np.maximum(var, 0)), np.nan)
+    pad = np.full(x.shape[:-1] + (window - 1,), np.nan)
+    return np.concatenate((pad, corr), axis=-1)
+
+def rolling_group_correlation(returns, labels, groups, window, step):
+    """group_correlation over trailing windows ending every step days: (ends, matrices)
+
+    With fewer days than window there are no windows: ends is empty and
+    matrices has shape (0, len(groups), len(groups)).
+    """
+    days = returns.shape[-1]
+    ends = np.arange(window, days + 1, step)
+    if not len(ends):
+        return ends, np.empty((0, len(groups), len(groups)))
+    matrices = np.stack([
+        group_correlation(standardise(np.asarray(returns[:, end - window:end])), labels, groups)
+        for end in ends
+    ])
+    return ends - 1, matrices
+
+def sector_correlation(sectors=CORE_SECTORS, **kwargs):
+    """Mean return correlation within and between sectors of the universe"""
+    symbols, z = universe_returns(**kwargs)
+    sector_of = {s.ticker: s.sector for s in load_universe()}
+    return group_correlation(z, [sector_of[t] for t in symbols], sectors)
+
+def print_matrix(names, matrix):
+    width = max(len(n) for n in names)
+    print(' ' * width + ''.join(f"{n[:6]:>8}" for n in names))
+    for name, row in zip(names, matrix):
+        print(f"{name:<{width}}" + ''.join(f"{v:>8.2f}" for v in row))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Return correlations for the MODUS symbol universe")
+    parser.add_argument('--window', type=int, help="also show rolling sector correlations over WINDOW days")
+    parser.add_argument('--step', type=int, default=21, help="days between rolling windows (default: 21)")
+    parser.add_argument('--full', metavar='PATH', help="write the full symbol correlation matrix to PATH (.npy)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    symbols, z = universe_returns()
+    loaded = time.perf_counter()
+    print_matrix(CORE_SECTORS, sector_correlation())
+    print(f"\n{len(symbols)} symbols x {z.shape[1]} returns: "
+          f"load {loaded - start:.2f}s, sectors {time.perf_counter() - loaded:.3f}s")
+
+    if args.window:
+        sector_of = {s.ticker: s.sector for s in load_universe()}
+        ends, matrices = rolling_group_correlation(z, [sector_of[t] for t in symbols], CORE_SECTORS,
+                                                   args.window, args.step)
+        print(f"\nMean within-sector correlation, {args.window}-day windows:")
+        for end, matrix in zip(ends, matrices):
+            print(f"  day {end:>4}  {np.nanmean(np.diag(matrix)):.2f}")
+
+    if args.full:
+        start = time.perf_counter()
+        out = np.lib.format.open_memmap(args.full, mode='w+', dtype=np.float32, shape=(len(z), len(z)))
+        correlation_matrix(z, out)
+        out.flush()
+        print(f"\nCreated: {args.full} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+MODUS Trading Dashboard - Chart Decimation
+Reduces price series to what a chart of a given width can show, for the
+candlestick charts in the guides (guide_charts.CandleChart)
+
+Bars are merged into one candle per CANDLE_POINTS of width (first open,
+highest high, lowest low, last close, summed volume), and each overlay
+keeps only the lowest and highest point per LINE_POINTS, in time order, so
+the line's visible envelope is unchanged. A ten-year daily chart therefore
+comes down to a few hundred candles, not thousands.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Horizontal space per candle and per overlay point, in points
+CANDLE_POINTS = 3.0
+LINE_POINTS = 1.0
+
+# Right-hand gutter of the chart kept for price labels, in points
+PRICE_GUTTER = 40
+
+# Decimated chart content. candles holds (first bar, last bar, open, high,
+# low, close, volume) per candle; overlays holds (label, PALETTE colour
+# name, ((bar, value), ...)); ticks holds (bar, label) for the x axis.
+ChartData = namedtuple('ChartData', 'title bars candles overlays ticks')
+
+def bucket_starts(n, buckets):
+    """First index of each of at most buckets equal runs covering n items"""
+    size = max(1, math.ceil(n / max(1, buckets)))
+    return np.arange(0, n, size)
+
+def decimate_ohlcv(open_, high, low, close, volume, buckets):
+    """Merge bars into at most buckets candles: (starts, ends, open, high, low, close, volume)"""
+    starts = bucket_starts(len(close), buckets)
+    ends = np.append(starts[1:], len(close)) - 1
+    return (starts, ends, np.asarray(open_)[starts], np.maximum.reduceat(high, starts),
+            np.minimum.reduceat(low, starts), np.asarray(close)[ends], np.add.reduceat(volume, starts))
+
+def decimate_minmax(values, buckets):
+    """Indices and values of the lowest and highest point per bucket, in index order; NaNs are dropped"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    size = max(1, math.ceil(n / max(1, buckets)))
+    rows = math.ceil(n / size) if n else 0
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = values
+    grid = padded.reshape(rows, size)
+    valid = ~np.isnan(grid).all(axis=1)
+    lowest = np.argmin(np.where(np.isnan(grid), np.inf, grid), axis=1)
+    highest = np.argmax(np.where(np.isnan(grid), -np.inf, grid), axis=1)
+    offsets = np.arange(rows) * size
+    picks = np.sort(np.stack((offsets + lowest, offsets + highest), axis=1)[valid], axis=1).ravel()
+    picks = picks[np.append(True, np.diff(picks) != 0)]
+    return picks, values[picks]
+
+def chart_data(dates, open_, high, low, close, volume, overlays=(), width=504, title=None):
+    """Decimate bars and overlays for a chart width points wide
+
+    overlays is a sequence of (label, PALETTE colour name, values aligned
+    with the bars). Values are rounded to cents so the result is compact,
+    hashable and reproducible.
+    """
+    plot_width = width - PRICE_GUTTER
+    n = len(close)
+    starts, ends, o, h, l, c, v = decimate_ohlcv(open_, high, low, close, volume, int(plot_width / CANDLE_POINTS))
+    candles = tuple(
+        (int(s), int(e), round(float(a), 2), round(float(b), 2), round(float(d), 2), round(float(f), 2), float(g))
+        for s, e, a, b, d, f, g in zip(starts, ends, o, h, l, c, v)
+    )
+    lines = []
+    for label, colour, values in overlays:
+        index, kept = decimate_minmax(values, int(plot_width / LINE_POINTS))
+        lines.append((label, colour, tuple((int(i), round(float(x), 2)) for i, x in zip(index, kept))))
+
+    span = (dates[-1] - dates[0]).astype(int) if n else 0
+    fmt = "%b %Y" if span > 180 else "%b %d"
+    ticks = tuple((int(i), dates[i].item().strftime(fmt)) for i in np.linspace(0, n - 1, 6).round().astype(int)) if n else ()
+    return ChartData(title, n, candles, tuple(lines), ticks)
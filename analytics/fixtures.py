@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - OHLCV Fixtures
+Deterministic daily price history for analytics and the guides' worked
+examples. The bars are synthetic, not market data: every symbol is a seeded
+random walk with its own drift, volatility, trending/ranging regimes and
+exposure to a shared market factor, so guide tables come out the same on
+any machine without network access
+
+Usage:
+    python -m analytics.fixtures           # regenerate data/ohlcv/*.csv
+"""
+
+import csv
+import hashlib
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT_DIR, 'data', 'ohlcv')
+
+# Tier 1 of PRIORITY_STOCKS in src/constants/stockData.js, plus SPY
+FIXTURE_SYMBOLS = (
+    'NVDA', 'TSLA', 'AAPL', 'AMD', 'META', 'MSFT', 'AMZN', 'GOOGL', 'NFLX', 'COIN',
+    'PLTR', 'SOFI', 'NIO', 'RIVN', 'LCID', 'F', 'GM', 'BA', 'DIS', 'PYPL', 'SPY',
+)
+FIXTURE_START = '2024-01-01'
+FIXTURE_END = '2026-01-01'
+
+# Days per trend regime in the synthetic walks
+REGIME_DAYS = 40
+
+# Daily bars for several symbols over the same days. open/high/low/close/
+# volume are 2-D float64 arrays indexed [symbol, day].
+Bars = namedtuple('Bars', 'symbols dates open high low close volume')
+
+def trading_days(start=FIXTURE_START, end=FIXTURE_END):
+    """Weekdays in [start, end) as datetime64[D]"""
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D'))
+    return days[np.is_busday(days)]
+
+def _rng(*parts):
+    digest = hashlib.sha256('/'.join(str(p) for p in parts).encode('utf-8')).digest()
+    return np.random.default_rng(int.from_bytes(digest[:8], 'little'))
+
+def synthetic_bars(symbols, start=FIXTURE_START, end=FIXTURE_END, seed=0, groups=None):
+    """Seeded synthetic bars; each symbol's series depends only on its name, seed and group
+
+    groups optionally maps symbols to a group name (e.g. a sector); members
+    of a group share a group factor on top of the market factor, so they
+    correlate more with each other than with the rest. A member's exposure
+    to its group is drawn from a generator of its own, so its other draws
+    are the same as without groups.
+    """
+    dates = trading_days(start, end)
+    days = len(dates)
+    regimes = -(-days // REGIME_DAYS)
+    market = _rng(seed, 'market').normal(0.0003, 0.009, days)
+    factors = {}
+
+    shape = (len(symbols), days)
+    o, h, l, c, v = (np.empty(shape) for _ in range(5))
+    for i, symbol in enumerate(symbols):
+        rng = _rng(seed, symbol)
+        sigma = rng.uniform(0.010, 0.030)
+        beta = rng.uniform(0.6, 1.5)
+        trend = np.repeat(rng.normal(0, 0.0025, regimes), REGIME_DAYS)[:days]
+        clustering = np.repeat(rng.lognormal(0, 0.35, regimes * 2), REGIME_DAYS // 2)[:days]
+        returns = beta * market + trend + sigma * clustering * rng.standard_normal(days)
+        group = (groups or {}).get(symbol)
+        if group is not None:
+            if group not in factors:
+                factors[group] = _rng(seed, 'group', group).normal(0, 0.008, days)
+            returns += _rng(seed, 'group', group, symbol).uniform(0.6, 1.4) * factors[group]
+
+        close = np.exp(rng.uniform(np.log(15), np.log(600))) * np.exp(np.cumsum(returns))
+        gap = np.exp(rng.normal(0, sigma * 0.3, days))
+        open_ = np.concatenate(([close[0]], close[:-1])) * gap
+        wick = sigma * 0.6
+        o[i] = open_
+        h[i] = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, wick, days)))
+        l[i] = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, wick, days)))
+        c[i] = close
+        v[i] = np.round(rng.uniform(2e6, 6e7) * rng.lognormal(0, 0.3, days) * (1 + 2 * np.abs(returns) / sigma))
+
+    return Bars(tuple(symbols), dates, *(np.round(a, 2) for a in (o, h, l, c)), v)
+
+def write_csv(path, dates, open_, high, low, close, volume):
+    """Write one symbol's bars as date,open,high,low,close,volume"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['date', 'open', 'high', 'low', 'close', 'volume'])
+        for row in zip(dates.astype(str), open_, high, low, close, volume.astype(np.int64)):
+            writer.writerow([row[0], *(f"{x:.2f}" for x in row[1:5]), row[5]])
+
+def read_csv(path):
+    """One symbol's bars from a CSV file: (dates, open, high, low, close, volume)"""
+    dates = np.loadtxt(path, delimiter=',', skiprows=1, usecols=0, dtype='datetime64[D]', ndmin=1)
+    values = np.loadtxt(path, delimiter=',', skiprows=1, usecols=(1, 2, 3, 4, 5), ndmin=2)
+    return (dates, *values.T)
+
+def load_fixtures(symbols=FIXTURE_SYMBOLS, directory=FIXTURE_DIR):
+    """Bars for the given fixture symbols, which must all cover the same days"""
+    columns = [read_csv(os.path.join(directory, f"{symbol}.csv")) for symbol in symbols]
+    dates = columns[0][0]
+    for symbol, column in zip(symbols, columns):
+        if not np.array_equal(column[0], dates):
+            raise ValueError(f"{symbol}: fixture dates do not match {symbols[0]}")
+    return Bars(tuple(symbols), dates, *(np.stack([col[k] for col in columns]) for k in range(1, 6)))
+
+def main():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    bars = synthetic_bars(FIXTURE_SYMBOLS)
+    for i, symbol in enumerate(bars.symbols):
+        path = os.path.join(FIXTURE_DIR, f"{symbol}.csv")
+        write_csv(path, bars.dates, bars.open[i], bars.high[i], bars.low[i], bars.close[i], bars.volume[i])
+        print(f"Created: {os.path.relpath(path, ROOT_DIR)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Technical Indicators
+SMA, EMA, RSI, MACD, ATR, VWAP and pivot-based support/resistance, each in
+two forms that give the same numbers:
+
+  * batch functions over whole arrays (time along the last axis, so a
+    (symbol, day) grid is computed in one call), with no per-bar loop
+  * streaming classes that take one bar at a time in constant time and
+    memory, with __slots__ state, for live scanning
+
+EMAs are seeded with the first value, and RSI and ATR use Wilder's
+smoothing (an EMA with alpha = 1/period). Values before an indicator has
+seen enough bars are NaN.
+
+Usage:
+    python -m analytics.indicators AAPL       # latest readings for a fixture symbol
+"""
+
+import math
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Largest factor the EMA lets its rescaled running sum grow by before it
+# starts a new chunk; keeps the closed form well inside float64 precision
+EMA_RESCALE_LIMIT = 1e8
+
+MACDResult = namedtuple('MACDResult', 'macd signal histogram')
+PivotLevels = namedtuple('PivotLevels', 'pivot r1 s1 r2 s2')
+
+# Section 1: Batch indicators
+
+def _pad(values, length):
+    """values preceded by NaN up to length bars (at least len(values)); all NaN when values is empty"""
+    pad = np.full(values.shape[:-1] + (length - values.shape[-1],), np.nan)
+    return np.concatenate((pad, values), axis=-1)
+
+def sma(x, period):
+    """Simple moving average over period bars"""
+    total = np.cumsum(x, axis=-1, dtype=np.float64)
+    total[..., period:] = total[..., period:] - total[..., :-period]
+    return _pad(total[..., period - 1:] / period, total.shape[-1])
+
+def _rolling(x, period, reduce):
+    x = np.asarray(x)
+    if x.shape[-1] < period:
+        return np.full(x.shape, np.nan)
+    return _pad(reduce(sliding_window_view(x, period, axis=-1), axis=-1), x.shape[-1])
+
+def rolling_max(x, period):
+    """Highest value over the last period bars"""
+    return _rolling(x, period, np.max)
+
+def rolling_min(x, period):
+    """Lowest value over the last period bars"""
+    return _rolling(x, period, np.min)
+
+def lag(x, bars=1):
+    """x shifted forward by bars, NaN where there is no earlier value"""
+    x = np.asarray(x)
+    return _pad(x[..., :max(x.shape[-1] - bars, 0)], x.shape[-1])
+
+def ema(x, period=None, alpha=None):
+    """Exponential moving average, seeded with the first value
+
+    ema[t] = alpha * x[t] + (1 - alpha) * ema[t-1] is evaluated in closed
+    form: within a chunk, ema is decay**t times a cumulative sum of
+    x / decay**t, and chunks are short enough that decay**-t stays small.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    alpha = 2 / (period + 1) if alpha is None else alpha
+    decay = 1 - alpha
+    out = np.empty_like(x)
+    days = x.shape[-1]
+    if days == 0 or decay == 0:
+        out[...] = x
+        return out
+    chunk = max(1, int(math.log(EMA_RESCALE_LIMIT) / -math.log(decay)))
+    carry = x[..., 0]
+    for start in range(0, days, chunk):
+        block = x[..., start:start + chunk]
+        powers = decay ** np.arange(block.shape[-1])
+        running = np.cumsum(block / powers, axis=-1)
+        out[..., start:start + block.shape[-1]] = powers * (decay * carry[..., None] + alpha * running)
+        carry = out[..., start + block.shape[-1] - 1]
+    return out
+
+def rsi(close, period=14):
+    """Wilder's relative strength index"""
+    close = np.asarray(close, dtype=np.float64)
+    change = np.diff(close, axis=-1)
+    gain = ema(np.maximum(change, 0), alpha=1 / period)
+    loss = ema(np.maximum(-change, 0), alpha=1 / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), 100 - 100 / (1 + gain / loss))
+    value[..., :period - 1] = np.nan
+    return _pad(value, close.shape[-1])
+
+def simple_rsi(close, period=14):
+    """RSI from plain sums of gains and losses, as the dashboard's Backtest computes it"""
+    close = np.asarray(close)
+    change = np.diff(close, axis=-1)
+    gains = sma(np.maximum(change, 0), period)
+    losses = sma(np.maximum(-change, 0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+    return _pad(np.where(np.isnan(gains), np.nan, value), close.shape[-1])
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return MACDResult(line, signal_line, line - signal_line)
+
+def true_range(high, low, close):
+    """Bar range extended to the previous close; the first bar uses high - low"""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    previous = np.concatenate((close[..., :1], close[..., :-1]), axis=-1)
+    return np.maximum(high, previous) - np.minimum(low, previous)
+
+def atr(high, low, close, period=14):
+    """Wilder's average true range"""
+    value = ema(true_range(high, low, close), alpha=1 / period)
+    value[..., :period - 1] = np.nan
+    return value
+
+def vwap(high, low, close, volume, period=None):
+    """Volume-weighted average of the typical price, anchored at the first bar or over period bars"""
+    typical = (np.asarray(high) + np.asarray(low) + np.asarray(close)) / 3
+    volume = np.asarray(volume, dtype=np.float64)
+    if period is None:
+        pv, v = np.cumsum(typical * volume, axis=-1), np.cumsum(volume, axis=-1)
+    else:
+        pv, v = sma(typical * volume, period), sma(volume, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pv / v
+
+def pivot_points(high, low, close):
+    """Floor-trader pivots from each bar, i.e. the levels for the bar after it"""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    pivot = (high + low + close) / 3
+    return PivotLevels(pivot, 2 * pivot - low, 2 * pivot - high, pivot + (high - low), pivot - (high - low))
+
+def swing_points(high, low, strength=5):
+    """Masks of swing highs and lows: bars whose high (low) is the extreme of strength bars either side"""
+    width = 2 * strength + 1
+    highs = np.zeros(np.shape(high), dtype=bool)
+    lows = np.zeros(np.shape(low), dtype=bool)
+    if np.shape(high)[-1] >= width:
+        highs[..., strength:-strength] = sliding_window_view(high, width, axis=-1).argmax(axis=-1) == strength
+        lows[..., strength:-strength] = sliding_window_view(low, width, axis=-1).argmin(axis=-1) == strength
+    return highs, lows
+
+def support_resistance(high, low, close, strength=5, count=2):
+    """Nearest swing-low supports below and swing-high resistances above the last close of one series"""
+    highs, lows = swing_points(high, low, strength)
+    last = close[-1]
+    resistance = np.unique(high[highs & (high > last)])[:count]
+    support = np.unique(low[lows & (low < last)])[::-1][:count]
+    return support, resistance
+
+# Section 2: Streaming indicators (update() takes one bar and returns the latest value)
+
+class SMA:
+    """Simple moving average over a ring buffer"""
+    __slots__ = ('period', 'values', 'index', 'count', 'total')
+
+    def __init__(self, period):
+        self.period = period
+        self.values = [0.0] * period
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, value):
+        self.total += value - self.values[self.index]
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.period
+        self.count = min(self.count + 1, self.period)
+        return self.total / self.period if self.count == self.period else math.nan
+
+class EMA:
+    """Exponential moving average seeded with the first value"""
+    __slots__ = ('alpha', 'value')
+
+    def __init__(self, period=None, alpha=None):
+        self.alpha = 2 / (period + 1) if alpha is None else alpha
+        self.value = None
+
+    def update(self, value):
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+        return self.value
+
+class RSI:
+    """Wilder's relative strength index"""
+    __slots__ = ('period', 'previous', 'gain', 'loss', 'count')
+
+    def __init__(self, period=14):
+        self.period = period
+        self.previous = None
+        self.gain = EMA(alpha=1 / period)
+        self.loss = EMA(alpha=1 / period)
+        self.count = 0
+
+    def update(self, close):
+        previous, self.previous = self.previous, close
+        if previous is None:
+            return math.nan
+        change = close - previous
+        gain = self.gain.update(max(change, 0.0))
+        loss = self.loss.update(max(-change, 0.0))
+        self.count += 1
+        if self.count < self.period:
+            return math.nan
+        if loss == 0:
+            return 50.0 if gain == 0 else 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+class MACD:
+    """MACD line, signal line and histogram"""
+    __slots__ = ('fast', 'slow', 'signal')
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, close):
+        line = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(line)
+        return MACDResult(line, signal, line - signal)
+
+class ATR:
+    """Wilder's average true range"""
+    __slots__ = ('period', 'previous', 'average', 'count')
+
+    def __init__(self, period=14):
+        self.period = period
+        self.previous = None
+        self.average = EMA(alpha=1 / period)
+        self.count = 0
+
+    def update(self, high, low, close):
+        previous = close if self.previous is None else self.previous
+        self.previous = close
+        value = self.average.update(max(high, previous) - min(low, previous))
+        self.count += 1
+        return value if self.count >= self.period else math.nan
+
+class VWAP:
+    """Anchored VWAP; call reset() at each new session or anchor"""
+    __slots__ = ('pv', 'volume')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.pv = 0.0
+        self.volume = 0.0
+
+    def update(self, high, low, close, volume):
+        self.pv += (high + low + close) / 3 * volume
+        self.volume += volume
+        return self.pv / self.volume if self.volume else math.nan
+
+class Pivots:
+    """Floor-trader pivots for the next bar from the latest completed one"""
+    __slots__ = ()
+
+    def update(self, high, low, close):
+        pivot = (high + low + close) / 3
+        return PivotLevels(pivot, 2 * pivot - low, 2 * pivot - high, pivot + (high - low), pivot - (high - low))
+
+# Section 3: Command line
+
+def main(argv=None):
+    from analytics.fixtures import FIXTURE_SYMBOLS
+    from analytics.ohlcv import fixture_store
+
+    argv = sys.argv[1:] if argv is None else argv
+    symbol = (argv[0] if argv else 'AAPL').upper()
+    if symbol not in FIXTURE_SYMBOLS:
+        print(f"{symbol} is not a fixture symbol: {', '.join(FIXTURE_SYMBOLS)}", file=sys.stderr)
+        return 2
+    bars = fixture_store().bars(symbol)
+    high, low, close, volume = (np.asarray(a) for a in (bars.high, bars.low, bars.close, bars.volume))
+
+    start = time.perf_counter()
+    batch = {
+        'SMA 20': sma(close, 20), 'EMA 20': ema(close, 20), 'RSI 14': rsi(close),
+        'MACD hist': macd(close).histogram, 'ATR 14': atr(high, low, close), 'VWAP': vwap(high, low, close, volume),
+    }
+    batch_seconds = time.perf_counter() - start
+
+    streams = {'SMA 20': SMA(20), 'EMA 20': EMA(20), 'RSI 14': RSI(), 'MACD hist': MACD(), 'ATR 14': ATR(), 'VWAP': VWAP()}
+    start = time.perf_counter()
+    for h, l, c, v in zip(high.tolist(), low.tolist(), close.tolist(), volume.tolist()):
+        latest = {
+            'SMA 20': streams['SMA 20'].update(c), 'EMA 20': streams['EMA 20'].update(c),
+            'RSI 14': streams['RSI 14'].update(c), 'MACD hist': streams['MACD hist'].update(c).histogram,
+            'ATR 14': streams['ATR 14'].update(h, l, c), 'VWAP': streams['VWAP'].update(h, l, c, v),
+        }
+    stream_seconds = time.perf_counter() - start
+
+    print(f"{symbol} on {bars.dates[-1]}, close {close[-1]:.2f}")
+    for name, values in batch.items():
+        print(f"  {name:<10}{values[-1]:>10.3f}   streaming {latest[name]:>10.3f}")
+    support, resistance = support_resistance(high, low, close)
+    print(f"  support    {', '.join(f'{v:.2f}' for v in support)}")
+    print(f"  resistance {', '.join(f'{v:.2f}' for v in resistance)}")
+    print(f"\n{len(close)} bars: batch {batch_seconds * 1000:.2f}ms, "
+          f"streaming {stream_seconds / len(close) * 1e6:.1f}us per bar")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
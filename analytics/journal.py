@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Trading Journal
+Append-only store of closed trades with running statistics, behind the
+Journal's performance metrics and the printable journal report
+
+Trades are kept in SQLite in the order they are added and are never
+updated or deleted; adding a trade with an id already in the journal does
+nothing. Next to them the journal keeps one row of running statistics for
+every scope it reports on: the whole journal, each strategy, each tag and
+each exit month. Adding a trade updates only the rows it belongs to, in
+the same transaction as the trade itself, so win rate, profit factor,
+expectancy and drawdown are always current without reading old trades.
+Several handles may write to one journal (the app and an import, say):
+each addition re-reads the rows it updates inside its write transaction,
+and a handle reloads its statistics when another one has committed.
+
+P&L follows the app's Journal: (exit - entry) x quantity for longs,
+(entry - exit) x quantity for shorts. Drawdown is in dollars from the
+highest cumulative P&L so far, and assumes trades are added in the order
+they were closed.
+
+Usage:
+    python -m analytics.journal JOURNAL                       # print the journal's statistics
+    python -m analytics.journal JOURNAL --import trades.json  # add the app's exported journal entries
+    python -m analytics.journal JOURNAL --verify [--repair]   # check (and rewrite) the running statistics
+    python -m analytics.journal --synthetic 300000            # time adding seeded synthetic trades
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from analytics.ohlcv import CACHE_DIR
+
+JOURNAL_PATH = os.path.join(CACHE_DIR, 'journal', 'journal.sqlite')
+TRADING_DAYS = 252
+
+# Scopes statistics are kept for; the whole journal is ('all', '')
+SCOPES = ('all', 'strategy', 'tag', 'month')
+UNSPECIFIED = "Unspecified"
+
+Trade = namedtuple('Trade', 'id symbol side entry exit quantity entry_date exit_date strategy tags notes '
+                            'pnl pnl_percent')
+
+# Section 1: Trades
+
+def trade_pnl(side, entry, exit, quantity):
+    """(dollar P&L, percent P&L) of a closed trade, as the app's Journal computes them"""
+    direction = 1 if side == 'long' else -1
+    return direction * (exit - entry) * quantity, direction * (exit - entry) / entry * 100
+
+def make_trade(entry):
+    """Trade from a journal entry dict (the app's field names, numbers may be strings)
+
+    Raises ValueError for open trades and malformed entries.
+    """
+    if isinstance(entry, Trade):
+        return entry
+    side = str(entry.get('side', 'long')).lower()
+    if side not in ('long', 'short'):
+        raise ValueError(f"trade {entry.get('id')}: side must be long or short, not {side!r}")
+    if entry.get('exit') in (None, '') or entry.get('entry') in (None, ''):
+        raise ValueError(f"trade {entry.get('id')}: only closed trades (with entry and exit prices) can be added")
+    price_in, price_out = float(entry['entry']), float(entry['exit'])
+    if price_in <= 0:
+        raise ValueError(f"trade {entry.get('id')}: entry price must be positive")
+    quantity = float(entry.get('quantity') or 1)
+    pnl, pnl_percent = trade_pnl(side, price_in, price_out, quantity)
+    tags = tuple(sorted({str(t) for t in entry.get('tags') or () if t}))
+    return Trade(str(entry['id']), str(entry.get('symbol', '')).upper(), side, price_in, price_out, quantity,
+                 entry.get('entryDate') or '', entry.get('exitDate') or '', entry.get('strategy') or UNSPECIFIED,
+                 tags, entry.get('notes') or '', pnl, pnl_percent)
+
+def _hold_days(trade):
+    if not (trade.entry_date and trade.exit_date):
+        return 0
+    delta = datetime.date.fromisoformat(trade.exit_date[:10]) - datetime.date.fromisoformat(trade.entry_date[:10])
+    return max(delta.days, 0)
+
+# Section 2: Running statistics
+
+class Stats:
+    """Statistics of a sequence of closed trades, updated one trade at a time"""
+
+    FIELDS = ('trades', 'wins', 'losses', 'gross_profit', 'gross_loss', 'percent_sum', 'percent_squares',
+              'equity', 'peak', 'max_drawdown', 'best', 'worst', 'streak', 'longest_win', 'longest_loss',
+              'hold_days', 'first_exit', 'last_exit')
+    __slots__ = FIELDS
+
+    def __init__(self, *values):
+        defaults = (0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, None, None, 0, 0, 0, 0, '', '')
+        for name, value in zip(self.FIELDS, values or defaults):
+            setattr(self, name, value)
+
+    def add(self, pnl, pnl_percent, hold_days=0, exit_date=''):
+        self.trades += 1
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        elif pnl < 0:
+            self.losses += 1
+            self.gross_loss -= pnl
+        self.percent_sum += pnl_percent
+        self.percent_squares += pnl_percent * pnl_percent
+        self.equity += pnl
+        if self.equity > self.peak:
+            self.peak = self.equity
+        elif self.peak - self.equity > self.max_drawdown:
+            self.max_drawdown = self.peak - self.equity
+        if self.best is None or pnl > self.best:
+            self.best = pnl
+        if self.worst is None or pnl < self.worst:
+            self.worst = pnl
+        # Breakeven trades extend a winning streak, as in the app
+        if pnl >= 0:
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+            if self.streak > self.longest_win:
+                self.longest_win = self.streak
+        else:
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+            if -self.streak > self.longest_loss:
+                self.longest_loss = -self.streak
+        self.hold_days += hold_days
+        if exit_date:
+            if not self.first_exit or exit_date < self.first_exit:
+                self.first_exit = exit_date
+            if exit_date > self.last_exit:
+                self.last_exit = exit_date
+
+    def values(self):
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def __eq__(self, other):
+        return isinstance(other, Stats) and all(
+            math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6) if isinstance(a, float) and isinstance(b, float) else a == b
+            for a, b in zip(self.values(), other.values()))
+
+    @property
+    def net(self):
+        return self.equity
+
+    @property
+    def win_rate(self):
+        return self.wins / self.trades if self.trades else 0.0
+
+    @property
+    def profit_factor(self):
+        if self.gross_loss > 0:
+            return self.gross_profit / self.gross_loss
+        return math.inf if self.gross_profit > 0 else 0.0
+
+    @property
+    def expectancy(self):
+        """Average P&L per trade"""
+        return self.equity / self.trades if self.trades else 0.0
+
+    @property
+    def avg_win(self):
+        return self.gross_profit / self.wins if self.wins else 0.0
+
+    @property
+    def avg_loss(self):
+        return self.gross_loss / self.losses if self.losses else 0.0
+
+    @property
+    def avg_hold_days(self):
+        return self.hold_days / self.trades if self.trades else 0.0
+
+    @property
+    def sharpe(self):
+        """The app's Sharpe-like ratio: mean over population std of percent P&L, x sqrt(252)"""
+        if not self.trades:
+            return 0.0
+        mean = self.percent_sum / self.trades
+        std = math.sqrt(max(self.percent_squares / self.trades - mean * mean, 0.0)) or 1.0
+        return mean / std * math.sqrt(TRADING_DAYS)
+
+def trade_scopes(trade):
+    """The (scope, key) statistics rows a trade counts towards"""
+    scopes = [('all', ''), ('strategy', trade.strategy)]
+    scopes += [('tag', tag) for tag in trade.tags]
+    if trade.exit_date:
+        scopes.append(('month', trade.exit_date[:7]))
+    return scopes
+
+# Section 3: Store
+
+class Journal:
+    """Append-only SQLite journal of closed trades with running statistics per scope"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS trades (
+            seq INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            symbol TEXT NOT NULL,
+            side TEXT NOT NULL,
+            entry REAL NOT NULL,
+            exit REAL NOT NULL,
+            quantity REAL NOT NULL,
+            entry_date TEXT NOT NULL,
+            exit_date TEXT NOT NULL,
+            strategy TEXT NOT NULL,
+            tags TEXT NOT NULL,
+            notes TEXT NOT NULL,
+            pnl REAL NOT NULL,
+            pnl_percent REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS stats (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            {columns},
+            PRIMARY KEY (scope, key)
+        );
+    """.replace('{columns}', ',\n            '.join(f"{name}" for name in Stats.FIELDS))
+
+    def __init__(self, path=JOURNAL_PATH, readonly=False):
+        """Open (or create) the journal at path; readonly opens an existing journal without writing to it"""
+        self.path = path
+        if readonly:
+            uri = pathlib.Path(path).absolute().as_uri() + '?mode=ro'
+            self._db = sqlite3.connect(uri, uri=True, isolation_level=None)
+        else:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.executescript(self.SCHEMA)
+        self._load_stats()
+
+    def _load_stats(self):
+        # Every statistics row is small and there is one per strategy, tag and month, so all stay loaded.
+        # data_version changes when another connection commits, which is when they have to be reloaded
+        self._version = self._db.execute('PRAGMA data_version').fetchone()[0]
+        self._stats = {(scope, key): Stats(*values)
+                       for scope, key, *values in self._db.execute('SELECT * FROM stats')}
+
+    def _current_stats(self):
+        if self._db.execute('PRAGMA data_version').fetchone()[0] != self._version:
+            self._load_stats()
+        return self._stats
+
+    def _read_stats(self, scope):
+        row = self._db.execute('SELECT * FROM stats WHERE scope = ? AND key = ?', scope).fetchone()
+        return Stats(*row[2:]) if row else Stats()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.stats().trades
+
+    def add(self, trade):
+        """Add one closed trade; return it as a Trade, or None if its id is already in the journal"""
+        added = self.add_many([trade])
+        return added[0] if added else None
+
+    def add_many(self, trades):
+        """Add closed trades in one transaction; return those that were new, as Trades"""
+        trades = [make_trade(t) for t in trades]
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            added, touched = [], {}
+            for trade in trades:
+                cursor = db.execute(
+                    'INSERT OR IGNORE INTO trades (id, symbol, side, entry, exit, quantity, entry_date, exit_date, '
+                    'strategy, tags, notes, pnl, pnl_percent) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    trade[:9] + (json.dumps(trade.tags),) + trade[10:])
+                if not cursor.rowcount:
+                    continue
+                added.append(trade)
+                hold = _hold_days(trade)
+                for scope in trade_scopes(trade):
+                    stats = touched.get(scope)
+                    if stats is None:
+                        # From the database, not self._stats: another handle may have added trades since
+                        stats = touched[scope] = self._read_stats(scope)
+                    stats.add(trade.pnl, trade.pnl_percent, hold, trade.exit_date)
+            placeholders = ', '.join('?' * (len(Stats.FIELDS) + 2))
+            db.executemany(f'INSERT OR REPLACE INTO stats VALUES ({placeholders})',
+                           [scope + stats.values() for scope, stats in touched.items()])
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        # Only published once the transaction has committed
+        self._current_stats().update(touched)
+        return added
+
+    def stats(self, scope='all', key=''):
+        """Running statistics of the whole journal or of one strategy, tag or month"""
+        return self._current_stats().get((scope, key)) or Stats()
+
+    def breakdown(self, scope):
+        """key -> Stats for every strategy, tag or month"""
+        if scope not in SCOPES:
+            raise ValueError(f"unknown scope {scope!r}, expected one of {', '.join(SCOPES)}")
+        return {key: stats for (s, key), stats in sorted(self._current_stats().items()) if s == scope}
+
+    def _trades(self, rows):
+        for row in rows:
+            yield Trade(*row[:9], tuple(json.loads(row[9])), *row[10:])
+
+    def recent(self, count=20):
+        """The last count trades added, newest first"""
+        return list(self._trades(self._db.execute(
+            'SELECT id, symbol, side, entry, exit, quantity, entry_date, exit_date, strategy, tags, notes, pnl, '
+            'pnl_percent FROM trades ORDER BY seq DESC LIMIT ?', (count,))))
+
+    def trades(self, batch=10000):
+        """Every trade in the order added, read batch rows at a time"""
+        last = 0
+        while True:
+            rows = self._db.execute(
+                'SELECT seq, id, symbol, side, entry, exit, quantity, entry_date, exit_date, strategy, tags, notes, '
+                'pnl, pnl_percent FROM trades WHERE seq > ? ORDER BY seq LIMIT ?', (last, batch)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield from self._trades(row[1:] for row in rows)
+
+    def recompute(self):
+        """Statistics rebuilt from every trade, to check the running ones against (see verify and repair)"""
+        stats = {}
+        for trade in self.trades():
+            hold = _hold_days(trade)
+            for scope in trade_scopes(trade):
+                stats.setdefault(scope, Stats()).add(trade.pnl, trade.pnl_percent, hold, trade.exit_date)
+        return stats
+
+    def verify(self):
+        """True if the running statistics equal a recompute from every trade"""
+        return self.recompute() == self._current_stats()
+
+    def repair(self):
+        """Replace the running statistics with a recompute from every trade"""
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            stats = self.recompute()
+            placeholders = ', '.join('?' * (len(Stats.FIELDS) + 2))
+            db.execute('DELETE FROM stats')
+            db.executemany(f'INSERT INTO stats VALUES ({placeholders})',
+                           [scope + s.values() for scope, s in stats.items()])
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        self._stats = stats
+
+# Section 4: Synthetic trades and command line
+
+def synthetic_trades(count, seed=0, start='2024-01-02', span=1000):
+    """Seeded synthetic closed trades opened over at most span days, for benchmarks and the sample report"""
+    import numpy as np
+
+    from analytics.backtest import STRATEGIES
+    from analytics.fixtures import FIXTURE_SYMBOLS, _rng
+
+    rng = _rng(seed, 'journal')
+    strategies = [name for name, _ in STRATEGIES.values()] + ["Discretionary"]
+    tags = ("A+ Setup", "Followed Plan", "Earnings", "Gap", "Chased Entry", "Moved Stop", "Auto Bot", "Swing")
+    symbol = rng.integers(0, len(FIXTURE_SYMBOLS), count)
+    strategy = rng.integers(0, len(strategies), count)
+    # Strategies differ in edge: win probability and payoff ratio
+    edge = rng.uniform(0.4, 0.6, len(strategies))[strategy]
+    win = rng.random(count) < edge
+    entry = np.round(np.exp(rng.uniform(np.log(10), np.log(600), count)), 2)
+    move = np.where(win, rng.exponential(0.04, count), -rng.exponential(0.025, count))
+    short = rng.random(count) < 0.3
+    exit = np.round(entry * (1 + np.where(short, -move, move)), 2)
+    quantity = np.maximum(1, np.round(5000 / entry))
+    opened = np.datetime64(start) + np.cumsum(rng.random(count) < min(1.0, span / count))
+    held = rng.integers(0, 15, count)
+    tag_mask = rng.random((count, len(tags))) < 0.15
+
+    for i in range(count):
+        yield {
+            'id': f"syn-{seed}-{i}",
+            'symbol': FIXTURE_SYMBOLS[symbol[i]],
+            'side': 'short' if short[i] else 'long',
+            'entry': float(entry[i]), 'exit': float(exit[i]), 'quantity': float(quantity[i]),
+            'entryDate': str(opened[i]), 'exitDate': str(opened[i] + held[i]),
+            'strategy': strategies[strategy[i]],
+            'tags': [tags[j] for j in np.flatnonzero(tag_mask[i])],
+        }
+
+def print_stats(journal):
+    s = journal.stats()
+    print(f"Trades:        {s.trades:,} ({s.wins:,} wins, {s.losses:,} losses)")
+    print(f"Win rate:      {s.win_rate:.1%}")
+    print(f"Profit factor: {s.profit_factor:.2f}")
+    print(f"Expectancy:    ${s.expectancy:,.2f} per trade")
+    print(f"Net P&L:       ${s.net:,.2f}")
+    print(f"Max drawdown:  ${s.max_drawdown:,.2f}")
+    for scope in ('strategy', 'tag'):
+        for key, stats in journal.breakdown(scope).items():
+            print(f"  {scope} {key}: {stats.trades:,} trades, {stats.win_rate:.1%} win rate, "
+                  f"PF {stats.profit_factor:.2f}, ${stats.net:,.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trading journal with running statistics")
+    parser.add_argument('journal', nargs='?', default=JOURNAL_PATH, help="journal database (default: %(default)s)")
+    parser.add_argument('--import', dest='import_path', metavar='JSON',
+                        help="add closed trades from a JSON list of journal entries")
+    parser.add_argument('--synthetic', type=int, metavar='N', help="time adding N synthetic trades to a new journal")
+    parser.add_argument('--verify', action='store_true', help="check the running statistics against a recompute")
+    parser.add_argument('--repair', action='store_true', help="with --verify, rewrite statistics that differ")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as directory, Journal(os.path.join(directory, 'journal.sqlite')) as journal:
+            trades = list(synthetic_trades(args.synthetic))
+            start = time.perf_counter()
+            for i in range(0, len(trades), 10000):
+                journal.add_many(trades[i:i + 10000])
+            bulk = time.perf_counter() - start
+            extra = list(synthetic_trades(1000, seed=1))
+            start = time.perf_counter()
+            for trade in extra:
+                journal.add(trade)
+            single = (time.perf_counter() - start) / len(extra)
+            start = time.perf_counter()
+            recomputed = journal.recompute()
+            full = time.perf_counter() - start
+            print_stats(journal)
+            print(f"\n{args.synthetic:,} trades added in {bulk:.2f}s; one more trade takes {single * 1000:.2f}ms "
+                  f"(own transaction), recomputing from every trade {full:.2f}s")
+            print("running statistics match a recompute" if recomputed == journal._current_stats()
+                  else "running statistics DIFFER from a recompute")
+        return 0
+
+    with Journal(args.journal) as journal:
+        if args.import_path:
+            with open(args.import_path, encoding='utf-8') as f:
+                entries = [e for e in json.load(f) if e.get('exit') not in (None, '')]
+            added = journal.add_many(entries)
+            print(f"Added {len(added):,} of {len(entries):,} closed trades")
+        print_stats(journal)
+        if args.verify:
+            ok = journal.verify()
+            print("running statistics match a recompute" if ok else "running statistics DIFFER from a recompute")
+            if not ok and args.repair:
+                journal.repair()
+                print("running statistics rewritten from the trades")
+                return 0
+            return 0 if ok else 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Alert Notifications
+Sends triggered alerts as text messages through the carriers' email-to-SMS
+gateways, like api/alerts-batch.js, but batched, rate limited and retried
+
+Alerts go into a persistent queue (SQLite) first. Each alert is recorded
+once by its key, so an alert submitted twice is sent once, and a
+recipient's new alerts are coalesced into as few 140-character messages as
+possible, in the same "<emoji> SYMBOL: message" lines as the serverless
+function. The dispatcher then takes the due messages, groups them by
+gateway domain and sends each group over one pooled SMTP connection,
+paced by a token bucket per gateway and one for the sending account.
+Temporary failures (4xx replies, dropped connections) are retried with
+exponential backoff, even across restarts; permanent ones (5xx) are marked
+failed. Every message carries a Message-ID derived from its key.
+
+SMTPStandIn is a small local SMTP server that keeps what it receives and
+can answer with temporary failures, for tests and the --demo burst.
+
+Usage:
+    python -m analytics.notify --demo                     # market-open burst against a local stand-in
+    python -m analytics.notify --smtp smtp.gmail.com:465 --ssl    # send the queue ($GMAIL_USER, $GMAIL_APP_PASSWORD)
+    python -m analytics.notify --status
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import smtplib
+import socketserver
+import sqlite3
+import ssl
+import sys
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+from analytics.ohlcv import CACHE_DIR
+
+# Carrier -> email-to-SMS gateway domain, as in api/alerts-batch.js
+CARRIER_GATEWAYS = {
+    'att': 'txt.att.net', 'verizon': 'vtext.com', 'tmobile': 'tmomail.net',
+    'sprint': 'messaging.sprintpcs.com', 'uscellular': 'email.uscc.net',
+    'metropcs': 'mymetropcs.com', 'metro': 'mymetropcs.com',
+    'cricket': 'sms.cricketwireless.net', 'boost': 'sms.myboostmobile.com',
+    'virgin': 'vmobl.com', 'republic': 'text.republicwireless.com',
+    'googlefi': 'msg.fi.google.com', 'mint': 'tmomail.net',
+    'visible': 'vtext.com', 'xfinity': 'vtext.com', 'consumer': 'mailmymobile.net',
+}
+ALERT_EMOJIS = {
+    'price': '📊', 'entry': '🎯', 'stop': '🛑', 'target': '💰', 'news': '📰',
+    'volume': '📈', 'pattern': '📐', 'default': '🔔',
+}
+SMS_CHARS = 140
+MESSAGE_CHARS = 200
+SUBJECT = 'MODUS'
+
+QUEUE_PATH = os.path.join(CACHE_DIR, 'notify', 'queue.sqlite')
+# Messages per second and burst size, per gateway domain and for the sending account
+GATEWAY_RATE, GATEWAY_BURST = 2.0, 20
+SENDER_RATE, SENDER_BURST = 10.0, 50
+# Messages per rolling day, as the serverless function's limiter
+DAILY_LIMIT = 100
+MAX_ATTEMPTS = 6
+RETRY_DELAY = 30.0
+
+Alert = namedtuple('Alert', 'key phone carrier symbol type message')
+Message = namedtuple('Message', 'key gateway address body attempts')
+
+# Section 1: Addresses and coalescing
+
+def sms_address(phone, carrier):
+    """Email-to-SMS address for a phone number and carrier; ValueError if either is invalid"""
+    gateway = CARRIER_GATEWAYS.get(str(carrier).lower())
+    if not gateway:
+        raise ValueError(f"unsupported carrier: {carrier}")
+    digits = ''.join(c for c in str(phone) if c.isdigit())
+    if len(digits) not in (10, 11):
+        raise ValueError(f"invalid phone number: {phone}")
+    return f"{digits[-10:]}@{gateway}"
+
+def alert_line(alert):
+    message = str(alert.message or '').replace('<', '').replace('>', '').strip()[:MESSAGE_CHARS]
+    return f"{ALERT_EMOJIS.get(alert.type, ALERT_EMOJIS['default'])} {str(alert.symbol or '')[:10]}: {message}"
+
+def coalesce(alerts):
+    """Group alerts into messages: (address, body, alert keys), each body at most SMS_CHARS where possible
+
+    Lines are packed in alert order per recipient; a single line longer than
+    SMS_CHARS goes out on its own.
+    """
+    lines = defaultdict(list)
+    for alert in alerts:
+        lines[sms_address(alert.phone, alert.carrier)].append((alert_line(alert), alert.key))
+    messages = []
+    for address, entries in lines.items():
+        batch, keys, length = [], [], 0
+        for line, key in entries:
+            if batch and length + len(line) + 1 > SMS_CHARS:
+                messages.append((address, '\n'.join(batch), keys))
+                batch, keys, length = [], [], 0
+            batch.append(line)
+            keys.append(key)
+            length += len(line) + 1
+        messages.append((address, '\n'.join(batch), keys))
+    return messages
+
+def message_key(address, keys):
+    return hashlib.sha256('\n'.join([address, *keys]).encode('utf-8')).hexdigest()[:32]
+
+# Section 2: Persistent queue
+
+class NotificationQueue:
+    """Outgoing messages in SQLite: alerts are recorded once, coalesced, and kept until sent or failed"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            key TEXT PRIMARY KEY,
+            gateway TEXT NOT NULL,
+            address TEXT NOT NULL,
+            body TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt REAL NOT NULL,
+            created REAL NOT NULL,
+            sent REAL,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS messages_due ON messages (state, next_attempt);
+        CREATE INDEX IF NOT EXISTS messages_sent ON messages (sent);
+        CREATE TABLE IF NOT EXISTS alerts (
+            key TEXT PRIMARY KEY,
+            message TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path=QUEUE_PATH, clock=time.time):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(self.SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def enqueue(self, alerts):
+        """Queue messages for alerts not seen before; return the new messages' keys
+
+        An alert with an invalid phone number or carrier does not hold up the
+        rest: it is recorded on its own as a failed message, with the reason.
+        """
+        batch = {}
+        for alert in alerts:
+            batch.setdefault(alert.key, alert)
+        invalid = {}
+        for key, alert in batch.items():
+            try:
+                sms_address(alert.phone, alert.carrier)
+            except ValueError as e:
+                invalid[key] = str(e)
+        with self._lock:
+            db = self._db
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                fresh = [alert for key, alert in batch.items()
+                         if db.execute('SELECT 1 FROM alerts WHERE key = ?', (key,)).fetchone() is None]
+                now = self.clock()
+                keys = []
+                for alert in fresh:
+                    if alert.key in invalid:
+                        key = message_key('', [alert.key])
+                        db.execute("INSERT OR IGNORE INTO messages (key, gateway, address, body, state, next_attempt, "
+                                   "created, error) VALUES (?, '', ?, ?, 'failed', ?, ?, ?)",
+                                   (key, str(alert.phone), alert_line(alert), now, now, invalid[alert.key]))
+                        db.execute('INSERT INTO alerts (key, message) VALUES (?, ?)', (alert.key, key))
+                for address, body, alert_keys in coalesce(a for a in fresh if a.key not in invalid):
+                    key = message_key(address, alert_keys)
+                    db.execute('INSERT OR IGNORE INTO messages (key, gateway, address, body, next_attempt, created) '
+                               'VALUES (?, ?, ?, ?, ?, ?)', (key, address.split('@')[1], address, body, now, now))
+                    db.executemany('INSERT INTO alerts (key, message) VALUES (?, ?)',
+                                   [(alert_key, key) for alert_key in alert_keys])
+                    keys.append(key)
+                db.execute('COMMIT')
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+        return keys
+
+    def due(self, limit=None):
+        """Queued messages whose next attempt is due, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, gateway, address, body, attempts FROM messages "
+                "WHERE state = 'queued' AND next_attempt <= ? ORDER BY created, key LIMIT ?",
+                (self.clock(), -1 if limit is None else limit),
+            ).fetchall()
+        return [Message(*row) for row in rows]
+
+    def next_attempt(self):
+        """When the earliest queued message is due, or None if nothing is queued"""
+        with self._lock:
+            return self._db.execute("SELECT MIN(next_attempt) FROM messages WHERE state = 'queued'").fetchone()[0]
+
+    def sent_since(self, since):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM messages WHERE sent >= ?', (since,)).fetchone()[0]
+
+    def _update(self, sql, args):
+        with self._lock:
+            self._db.execute(sql, args)
+
+    def mark_sent(self, key):
+        self._update("UPDATE messages SET state = 'sent', sent = ?, attempts = attempts + 1, error = NULL "
+                     "WHERE key = ?", (self.clock(), key))
+
+    def mark_retry(self, key, error, delay):
+        self._update("UPDATE messages SET attempts = attempts + 1, next_attempt = ?, error = ? WHERE key = ?",
+                     (self.clock() + delay, error, key))
+
+    def mark_failed(self, key, error):
+        self._update("UPDATE messages SET state = 'failed', attempts = attempts + 1, error = ? WHERE key = ?",
+                     (error, key))
+
+    def counts(self):
+        """state -> number of messages"""
+        with self._lock:
+            return dict(self._db.execute('SELECT state, COUNT(*) FROM messages GROUP BY state').fetchall())
+
+# Section 3: Rate limiting and connections
+
+class TokenBucket:
+    """rate tokens per second up to capacity; acquire() waits for a token"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+class SMTPPool:
+    """One reusable, authenticated SMTP connection per gateway domain"""
+
+    def __init__(self, host, port, user=None, password=None, ssl=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.ssl = ssl
+        self.timeout = timeout
+        self.opened = 0
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def connection(self, gateway):
+        with self._lock:
+            conn = self._connections.get(gateway)
+        if conn is None:
+            if self.ssl:
+                conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                        context=ssl.create_default_context())
+            else:
+                conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+                # SMTP() does not greet the server, so its extensions are only known after EHLO
+                conn.ehlo()
+                if conn.has_extn('starttls'):
+                    conn.starttls(context=ssl.create_default_context())
+                    conn.ehlo()
+                elif self.user:
+                    conn.close()
+                    raise smtplib.SMTPNotSupportedError(
+                        f"{self.host} does not offer STARTTLS; not sending credentials in cleartext")
+            if self.user:
+                conn.login(self.user, self.password)
+            with self._lock:
+                self._connections[gateway] = conn
+                self.opened += 1
+        return conn
+
+    def discard(self, gateway):
+        with self._lock:
+            conn = self._connections.pop(gateway, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+        for conn in connections:
+            try:
+                conn.quit()
+            except (OSError, smtplib.SMTPException):
+                conn.close()
+
+# Section 4: Dispatching
+
+class Dispatcher:
+    """Sends a queue's due messages, one worker and connection per gateway domain"""
+
+    def __init__(self, queue, pool, sender, gateway_rate=GATEWAY_RATE, gateway_burst=GATEWAY_BURST,
+                 rate=SENDER_RATE, burst=SENDER_BURST, daily_limit=DAILY_LIMIT, max_attempts=MAX_ATTEMPTS,
+                 retry_delay=RETRY_DELAY, max_workers=16):
+        self.queue = queue
+        self.pool = pool
+        self.sender = sender
+        self.bucket = TokenBucket(rate, burst)
+        self.gateway_buckets = defaultdict(lambda: TokenBucket(gateway_rate, gateway_burst))
+        self.daily_limit = daily_limit
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_workers = max_workers
+
+    def _email(self, message):
+        email = EmailMessage()
+        email['From'] = self.sender
+        email['To'] = message.address
+        email['Subject'] = SUBJECT
+        email['Message-ID'] = f"<{message.key}@modus-trading>"
+        email.set_content(message.body)
+        return email
+
+    def _retry(self, message, error):
+        if message.attempts + 1 >= self.max_attempts:
+            self.queue.mark_failed(message.key, error)
+            return 'failed'
+        self.queue.mark_retry(message.key, error, self.retry_delay * 2 ** message.attempts)
+        return 'retry'
+
+    def _deliver(self, gateway, email):
+        try:
+            self.pool.connection(gateway).send_message(email)
+        except smtplib.SMTPServerDisconnected:
+            # A pooled connection the server has closed since: reconnect once
+            self.pool.discard(gateway)
+            self.pool.connection(gateway).send_message(email)
+
+    def _send_gateway(self, gateway, messages):
+        results = defaultdict(int)
+        bucket = self.gateway_buckets[gateway]
+        for message in messages:
+            bucket.acquire()
+            self.bucket.acquire()
+            try:
+                self._deliver(gateway, self._email(message))
+            except smtplib.SMTPRecipientsRefused as e:
+                code, reply = next(iter(e.recipients.values()))
+                error = f"{code} {reply.decode('utf-8', 'replace')}"
+                if code >= 500:
+                    self.queue.mark_failed(message.key, error)
+                    results['failed'] += 1
+                else:
+                    results[self._retry(message, error)] += 1
+            except smtplib.SMTPResponseException as e:
+                error = f"{e.smtp_code} {e.smtp_error.decode('utf-8', 'replace')}"
+                if e.smtp_code >= 500:
+                    self.queue.mark_failed(message.key, error)
+                    results['failed'] += 1
+                else:
+                    results[self._retry(message, error)] += 1
+            except (smtplib.SMTPException, OSError) as e:
+                # Connection trouble: reconnect for the next message
+                self.pool.discard(gateway)
+                results[self._retry(message, f"{type(e).__name__}: {e}")] += 1
+            else:
+                self.queue.mark_sent(message.key)
+                results['sent'] += 1
+        return results
+
+    def dispatch(self):
+        """Send every due message once (within the daily limit); return outcome -> count"""
+        quota = None
+        if self.daily_limit is not None:
+            quota = max(0, self.daily_limit - self.queue.sent_since(self.queue.clock() - 86400))
+        groups = defaultdict(list)
+        for message in self.queue.due(quota):
+            groups[message.gateway].append(message)
+        totals = defaultdict(int)
+        if not groups:
+            return totals
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as pool:
+            for results in pool.map(lambda item: self._send_gateway(*item), groups.items()):
+                for outcome, count in results.items():
+                    totals[outcome] += count
+        return totals
+
+    def run(self, timeout=None):
+        """Dispatch until nothing is queued (or timeout seconds pass); return outcome -> count"""
+        totals = defaultdict(int)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for outcome, count in self.dispatch().items():
+                totals[outcome] += count
+            upcoming = self.queue.next_attempt()
+            if upcoming is None or (deadline is not None and time.monotonic() >= deadline):
+                return totals
+            if self.daily_limit is not None and self.queue.sent_since(self.queue.clock() - 86400) >= self.daily_limit:
+                return totals
+            time.sleep(max(0.0, upcoming - self.queue.clock()))
+
+# Section 5: Local SMTP stand-in
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server on localhost that keeps every message it accepts
+
+    fail maps a recipient address to how many times RCPT TO for it is
+    answered "451 try again later" before it is accepted.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, fail=None):
+        super().__init__(('127.0.0.1', port), _StandInHandler)
+        self.messages = []
+        self.connections = 0
+        self.fail = dict(fail or {})
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    def reply(self, text):
+        self.wfile.write(f"{text}\r\n".encode('ascii'))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost MODUS SMTP stand-in')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                sender, recipients = command.split(':', 1)[1].strip(' <>'), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip(' <>')
+                with server.lock:
+                    refuse = server.fail.get(address, 0) > 0
+                    if refuse:
+                        server.fail[address] -= 1
+                if refuse:
+                    self.reply('451 Try again later')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b'.\r\n', b'.\n'):
+                        break
+                    data.append(line[1:] if line.startswith(b'..') else line)
+                with server.lock:
+                    server.messages.append((sender, tuple(recipients), b''.join(data)))
+                self.reply('250 OK queued')
+            elif verb in ('RSET', 'NOOP'):
+                sender, recipients = (None, []) if verb == 'RSET' else (sender, recipients)
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+# Section 6: Demo and command line
+
+def market_open_burst(alerts=2000, recipients=300, seed=0):
+    """Seeded burst of triggered alerts: recipients on random carriers, several alerts each"""
+    rng = random.Random(seed)
+    carriers = sorted(CARRIER_GATEWAYS)
+    people = [(f"555{rng.randrange(10 ** 7):07d}", rng.choice(carriers)) for _ in range(recipients)]
+    symbols = ('NVDA', 'TSLA', 'AAPL', 'AMD', 'META', 'MSFT', 'AMZN', 'GOOGL', 'NFLX', 'COIN', 'PLTR', 'SPY')
+    burst = []
+    for i in range(alerts):
+        phone, carrier = rng.choice(people)
+        symbol = rng.choice(symbols)
+        price = rng.uniform(20, 900)
+        kind = rng.choice(('price', 'entry', 'stop', 'target'))
+        burst.append(Alert(f"alert-{i}", phone, carrier, symbol, kind,
+                           f"Price {rng.choice(('above', 'below'))} ${price:,.2f}"))
+    return burst
+
+def demo(alerts, recipients, flaky):
+    """Send a burst through a local stand-in, with temporary failures, and check nothing was lost or doubled"""
+    import email
+    import email.policy
+    import tempfile
+
+    burst = market_open_burst(alerts, recipients)
+    addresses = sorted({sms_address(a.phone, a.carrier) for a in burst})
+    fail = {address: 2 for address in random.Random(1).sample(addresses, min(flaky, len(addresses)))}
+    with tempfile.TemporaryDirectory() as directory, SMTPStandIn(fail=fail) as server:
+        queue = NotificationQueue(os.path.join(directory, 'queue.sqlite'))
+        start = time.perf_counter()
+        queue.enqueue(burst)
+        queue.enqueue(burst[: len(burst) // 2])     # resubmitted alerts are not sent again
+        pool = SMTPPool('127.0.0.1', server.port)
+        dispatcher = Dispatcher(queue, pool, 'alerts@modus-trading.app', gateway_rate=200, gateway_burst=50,
+                                rate=1000, burst=200, daily_limit=None, retry_delay=0.05)
+        totals = dispatcher.run()
+        pool.close()
+        elapsed = time.perf_counter() - start
+
+        received = [email.message_from_bytes(data, policy=email.policy.default) for _, _, data in server.messages]
+        lines = [line for message in received for line in message.get_content().splitlines()]
+        message_ids = [message['Message-ID'] for message in received]
+        gateways = {address.split('@')[1] for address in addresses}
+        print(f"{len(burst):,} alerts for {len(addresses)} recipients on {len(gateways)} gateways "
+              f"-> {len(server.messages):,} messages in {elapsed:.2f}s")
+        print(f"SMTP connections: {server.connections} ({len(gateways)} gateways); "
+              f"temporary failures retried: {totals['retry']}; queue: {queue.counts()}")
+        print(f"alert lines delivered: {len(lines):,} of {len(burst):,}; "
+              f"duplicate messages: {len(message_ids) - len(set(message_ids))}")
+        queue.close()
+    return 0 if len(lines) == len(burst) and len(set(message_ids)) == len(message_ids) else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send queued alert text messages through carrier gateways")
+    parser.add_argument('--queue', default=QUEUE_PATH, help="queue database (default: %(default)s)")
+    parser.add_argument('--smtp', metavar='HOST:PORT', help="SMTP server to send the queue through")
+    parser.add_argument('--ssl', action='store_true', help="connect with SMTP over SSL")
+    parser.add_argument('--daily-limit', type=int, default=DAILY_LIMIT,
+                        help=f"messages per rolling day (default: {DAILY_LIMIT})")
+    parser.add_argument('--status', action='store_true', help="print the queue's message counts")
+    parser.add_argument('--demo', action='store_true', help="send a synthetic burst through a local stand-in")
+    parser.add_argument('--alerts', type=int, default=2000, help="--demo alerts (default: 2,000)")
+    parser.add_argument('--recipients', type=int, default=300, help="--demo recipients (default: 300)")
+    parser.add_argument('--flaky', type=int, default=10, help="--demo recipients that fail twice first (default: 10)")
+    args = parser.parse_args(argv)
+
+    if args.demo:
+        return demo(args.alerts, args.recipients, args.flaky)
+    queue = NotificationQueue(args.queue)
+    if args.status or not args.smtp:
+        print(queue.counts())
+        return 0
+    host, _, port = args.smtp.partition(':')
+    user = os.environ.get('GMAIL_USER')
+    pool = SMTPPool(host, int(port or (465 if args.ssl else 25)), user,
+                    os.environ.get('GMAIL_APP_PASSWORD', '').replace(' ', ''), ssl=args.ssl)
+    totals = Dispatcher(queue, pool, user or 'alerts@modus-trading.app', daily_limit=args.daily_limit).run()
+    pool.close()
+    print(f"sent {totals['sent']}, retrying {totals['retry']}, failed {totals['failed']}; queue: {queue.counts()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
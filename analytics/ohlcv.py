@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - OHLCV Store
+Columnar, memory-mapped daily bars. A store is a directory holding one flat
+binary file per column plus an index:
+
+    index.json     format, price dtype, row count, and for each symbol the
+                   [first, last) rows of its bars in every column file
+    dates.bin      int64 days since 1970-01-01 (viewable as datetime64[D])
+    open.bin, high.bin, low.bin, close.bin
+                   prices as float32 or float64
+    volume.bin     float64
+
+Rows are grouped by symbol and sorted by date, so one symbol's bars over a
+date range are a contiguous slice: bars() finds the range by binary search
+over that symbol's dates and returns views straight into the memory map,
+without copying or reading anything else from disk.
+
+Usage:
+    python -m analytics.ohlcv ingest data/ohlcv --store STORE     # CSV files or directories
+    python -m analytics.ohlcv ingest chart.json --store STORE     # JSON (see read_json)
+    python -m analytics.ohlcv info --store STORE
+    python -m analytics.ohlcv show AAPL --start 2025-01-01 --store STORE
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from analytics.fixtures import FIXTURE_DIR, ROOT_DIR, Bars, read_csv
+
+CACHE_DIR = os.environ.get('MODUS_ANALYTICS_CACHE', os.path.join(ROOT_DIR, '.analytics_cache'))
+
+STORE_FORMAT = 1
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+FIELDS = PRICE_FIELDS + ('volume',)
+
+# One symbol's bars; every field is a 1-D view into the store
+SymbolBars = namedtuple('SymbolBars', 'symbol dates open high low close volume')
+
+# Section 1: Reading
+
+class OHLCVStore:
+    """Read-only view of a store directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'index.json'), encoding='utf-8') as f:
+            self.index = json.load(f)
+        if self.index.get('format') != STORE_FORMAT:
+            raise ValueError(f"{directory}: unsupported store format {self.index.get('format')!r}")
+        self.symbols = tuple(self.index['symbols'])
+        self._columns = {}
+
+    def __contains__(self, symbol):
+        return symbol in self.index['symbols']
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def column(self, name):
+        """Whole column as a read-only memory map, opened on first use"""
+        if name not in self._columns:
+            rows = self.index['rows']
+            if rows == 0:
+                self._columns[name] = np.empty(0, dtype=self._dtype(name))
+            else:
+                self._columns[name] = np.memmap(os.path.join(self.directory, f"{name}.bin"),
+                                                dtype=self._dtype(name), mode='r', shape=(rows,))
+        return self._columns[name]
+
+    def _dtype(self, name):
+        if name == 'dates':
+            return np.int64
+        return np.dtype(self.index['dtype']) if name in PRICE_FIELDS else np.float64
+
+    def _rows(self, symbol, start=None, end=None):
+        try:
+            first, last = self.index['symbols'][symbol]
+        except KeyError:
+            raise KeyError(f"{symbol} is not in {self.directory}") from None
+        dates = self.column('dates')[first:last]
+        lo = 0 if start is None else np.searchsorted(dates, _day(start), 'left')
+        hi = len(dates) if end is None else np.searchsorted(dates, _day(end), 'left')
+        return first + lo, first + hi
+
+    def dates(self, symbol, start=None, end=None):
+        """Trading days of symbol in [start, end) as a datetime64[D] view"""
+        lo, hi = self._rows(symbol, start, end)
+        return self.column('dates')[lo:hi].view('datetime64[D]')
+
+    def bars(self, symbol, start=None, end=None):
+        """Bars of symbol in [start, end), every field a zero-copy view"""
+        lo, hi = self._rows(symbol, start, end)
+        return SymbolBars(symbol, self.column('dates')[lo:hi].view('datetime64[D]'),
+                          *(self.column(name)[lo:hi] for name in FIELDS))
+
+    def panel(self, symbols=None, start=None, end=None):
+        """Bars for several symbols as (symbol, day) arrays over the union of their days
+
+        Unlike bars() this copies, since the symbols' rows are not adjacent;
+        days a symbol has no bar for are NaN.
+        """
+        symbols = tuple(symbols or self.symbols)
+        series = [self.bars(symbol, start, end) for symbol in symbols]
+        days = np.unique(np.concatenate([s.dates for s in series])) if series else np.empty(0, 'datetime64[D]')
+        fields = [np.full((len(symbols), len(days)), np.nan) for _ in FIELDS]
+        for i, s in enumerate(series):
+            at = np.searchsorted(days, s.dates)
+            for k, name in enumerate(FIELDS):
+                fields[k][i, at] = getattr(s, name)
+        return Bars(symbols, days, *fields)
+
+def _day(value):
+    return np.datetime64(value, 'D').astype(np.int64)
+
+# Section 2: Writing
+
+@contextlib.contextmanager
+def store_lock(directory):
+    """Exclusive lock on <directory>.lock, held across processes while a store is built or replaced"""
+    path = f"{os.path.abspath(directory).rstrip(os.sep)}.lock"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+        # Closing the file releases the lock
+        yield
+
+def _build(directory, series, dtype, source):
+    """Write a complete store next to directory and return its path"""
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"price dtype must be float32 or float64, not {dtype}")
+    tmp = f"{directory.rstrip(os.sep)}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    symbols = {}
+    rows = 0
+    files = {name: open(os.path.join(tmp, f"{name}.bin"), 'wb') for name in ('dates',) + FIELDS}
+    try:
+        for symbol, dates, *values in series:
+            if symbol in symbols:
+                raise ValueError(f"{symbol} appears more than once")
+            days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+            if len(values) != len(FIELDS):
+                raise ValueError(f"{symbol} has {len(values)} value columns, not {len(FIELDS)}")
+            columns = [np.asarray(column, dtype=dtype if name in PRICE_FIELDS else np.float64)
+                       for name, column in zip(FIELDS, values)]
+            for name, column in zip(FIELDS, columns):
+                if column.shape != days.shape:
+                    raise ValueError(f"{symbol} has {len(days)} dates but {column.size} {name} values")
+            order = np.argsort(days, kind='stable')
+            if np.any(np.diff(days[order]) == 0):
+                raise ValueError(f"{symbol} has more than one bar for a day")
+            files['dates'].write(days[order].tobytes())
+            for name, column in zip(FIELDS, columns):
+                files[name].write(column[order].tobytes())
+            symbols[symbol] = (rows, rows + len(days))
+            rows += len(days)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    finally:
+        for f in files.values():
+            f.close()
+
+    index = {'format': STORE_FORMAT, 'dtype': dtype.name, 'rows': rows, 'source': source, 'symbols': symbols}
+    with open(os.path.join(tmp, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    return tmp
+
+def _swap(tmp, directory):
+    # Two renames, so the store is only missing between them; call with store_lock held
+    old = f"{directory.rstrip(os.sep)}.{os.getpid()}.old"
+    if os.path.exists(directory):
+        os.replace(directory, old)
+    os.replace(tmp, directory)
+    shutil.rmtree(old, ignore_errors=True)
+
+def write_store(directory, series, dtype='float32', source=None):
+    """Write a store from an iterable of (symbol, dates, open, high, low, close, volume)
+
+    Each symbol's bars are sorted by date and appended column by column, so
+    memory use is bounded by the largest single symbol. The new store
+    replaces any existing one at directory only once it is complete, under
+    store_lock so concurrent writers take turns.
+    """
+    tmp = _build(directory, series, dtype, source)
+    with store_lock(directory):
+        _swap(tmp, directory)
+    return OHLCVStore(directory)
+
+# Section 3: Ingest
+
+def _csv_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith('.csv'))
+        else:
+            yield path
+
+def read_csvs(paths):
+    """Series from date,open,high,low,close,volume CSV files (or directories of them), one symbol per file"""
+    for path in _csv_paths(paths):
+        yield (os.path.splitext(os.path.basename(path))[0].upper(), *read_csv(path))
+
+def read_json(path):
+    """Series from a JSON file
+
+    Accepts either {"SYMBOL": [{"date": "YYYY-MM-DD", "open": ..., ...}, ...]}
+    or a Yahoo Finance chart response, the format the dashboard fetches.
+    Bars without a close are skipped.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if 'chart' in data:
+        for result in data['chart']['result']:
+            quote = result['indicators']['quote'][0]
+            dates = np.array(result['timestamp'], dtype='datetime64[s]').astype('datetime64[D]')
+            columns = [np.array(quote[name], dtype=np.float64) for name in FIELDS]
+            keep = ~np.isnan(columns[3])
+            yield (result['meta']['symbol'], dates[keep], *(c[keep] for c in columns))
+        return
+    for symbol, records in data.items():
+        records = [r for r in records if r.get('close') is not None]
+        dates = np.array([r['date'] for r in records], dtype='datetime64[D]')
+        yield (symbol, dates, *(np.array([r.get(name, np.nan) for r in records], dtype=np.float64)
+                                for name in FIELDS))
+
+def ingest(paths, directory, dtype='float32'):
+    """Build a store from CSV files, directories of CSV files and JSON files"""
+    def series():
+        for path in paths:
+            if path.endswith('.json'):
+                yield from read_json(path)
+            else:
+                yield from read_csvs([path])
+    return write_store(directory, series(), dtype, source=[os.path.abspath(p) for p in paths])
+
+def _signature(paths):
+    return [[os.path.basename(p), os.path.getsize(p), os.stat(p).st_mtime_ns] for p in paths]
+
+def fixture_store(fixture_dir=FIXTURE_DIR, directory=None):
+    """Store of the fixture CSVs, rebuilt whenever a fixture file changes"""
+    directory = directory or os.path.join(CACHE_DIR, 'ohlcv-fixtures')
+    paths = list(_csv_paths([fixture_dir]))
+    signature = _signature(paths)
+    try:
+        store = OHLCVStore(directory)
+        if store.index['source'] == signature:
+            return store
+    except (OSError, ValueError):
+        pass
+    # Workers starting together all miss; the first to get the lock builds, the rest find its store
+    with store_lock(directory):
+        try:
+            store = OHLCVStore(directory)
+            if store.index['source'] == signature:
+                return store
+        except (OSError, ValueError):
+            pass
+        _swap(_build(directory, read_csvs(paths), 'float64', signature), directory)
+    return OHLCVStore(directory)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar memory-mapped OHLCV store")
+    parser.add_argument('--store', default=os.path.join(CACHE_DIR, 'ohlcv'),
+                        help="store directory (default: .analytics_cache/ohlcv)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest_cmd = commands.add_parser('ingest', help="build the store from CSV/JSON files")
+    ingest_cmd.add_argument('paths', nargs='+', metavar='PATH')
+    ingest_cmd.add_argument('--dtype', choices=('float32', 'float64'), default='float32',
+                            help="price precision (default: float32)")
+    commands.add_parser('info', help="summarise the store")
+    show_cmd = commands.add_parser('show', help="print one symbol's bars")
+    show_cmd.add_argument('symbol')
+    show_cmd.add_argument('--start')
+    show_cmd.add_argument('--end')
+    args = parser.parse_args(argv)
+
+    if args.command == 'ingest':
+        store = ingest(args.paths, args.store, args.dtype)
+        print(f"Created: {args.store} ({len(store)} symbols, {store.index['rows']} bars)")
+    elif args.command == 'info':
+        store = OHLCVStore(args.store)
+        print(f"{args.store}: {len(store)} symbols, {store.index['rows']} bars, {store.index['dtype']} prices")
+        for symbol in store.symbols:
+            dates = store.dates(symbol)
+            print(f"  {symbol:<8}{len(dates):>6} bars  {dates[0] if len(dates) else '-'} .. {dates[-1] if len(dates) else '-'}")
+    else:
+        bars = OHLCVStore(args.store).bars(args.symbol.upper(), args.start, args.end)
+        print(f"{'date':<12}{'open':>10}{'high':>10}{'low':>10}{'close':>10}{'volume':>14}")
+        for row in zip(bars.dates, bars.open, bars.high, bars.low, bars.close, bars.volume):
+            print(f"{str(row[0]):<12}{row[1]:>10.2f}{row[2]:>10.2f}{row[3]:>10.2f}{row[4]:>10.2f}{row[5]:>14.0f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Options Pricing
+Prices, Greeks and implied volatility for whole option chains, as shown by
+the Options Trading module and the amateur guide's options tables
+
+European options are priced with Black-Scholes-Merton (continuous dividend
+yield) and analytic Greeks; American options with the Bjerksund-Stensland
+(1993) approximation, with Greeks by finite differences. Every function
+broadcasts over NumPy arrays, so a chain of strikes x expiries is priced
+in one pass. Implied volatilities are solved for all quotes at once:
+Newton-type steps on vega, kept inside a per-quote bracket that shrinks
+every iteration, with bisection wherever a step would leave the bracket
+or stops making progress.
+
+Theta is per year and vega and rho per 1.00 change in volatility or rate;
+divide by DAYS_PER_YEAR and 100 for per-day and per-point figures.
+
+Usage:
+    python -m analytics.options 100 105 30 --vol 0.3      # call and put, spot 100, strike 105, 30 days
+    python -m analytics.options --bench                   # time a large synthetic chain
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from analytics.fixtures import _rng
+
+DAYS_PER_YEAR = 365.0
+CONTRACT_SIZE = 100
+# Assumed risk-free rate for the guides' tables
+RISK_FREE_RATE = 0.045
+TRADING_DAYS = 252
+# (price below which, strike spacing) for listed strikes, highest last
+STRIKE_INCREMENTS = ((50, 1.0), (100, 2.5), (500, 5.0), (np.inf, 10.0))
+
+# Expiries and volatilities are floored here so expiring options price at intrinsic value
+MIN_EXPIRY = 1e-10
+MIN_VOL = 1e-10
+# Implied volatility search range, price tolerance and iteration cap
+IV_BOUNDS = (1e-4, 5.0)
+IV_TOLERANCE = 1e-8
+IV_ITERATIONS = 100
+# Bump sizes for American Greeks by finite differences (spot bumps are relative)
+BUMP = 1e-4
+
+Greeks = namedtuple('Greeks', 'price delta gamma theta vega rho')
+Leg = namedtuple('Leg', 'kind strike quantity premium')
+Chain = namedtuple('Chain', 'symbol spot strike expiry vol call put')
+
+# Section 1: Normal distribution
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+def norm_cdf(x):
+    """Standard normal CDF to double precision (Hart's algorithm, as given by West 2005)"""
+    x = np.asarray(x, dtype=np.float64)
+    a = np.minimum(np.abs(x), 37.0)
+    num = ((((((0.0352624965998911 * a + 0.700383064443688) * a + 6.37396220353165) * a + 33.912866078383) * a
+             + 112.079291497871) * a + 221.213596169931) * a + 220.206867912376)
+    den = (((((((0.0883883476483184 * a + 1.75566716318264) * a + 16.064177579207) * a + 86.7807322029461) * a
+              + 296.564248779674) * a + 637.333633378831) * a + 793.826512519948) * a + 440.413735824752)
+    lower = np.asarray(np.exp(-0.5 * a * a) * num / den)
+    # Beyond 5 sqrt(2) the continued fraction is the accurate form, and beyond 37 the tail underflows
+    tail = a >= 7.07106781186547
+    if tail.any():
+        t = a[tail]
+        lower[tail] = np.where(t < 37.0, np.exp(-0.5 * t * t) / (t + 1 / (t + 2 / (t + 3 / (t + 4 / (t + 0.65)))))
+                               / 2.506628274631, 0.0)
+    return np.where(x > 0, 1 - lower, lower)
+
+# Section 2: Pricing
+
+def _arrays(*values):
+    return np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in values))
+
+def black_scholes(spot, strike, expiry, rate, vol, dividend=0.0, call=True):
+    """European price and Greeks; expiry in years, call a bool or bool array; all arguments broadcast"""
+    S, K, T, r, v, q, is_call = _arrays(spot, strike, expiry, rate, vol, dividend, call)
+    T = np.maximum(T, MIN_EXPIRY)
+    v = np.maximum(v, MIN_VOL)
+    sign = np.where(is_call != 0, 1.0, -1.0)
+    sqrt_t = np.sqrt(T)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        d1 = (np.log(S / K) + (r - q + 0.5 * v * v) * T) / (v * sqrt_t)
+    d2 = d1 - v * sqrt_t
+    carry, discount = np.exp(-q * T), np.exp(-r * T)
+    n1, nd1, nd2 = norm_pdf(d1), norm_cdf(sign * d1), norm_cdf(sign * d2)
+    price = sign * (S * carry * nd1 - K * discount * nd2)
+    delta = sign * carry * nd1
+    gamma = carry * n1 / (S * v * sqrt_t)
+    vega = S * carry * n1 * sqrt_t
+    theta = -S * carry * n1 * v / (2 * sqrt_t) - sign * r * K * discount * nd2 + sign * q * S * carry * nd1
+    rho = sign * K * T * discount * nd2
+    return Greeks(price, delta, gamma, theta, vega, rho)
+
+def _phi(gamma, log_sh, log_si, power, T, r, b, v, vst):
+    # Bjerksund-Stensland's phi(S, T, gamma, H, I), from log(S / H), log(S / I) and S**gamma (power)
+    v2 = v * v
+    lam = (-r + gamma * b + 0.5 * gamma * (gamma - 1) * v2) * T
+    d = -(log_sh + (b + (gamma - 0.5) * v2) * T) / vst
+    kappa = 2 * b / v2 + 2 * gamma - 1
+    return np.exp(lam) * power * (norm_cdf(d) - np.exp(-kappa * log_si) * norm_cdf(d + 2 * log_si / vst))
+
+def _american_call(S, K, T, r, b, v):
+    """Bjerksund-Stensland (1993) call with cost of carry b; European where early exercise never pays"""
+    price = np.array(black_scholes(S, K, T, r, v, r - b, True).price)
+    early = b < r
+    if not early.any():
+        return price
+    S, K, T, r, b, v = (a[early] for a in (S, K, T, r, b, v))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        v2 = v * v
+        beta = (0.5 - b / v2) + np.sqrt((b / v2 - 0.5) ** 2 + 2 * r / v2)
+        b_inf = beta / (beta - 1) * K
+        b0 = np.maximum(K, r / (r - b) * K)
+        ht = -(b * T + 2 * v * np.sqrt(T)) * b0 / (b_inf - b0)
+        I = b0 + (b_inf - b0) * (1 - np.exp(ht))
+        vst = v * np.sqrt(T)
+        log_si, log_sk = np.log(S / I), np.log(S / K)
+        # alpha * S**beta with alpha = (I - K) * I**-beta, as (I - K) * (S / I)**beta
+        power = np.exp(beta * log_si)
+        value = ((I - K) * (power - _phi(beta, log_si, log_si, power, T, r, b, v, vst))
+                 + _phi(1, log_si, log_si, S, T, r, b, v, vst) - _phi(1, log_sk, log_si, S, T, r, b, v, vst)
+                 - K * _phi(0, log_si, log_si, 1.0, T, r, b, v, vst) + K * _phi(0, log_sk, log_si, 1.0, T, r, b, v, vst))
+        price[early] = np.where(S >= I, S - K, np.maximum(value, price[early]))
+    return price
+
+def bjerksund_stensland(spot, strike, expiry, rate, vol, dividend=0.0, call=True):
+    """American price (Bjerksund-Stensland 1993); puts by the put-call transformation; rate >= 0"""
+    S, K, T, r, v, q, is_call = _arrays(spot, strike, expiry, rate, vol, dividend, call)
+    T = np.maximum(T, MIN_EXPIRY)
+    v = np.maximum(v, MIN_VOL)
+    b = r - q
+    is_call = is_call != 0
+    # P(S, K, T, r, b) = C(K, S, T, r - b, -b)
+    price = _american_call(np.where(is_call, S, K), np.where(is_call, K, S), T,
+                           np.where(is_call, r, r - b), np.where(is_call, b, -b), v)
+    return np.maximum(price, np.maximum(np.where(is_call, S - K, K - S), 0.0))
+
+def price(spot, strike, expiry, rate, vol, dividend=0.0, call=True, american=False):
+    if american:
+        return bjerksund_stensland(spot, strike, expiry, rate, vol, dividend, call)
+    return black_scholes(spot, strike, expiry, rate, vol, dividend, call).price
+
+def greeks(spot, strike, expiry, rate, vol, dividend=0.0, call=True, american=False):
+    """Price and Greeks; analytic for European options, finite differences for American ones
+
+    Theta is a backward difference in time to expiry, the others are central.
+    """
+    if not american:
+        return black_scholes(spot, strike, expiry, rate, vol, dividend, call)
+    S, K, T, r, v, q, is_call = _arrays(spot, strike, expiry, rate, vol, dividend, call)
+
+    def value(S=S, T=T, r=r, v=v):
+        return bjerksund_stensland(S, K, T, r, v, q, is_call)
+
+    base = value()
+    dS = S * BUMP
+    up, down = value(S=S + dS), value(S=S - dS)
+    dT = np.maximum(np.minimum(BUMP, T / 2), MIN_EXPIRY)
+    return Greeks(
+        base,
+        (up - down) / (2 * dS),
+        (up - 2 * base + down) / (dS * dS),
+        (value(T=T - dT) - base) / dT,
+        (value(v=v + BUMP) - value(v=np.maximum(v - BUMP, MIN_VOL))) / (v + BUMP - np.maximum(v - BUMP, MIN_VOL)),
+        (value(r=r + BUMP) - value(r=np.maximum(r - BUMP, 0.0))) / (r + BUMP - np.maximum(r - BUMP, 0.0)),
+    )
+
+# Section 3: Implied volatility
+
+def price_bounds(spot, strike, expiry, rate, dividend=0.0, call=True, american=False):
+    """No-arbitrage (lower, upper) bounds of an option's price"""
+    S, K, T, r, q, is_call = _arrays(spot, strike, expiry, rate, dividend, call)
+    is_call = is_call != 0
+    forward_spot, discounted_strike = S * np.exp(-q * T), K * np.exp(-r * T)
+    lower = np.maximum(np.where(is_call, forward_spot - discounted_strike, discounted_strike - forward_spot), 0.0)
+    upper = np.where(is_call, forward_spot, discounted_strike)
+    if american:
+        lower = np.maximum(lower, np.where(is_call, S - K, K - S))
+        upper = np.where(is_call, S, K)
+    return lower, upper
+
+def implied_vol(premium, spot, strike, expiry, rate, dividend=0.0, call=True, american=False,
+                tolerance=IV_TOLERANCE, iterations=IV_ITERATIONS):
+    """Volatility at which each premium is the model price; NaN outside the no-arbitrage bounds
+
+    Quotes that even the top of IV_BOUNDS cannot reach are NaN too. The
+    steps are Halley's (Newton's with vomma as the curvature correction).
+    For American options they use the European vega and vomma, which are
+    close enough as slopes since the bracket and the bisection fallback
+    keep every step safe.
+    """
+    target, S, K, T, r, q, is_call = (a.ravel() for a in _arrays(premium, spot, strike, expiry, rate,
+                                                                 dividend, call))
+    shape = np.broadcast_shapes(*(np.shape(a) for a in (premium, spot, strike, expiry, rate, dividend, call)))
+    lower, upper = price_bounds(S, K, T, r, q, is_call, american)
+    result = np.full(target.shape, np.nan)
+    low_vol, high_vol = IV_BOUNDS
+
+    index = np.flatnonzero((target >= lower - tolerance) & (target < upper) & (T > 0))
+    # Everything but the volatility, worked out once per quote and compressed with the unsolved ones
+    quote = {'target': target, 'S': S, 'K': K, 'T': T, 'r': r, 'q': q, 'call': is_call}
+    quote = {name: values[index] for name, values in quote.items()}
+    quote['drift'] = np.log(quote['S'] / quote['K']) + (quote['r'] - quote['q']) * quote['T']
+    quote['sqrt_t'] = np.sqrt(quote['T'])
+    quote['carry'] = quote['S'] * np.exp(-quote['q'] * quote['T'])
+    quote['discount'] = quote['K'] * np.exp(-quote['r'] * quote['T'])
+    quote['sign'] = np.where(quote['call'] != 0, 1.0, -1.0)
+
+    def model(vol):
+        vst = vol * quote['sqrt_t']
+        d1 = quote['drift'] / vst + 0.5 * vst
+        vega = quote['carry'] * norm_pdf(d1) * quote['sqrt_t']
+        vomma = vega * d1 * (d1 - vst) / vol
+        if american:
+            value = bjerksund_stensland(quote['S'], quote['K'], quote['T'], quote['r'], vol, quote['q'], quote['call'])
+        else:
+            sign = quote['sign']
+            value = sign * (quote['carry'] * norm_cdf(sign * d1) - quote['discount'] * norm_cdf(sign * (d1 - vst)))
+        return value - quote['target'], vega, vomma
+
+    def keep(mask, *arrays):
+        nonlocal index, quote
+        index = index[mask]
+        quote = {name: values[mask] for name, values in quote.items()}
+        return [a[mask] for a in arrays]
+
+    # Premiums at or below the price at the bottom of the range (no time value to speak of)
+    diff, _, _ = model(np.full(len(index), low_vol))
+    at_floor = diff >= -tolerance
+    result[index[at_floor]] = low_vol
+    keep(~at_floor)
+
+    # Start from Corrado-Miller's approximation, on the call premium by put-call parity,
+    # or where it has no real value from Manaster-Koehler's
+    carry, discount = quote['carry'], quote['discount']
+    call_premium = np.where(quote['sign'] > 0, quote['target'], quote['target'] + carry - discount)
+    half = call_premium - (carry - discount) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        guess = (np.sqrt(2 * np.pi / quote['T']) / (carry + discount)
+                 * (half + np.sqrt(half * half - (carry - discount) ** 2 / np.pi)))
+        fallback = np.sqrt(2 * np.abs(quote['drift']) / quote['T'])
+    vol = np.clip(np.where(np.isfinite(guess) & (guess > 0), guess, fallback), 0.01, 3.0)
+    lo, hi = np.full(len(index), low_vol), np.full(len(index), high_vol)
+    previous = np.full(len(index), np.inf)
+    for _ in range(iterations):
+        if not len(index):
+            break
+        diff, vega, vomma = model(vol)
+        solved = np.abs(diff) <= tolerance
+        # A bracket that has closed without a match is either solved to float precision or against the top
+        closed = ~solved & (hi - lo <= tolerance * 1e-4)
+        result[index[solved]] = vol[solved]
+        result[index[closed]] = np.where(hi[closed] < high_vol, vol[closed], np.nan)
+        hi = np.where(diff > 0, vol, hi)
+        lo = np.where(diff < 0, vol, lo)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            step = vol - 2 * diff * vega / (2 * vega * vega - diff * vomma)
+        # Bisect where a step would leave the bracket or the last one did not halve the error
+        stalled = np.abs(diff) > 0.5 * previous
+        vol = np.where((step > lo) & (step < hi) & ~stalled, step, 0.5 * (lo + hi))
+        vol, lo, hi, previous = keep(~(solved | closed), vol, lo, hi, np.abs(diff))
+    return result.reshape(shape)
+
+# Section 4: Strategies and chains
+
+def payoff(legs, prices):
+    """Profit or loss per share of a strategy held to expiration, at each underlying price
+
+    A leg's kind is 'call', 'put' or 'stock'; quantity is negative for a
+    short leg; premium is what was paid per share (the entry price for stock).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    total = np.zeros_like(prices)
+    for leg in legs:
+        if leg.kind == 'call':
+            value = np.maximum(prices - leg.strike, 0.0)
+        elif leg.kind == 'put':
+            value = np.maximum(leg.strike - prices, 0.0)
+        elif leg.kind == 'stock':
+            value = prices
+        else:
+            raise ValueError(f"unknown leg kind: {leg.kind}")
+        total += leg.quantity * (value - leg.premium)
+    return total
+
+def realized_vol(close, window=20):
+    """Annualized volatility of the last window daily log returns"""
+    returns = np.diff(np.log(np.asarray(close, dtype=np.float64)[-window - 1:]))
+    return returns.std(ddof=1) * np.sqrt(TRADING_DAYS)
+
+def strike_increment(spot):
+    return next(step for below, step in STRIKE_INCREMENTS if spot < below)
+
+def vol_surface(spot, strike, expiry, atm_vol, skew=-0.15, smile=0.4, term=0.05):
+    """Volatility rising into the wings, more for low strikes, and flattening with expiry"""
+    expiry = np.asarray(expiry, dtype=np.float64)
+    moneyness = np.log(np.asarray(strike) / spot) / np.sqrt(np.maximum(expiry, 0.25))
+    vol = atm_vol * (1 + term * np.log(np.maximum(expiry, 1 / DAYS_PER_YEAR) * 4)) + skew * moneyness
+    return np.clip(vol + smile * atm_vol * moneyness ** 2, 0.05, 2.5)
+
+def synthetic_chain(symbol, spot, strikes, days, rate=RISK_FREE_RATE, dividend=0.0, seed=0, american=True):
+    """Seeded synthetic chain: (strike, expiry) grids of a made-up volatility surface and its prices"""
+    rng = _rng(seed, 'options', symbol)
+    atm_vol = rng.uniform(0.2, 0.6)
+    strike, expiry = np.meshgrid(np.asarray(strikes, dtype=np.float64),
+                                 np.asarray(days, dtype=np.float64) / DAYS_PER_YEAR, indexing='ij')
+    vol = vol_surface(spot, strike, expiry, atm_vol, skew=rng.uniform(-0.25, -0.05))
+    call = price(spot, strike, expiry, rate, vol, dividend, True, american)
+    put = price(spot, strike, expiry, rate, vol, dividend, False, american)
+    return Chain(symbol, spot, strike, expiry, vol, call, put)
+
+def _bench(strikes, expiries):
+    spot = 100.0
+    chain = synthetic_chain('BENCH', spot, np.linspace(20, 250, strikes), np.linspace(1, 730, expiries))
+    print(f"{chain.strike.size * 2:,} options ({strikes:,} strikes x {expiries} expiries, calls and puts)")
+    call = np.array([True, False])[:, None, None]
+    for label, american in (("European", False), ("American", True)):
+        start = time.perf_counter()
+        g = greeks(spot, chain.strike, chain.expiry, RISK_FREE_RATE, chain.vol, 0.0, call, american)
+        priced = time.perf_counter()
+        iv = implied_vol(g.price, spot, chain.strike, chain.expiry, RISK_FREE_RATE, 0.0, call, american)
+        solved = time.perf_counter()
+        # A premium without time value (an American option worth exercising) or vega fits a range of vols
+        intrinsic = np.maximum(np.where(call, spot - chain.strike, chain.strike - spot), 0.0)
+        error = np.abs(iv - chain.vol)[(g.vega > 0.01) & (g.price > intrinsic + 1e-6)].max()
+        print(f"{label}: price + Greeks {(priced - start) * 1000:.1f}ms, implied vol {(solved - priced) * 1000:.1f}ms "
+              f"({np.isfinite(iv).mean():.1%} solved, max error {error:.1e} with time value and vega)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Option prices, Greeks and implied volatility")
+    parser.add_argument('spot', type=float, nargs='?', default=100.0)
+    parser.add_argument('strike', type=float, nargs='?', default=100.0)
+    parser.add_argument('days', type=float, nargs='?', default=30.0, help="days to expiration (default: 30)")
+    parser.add_argument('--vol', type=float, default=0.3, help="volatility (default: 0.3)")
+    parser.add_argument('--rate', type=float, default=RISK_FREE_RATE, help=f"risk-free rate (default: {RISK_FREE_RATE})")
+    parser.add_argument('--dividend', type=float, default=0.0, help="dividend yield (default: 0)")
+    parser.add_argument('--american', action='store_true', help="price American rather than European options")
+    parser.add_argument('--bench', action='store_true', help="time a large synthetic chain instead")
+    parser.add_argument('--strikes', type=int, default=2000, help="--bench strikes (default: 2,000)")
+    parser.add_argument('--expiries', type=int, default=25, help="--bench expiries (default: 25)")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        _bench(args.strikes, args.expiries)
+        return 0
+    expiry = args.days / DAYS_PER_YEAR
+    print(f"{'':6} {'Price':>9} {'Delta':>8} {'Gamma':>8} {'Theta/day':>10} {'Vega/pt':>8} {'Rho/pt':>8} {'IV':>7}")
+    for label, call in (("Call", True), ("Put", False)):
+        g = greeks(args.spot, args.strike, expiry, args.rate, args.vol, args.dividend, call, args.american)
+        iv = implied_vol(g.price, args.spot, args.strike, expiry, args.rate, args.dividend, call, args.american)
+        print(f"{label:6} {g.price:9.4f} {g.delta:8.4f} {g.gamma:8.4f} {g.theta / DAYS_PER_YEAR:10.4f} "
+              f"{g.vega / 100:8.4f} {g.rho / 100:8.4f} {iv:7.2%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Timeframe Resampling
+Builds 5m/15m/1h/4h/1d/1w/1M bars from 1-minute bars, the timeframes the
+Live Ticker and Multi-Timeframe views offer
+
+Every bar is tagged with the start of the period it falls in, and since
+bars are in time order each period is a contiguous run: its first open,
+last close, and the max/min/sum of the run (np.maximum.reduceat and
+friends) give the period's bar in one pass over the data. Intraday periods
+are anchored at the session open (9:30, 9:35, ... for 5m; 9:30, 13:30 for
+4h) and never span two sessions; bars outside the session are dropped
+before resampling.
+
+A Resampler keeps every timeframe it builds and derives new ones from the
+coarsest cached timeframe that divides evenly into them, so 1w comes from
+1d bars rather than from a year of minutes.
+
+Usage:
+    python -m analytics.resample NVDA --timeframe 1h     # fixture-derived minutes
+    python -m analytics.resample --bench                 # time every timeframe
+"""
+
+import argparse
+import functools
+import sys
+import time
+
+import numpy as np
+
+from analytics.fixtures import _rng
+from analytics.ohlcv import SymbolBars, fixture_store
+
+# Timeframe -> period length in minutes, or a calendar unit: 'D' trading
+# day, 'W' week starting Monday, 'M' calendar month
+TIMEFRAMES = {
+    '1m': 1, '5m': 5, '15m': 15, '30m': 30, '1h': 60, '4h': 240,
+    '1d': 'D', '1w': 'W', '1M': 'M',
+}
+
+# US equities regular session in exchange-local minutes after midnight
+REGULAR_SESSION = (9 * 60 + 30, 16 * 60)
+MINUTES_PER_DAY = 24 * 60
+
+# Section 1: Periods
+
+def minutes_of(times):
+    """Timestamps as int64 minutes since 1970-01-01"""
+    return np.asarray(times).astype('datetime64[m]').astype(np.int64)
+
+def in_session(times, session=REGULAR_SESSION):
+    """Mask of timestamps inside [session open, session close)"""
+    minute = minutes_of(times) % MINUTES_PER_DAY
+    return (minute >= session[0]) & (minute < session[1])
+
+def period_starts(times, timeframe, session=REGULAR_SESSION):
+    """Start of the timeframe period each timestamp falls in
+
+    Intraday periods are datetime64[m], the rest datetime64[D].
+    """
+    unit = TIMEFRAMES[timeframe]
+    minutes = minutes_of(times)
+    day = minutes // MINUTES_PER_DAY
+    if isinstance(unit, int):
+        anchor = day * MINUTES_PER_DAY + session[0]
+        return (anchor + (minutes - anchor) // unit * unit).astype('datetime64[m]')
+    if unit == 'D':
+        return day.astype('datetime64[D]')
+    if unit == 'W':
+        # 1970-01-01 was a Thursday, so Monday-based weekday is (day + 3) % 7
+        return (day - (day + 3) % 7).astype('datetime64[D]')
+    return day.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]')
+
+def divides(fine, coarse):
+    """Whether every coarse period is made of whole fine periods"""
+    f, c = TIMEFRAMES[fine], TIMEFRAMES[coarse]
+    if isinstance(c, int):
+        return isinstance(f, int) and c % f == 0
+    return isinstance(f, int) or f == 'D' or f == c
+
+# Section 2: Resampling
+
+def resample(bars, timeframe, session=REGULAR_SESSION):
+    """Aggregate time-ordered bars into timeframe bars, labelled by period start"""
+    periods = period_starts(bars.dates, timeframe, session)
+    if len(periods) == 0:
+        return SymbolBars(bars.symbol, periods, *(np.empty(0) for _ in range(5)))
+    if np.any(periods[1:] < periods[:-1]):
+        raise ValueError(f"{bars.symbol}: bars are not in time order")
+    starts = np.flatnonzero(np.concatenate(([True], periods[1:] != periods[:-1])))
+    ends = np.append(starts[1:], len(periods)) - 1
+    return SymbolBars(
+        bars.symbol,
+        periods[starts],
+        np.asarray(bars.open)[starts],
+        np.maximum.reduceat(bars.high, starts),
+        np.minimum.reduceat(bars.low, starts),
+        np.asarray(bars.close)[ends],
+        np.add.reduceat(bars.volume, starts),
+    )
+
+class Resampler:
+    """One symbol's bars at every timeframe, each built once from the best cached source"""
+
+    def __init__(self, bars, timeframe='1m', session=REGULAR_SESSION):
+        keep = in_session(bars.dates, session) if isinstance(TIMEFRAMES[timeframe], int) else slice(None)
+        self.session = session
+        self._cache = {timeframe: SymbolBars(bars.symbol, *(np.asarray(field)[keep] for field in bars[1:]))}
+
+    def __getitem__(self, timeframe):
+        if timeframe not in self._cache:
+            sources = [tf for tf in self._cache if divides(tf, timeframe)]
+            if not sources:
+                raise ValueError(f"cannot build {timeframe} bars from {', '.join(self._cache)}")
+            source = min(sources, key=lambda tf: len(self._cache[tf].dates))
+            self._cache[timeframe] = resample(self._cache[source], timeframe, self.session)
+        return self._cache[timeframe]
+
+    @property
+    def cached(self):
+        return tuple(self._cache)
+
+# Section 3: Minute fixtures
+
+def synthetic_minutes(daily, seed=0, session=REGULAR_SESSION):
+    """Seeded 1-minute bars consistent with daily bars
+
+    Each session is a random bridge from the day's open to its close, kept
+    inside the day's range and touching its high and low once, with a
+    U-shaped volume profile summing to the day's volume. Resampling the
+    result to 1d gives back the daily bars.
+    """
+    rng = _rng(seed, 'minutes', daily.symbol)
+    days, minutes = len(daily.dates), session[1] - session[0]
+    o, h, l, c, v = (np.asarray(a, dtype=np.float64)[:, None] for a in daily[2:])
+    t = np.linspace(0, 1, minutes + 1)
+    walk = np.zeros((days, minutes + 1))
+    np.cumsum(rng.standard_normal((days, minutes)), axis=1, out=walk[:, 1:])
+    bridge = (walk - t * walk[:, -1:]) / np.sqrt(minutes)
+    path = np.clip(o + (c - o) * t + (h - l) * 0.5 * bridge, l, h)
+    path[:, 0], path[:, -1] = o[:, 0], c[:, 0]
+
+    m_open, m_close = path[:, :-1], path[:, 1:]
+    wick = (h - l) * 0.02 * np.abs(rng.standard_normal((days, minutes)))
+    m_high = np.minimum(np.maximum(m_open, m_close) + wick, h)
+    m_low = np.maximum(np.minimum(m_open, m_close) - wick, l)
+    rows = np.arange(days)
+    m_high[rows, np.argmax(m_high, axis=1)] = h[:, 0]
+    m_low[rows, np.argmin(m_low, axis=1)] = l[:, 0]
+
+    shape = 1 + 1.5 * (t[:-1] + t[1:] - 1) ** 2
+    weights = shape * rng.lognormal(0, 0.4, (days, minutes))
+    m_volume = np.floor(v * weights / weights.sum(axis=1, keepdims=True))
+    m_volume[:, -1] += v[:, 0] - m_volume.sum(axis=1)
+
+    times = (np.asarray(daily.dates, dtype='datetime64[D]').astype('datetime64[m]')[:, None]
+             + np.arange(session[0], session[1]).astype('timedelta64[m]'))
+    return SymbolBars(daily.symbol, times.ravel(),
+                      *(a.ravel() for a in (m_open, m_high, m_low, m_close, m_volume)))
+
+@functools.lru_cache(maxsize=32)
+def fixture_resampler(symbol):
+    """Resampler over synthetic minutes for a fixture symbol, shared within the process"""
+    return Resampler(synthetic_minutes(fixture_store().bars(symbol)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resample 1-minute bars to other timeframes")
+    parser.add_argument('symbol', nargs='?', default='SPY', help="fixture symbol (default: SPY)")
+    parser.add_argument('--timeframe', choices=TIMEFRAMES, default='1d')
+    parser.add_argument('--last', type=int, default=10, help="bars to print (default: 10)")
+    parser.add_argument('--bench', action='store_true', help="time building every timeframe instead")
+    args = parser.parse_args(argv)
+
+    symbol = args.symbol.upper()
+    if args.bench:
+        minutes = synthetic_minutes(fixture_store().bars(symbol))
+        start = time.perf_counter()
+        direct = {tf: resample(minutes, tf) for tf in TIMEFRAMES}
+        mid = time.perf_counter()
+        resampler = Resampler(minutes)
+        for tf in TIMEFRAMES:
+            resampler[tf]
+        done = time.perf_counter()
+        print(f"{len(minutes.dates):,} minute bars of {symbol}")
+        for tf, bars in direct.items():
+            print(f"  {tf:<4}{len(bars.dates):>9,} bars")
+        print(f"every timeframe from minutes: {(mid - start) * 1000:.1f}ms, "
+              f"cascaded through the cache: {(done - mid) * 1000:.1f}ms")
+        return 0
+
+    bars = fixture_resampler(symbol)[args.timeframe]
+    print(f"{'start':<18}{'open':>10}{'high':>10}{'low':>10}{'close':>10}{'volume':>14}")
+    for row in list(zip(*bars[1:]))[-args.last:]:
+        print(f"{str(row[0]):<18}{row[1]:>10.2f}{row[2]:>10.2f}{row[3]:>10.2f}{row[4]:>10.2f}{row[5]:>14.0f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Risk Calculator
+Position sizing and portfolio heat, as used by the Position Sizer and the
+guides' risk tables. Every function broadcasts over NumPy arrays, so a grid
+of account sizes x risk levels x stop distances is sized in one pass
+
+Usage:
+    python -m analytics.risk 25000 --risk 0.02 --entry 50 --stop 48
+    python -m analytics.risk --grid                 # time a large sizing grid
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+RiskProfile = namedtuple('RiskProfile', 'name risk_per_trade max_heat')
+
+# The MODUS risk levels: fraction of the account risked per trade, and the
+# most that may be at risk across all open positions at once
+RISK_PROFILES = (
+    RiskProfile("Conservative", 0.01, 0.03),
+    RiskProfile("Moderate", 0.02, 0.06),
+    RiskProfile("Aggressive", 0.03, 0.09),
+)
+
+# Share counts are floored after nudging up by this much, so that e.g.
+# $200 / $2.00 comes out as 100 shares rather than 99 from rounding error
+SHARE_EPSILON = 1e-9
+
+Sizing = namedtuple('Sizing', 'shares risk_per_share dollar_risk position_value heat')
+
+def position_size(account, risk, entry, stop, whole_shares=True, cap_to_account=True):
+    """Size positions so a stop-out loses risk x account; all arguments broadcast
+
+    With cap_to_account the position is also limited to what the account
+    can buy outright. heat is the dollar risk as a fraction of the account.
+    """
+    account, risk, entry, stop = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64)
+                                                       for a in (account, risk, entry, stop)))
+    per_share = np.abs(entry - stop)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(per_share > 0, account * risk / per_share, 0.0)
+        if cap_to_account:
+            shares = np.minimum(shares, np.where(entry > 0, account / entry, 0.0))
+    if whole_shares:
+        shares = np.floor(shares + SHARE_EPSILON)
+    dollar_risk = shares * per_share
+    with np.errstate(divide='ignore', invalid='ignore'):
+        heat = np.where(account > 0, dollar_risk / account, 0.0)
+    return Sizing(shares, per_share, dollar_risk, shares * entry, heat)
+
+def portfolio_heat(dollar_risk, account, axis=-1):
+    """Total open risk as a fraction of the account, summing dollar_risk along axis"""
+    return np.sum(dollar_risk, axis=axis) / np.asarray(account, dtype=np.float64)
+
+def max_positions(risk_per_trade, max_heat):
+    """Full-risk positions that fit under a heat limit"""
+    return np.floor(np.asarray(max_heat) / np.asarray(risk_per_trade) + SHARE_EPSILON).astype(np.int64)
+
+def sizing_grid(accounts, risks, stop_distances, entry=None):
+    """Size every combination of account, risk level and stop distance
+
+    Returns a Sizing of (account, risk, stop) arrays. Without an entry price
+    the share counts are not limited by buying power.
+    """
+    account, risk, distance = np.meshgrid(np.asarray(accounts, dtype=np.float64),
+                                          np.asarray(risks, dtype=np.float64),
+                                          np.asarray(stop_distances, dtype=np.float64), indexing='ij')
+    if entry is None:
+        return position_size(account, risk, distance, 0.0, cap_to_account=False)
+    return position_size(account, risk, entry, entry - distance)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Position sizing and portfolio heat")
+    parser.add_argument('account', type=float, nargs='?', default=10000, help="account size (default: 10000)")
+    parser.add_argument('--risk', type=float, default=0.02, help="fraction risked per trade (default: 0.02)")
+    parser.add_argument('--entry', type=float, default=50.0)
+    parser.add_argument('--stop', type=float, default=48.0)
+    parser.add_argument('--grid', action='store_true', help="time sizing a large grid instead")
+    args = parser.parse_args(argv)
+
+    if args.grid:
+        accounts = np.linspace(1000, 1000000, 1000)
+        risks = np.linspace(0.0025, 0.05, 20)
+        stops = np.linspace(0.05, 25, 500)
+        start = time.perf_counter()
+        sizing = sizing_grid(accounts, risks, stops, entry=100.0)
+        print(f"{sizing.shares.size:,} sizes in {time.perf_counter() - start:.3f}s")
+        return 0
+
+    sizing = position_size(args.account, args.risk, args.entry, args.stop)
+    print(f"Shares:         {sizing.shares:,.0f}")
+    print(f"Risk per share: ${sizing.risk_per_share:,.2f}")
+    print(f"Dollar risk:    ${sizing.dollar_risk:,.2f} ({sizing.heat:.2%} of account)")
+    print(f"Position value: ${sizing.position_value:,.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
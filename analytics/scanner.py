@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Daily Pick Scanner
+Scores the whole stockData.js universe for the Daily Pick filters: sector,
+strategy, volatility and market cap
+
+The universe is split into shards that a process pool scores in parallel.
+Within a shard every feature (ATR %, RSI, trend, breakout distance,
+relative volume, ...) is one array operation over the shard's (symbol, day)
+grid, and only the shard's k best picks come back; the shards' picks are
+merged into the overall top k with a bounded heap as they finish.
+
+Scores follow the dashboard's Daily Pick: a volatility-fit score against
+the chosen ATR % band (the same bands and formula as App.jsx) averaged with
+a 0-100 technical score for the chosen strategy. There is no market cap
+data in the repo, so size tiers are by average daily dollar volume.
+
+Symbols in the OHLCV fixture store (analytics.ohlcv) are priced from it,
+like every other analytics table; the rest of the universe has seeded
+synthetic bars with one factor per sector.
+
+Usage:
+    python -m analytics.scanner --strategy breakout --volatility medhigh
+    python -m analytics.scanner --sector Technology --cap large -k 5
+    python -m analytics.scanner --synthetic 5000 --jobs 8      # time a large universe
+"""
+
+import argparse
+import functools
+import heapq
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from analytics.fixtures import FIXTURE_END, FIXTURE_START, Bars, synthetic_bars, trading_days
+from analytics.indicators import atr, lag, rolling_max, rsi, sma
+from analytics.ohlcv import FIELDS, OHLCVStore, fixture_store
+from analytics.universe import load_universe
+
+# Volatility preference -> (min, max) ATR % band, as in the dashboard
+VOLATILITY_LEVELS = {
+    'low': (0.0, 1.2),
+    'lowmed': (0.8, 2.0),
+    'medium': (1.5, 3.5),
+    'medhigh': (2.5, 5.0),
+    'high': (4.0, 100.0),
+    'any': (0.0, 100.0),
+}
+
+# Size tier -> [min, max) average daily dollar volume
+CAP_TIERS = {
+    'small': (0, 1e9),
+    'mid': (1e9, 1e10),
+    'large': (1e10, np.inf),
+}
+
+SHARD_SIZE = 256
+# Days of history each score looks at; enough to warm up the 50-day average and RSI
+LOOKBACK = 120
+
+Pick = namedtuple('Pick', 'score ticker sector close atr_pct rsi change_20d rel_volume dollar_volume')
+
+# Section 1: Features and scores
+
+def features(bars):
+    """Latest-bar features of every symbol in bars, as 1-D arrays"""
+    high, low, close, volume = (a[:, -LOOKBACK:] for a in (bars.high, bars.low, bars.close, bars.volume))
+    last = close[:, -1]
+    return {
+        'close': last,
+        'atr_pct': atr(high, low, close)[:, -1] / last * 100,
+        'rsi': rsi(close)[:, -1],
+        'sma20': sma(close, 20)[:, -1],
+        'sma50': sma(close, 50)[:, -1],
+        'change_20d': last / lag(close, 20)[:, -1] - 1,
+        'high20': lag(rolling_max(high, 20))[:, -1],
+        'rel_volume': volume[:, -1] / sma(volume, 20)[:, -1],
+        'dollar_volume': sma(close * volume, 20)[:, -1],
+    }
+
+def volatility_fit(atr_pct, level):
+    """0-100 fit of ATR % to a volatility band, scored like the dashboard's Daily Pick"""
+    if level == 'any':
+        return np.full_like(atr_pct, 100.0)
+    lo, hi = VOLATILITY_LEVELS[level]
+    ideal = min((lo + hi) / 2, lo + 3)
+    buffer = min((hi - lo) * 0.3, 1.5)
+    outside = np.where(atr_pct < lo, lo - atr_pct, atr_pct - hi)
+    return np.select(
+        [(atr_pct >= lo) & (atr_pct <= hi), (atr_pct >= lo - buffer) & (atr_pct <= hi + buffer)],
+        [np.round(100 - np.abs(atr_pct - ideal) / ((hi - lo) / 2) * 20), np.maximum(30, np.round(70 - outside * 20))],
+        np.maximum(0, np.round(25 - outside * 10)),
+    )
+
+def technical_score(f, strategy):
+    """0-100 setup quality for a strategy: 'momentum', 'meanreversion' or 'breakout'"""
+    close, atr_dollars = f['close'], f['atr_pct'] * f['close'] / 100
+    if strategy == 'momentum':
+        aligned = ((close > f['sma20']).astype(float) + (f['sma20'] > f['sma50']) + (f['change_20d'] > 0)) / 3
+        # 20-day move in units of its expected size, and RSI best around 62 (strong, not overbought)
+        strength = f['change_20d'] / (f['atr_pct'] / 100 * np.sqrt(20))
+        rsi_fit = 1 - np.abs(f['rsi'] - 62.5) / 12.5
+        return 40 * aligned + 30 * np.clip(strength / 2, 0, 1) + 30 * np.clip(rsi_fit, 0, 1)
+    if strategy == 'meanreversion':
+        stretch = (f['sma20'] - close) / (2 * atr_dollars)
+        return 60 * np.clip((50 - f['rsi']) / 25, 0, 1) + 40 * np.clip(stretch, 0, 1)
+    if strategy == 'breakout':
+        distance = (close - f['high20']) / atr_dollars
+        return 60 * np.clip(distance + 1, 0, 1) + 40 * np.clip(f['rel_volume'] - 1, 0, 1)
+    raise ValueError(f"unknown strategy {strategy!r}")
+
+def score(f, strategy='momentum', volatility='medium', cap=None):
+    """Daily Pick score per symbol; -inf where the cap tier or widened volatility band excludes it"""
+    combined = (volatility_fit(f['atr_pct'], volatility) + technical_score(f, strategy)) / 2
+    lo, hi = VOLATILITY_LEVELS[volatility]
+    buffer = min((hi - lo) * 0.3, 1.5)
+    keep = (f['atr_pct'] >= lo - buffer) & (f['atr_pct'] <= hi + buffer) & np.isfinite(combined)
+    if cap is not None:
+        cap_lo, cap_hi = CAP_TIERS[cap]
+        keep &= (f['dollar_volume'] >= cap_lo) & (f['dollar_volume'] < cap_hi)
+    return np.where(keep, combined, -np.inf)
+
+# Section 2: Scanning
+
+def shard_bars(tickers, sectors, start, end, seed, store=None):
+    """Bars of a shard over the trading days in [start, end)
+
+    Symbols in the store at directory store come from it, the rest are
+    synthetic; days the store has no bar for are NaN.
+    """
+    stored = OHLCVStore(store) if store else None
+    own = [t for t in tickers if stored is None or t not in stored]
+    groups = {t: s for t, s in zip(tickers, sectors) if s is not None}
+    bars = synthetic_bars(own, start, end, seed, groups=groups)
+    if len(own) == len(tickers):
+        return bars
+
+    dates = trading_days(start, end)
+    fields = [np.full((len(tickers), len(dates)), np.nan) for _ in FIELDS]
+    rows = {t: i for i, t in enumerate(own)}
+    for i, ticker in enumerate(tickers):
+        if ticker in rows:
+            for k in range(len(FIELDS)):
+                fields[k][i] = bars[2 + k][rows[ticker]]
+            continue
+        s = stored.bars(ticker, start, end)
+        at = np.searchsorted(dates, s.dates)
+        found = at < len(dates)
+        found[found] = dates[at[found]] == s.dates[found]
+        for k, name in enumerate(FIELDS):
+            fields[k][i, at[found]] = getattr(s, name)[found]
+    return Bars(tuple(tickers), dates, *fields)
+
+@functools.lru_cache(maxsize=64)
+def shard_features(tickers, sectors, start, end, seed, store=None):
+    """Features of a shard; sectors is aligned with tickers. Kept per process for repeat scans"""
+    return features(shard_bars(tickers, sectors, start, end, seed, store))
+
+def scan_shard(tickers, sectors, strategy, volatility, cap, k, start, end, seed, store=None):
+    """Top k picks of one shard, best first"""
+    f = shard_features(tickers, sectors, start, end, seed, store)
+    scores = score(f, strategy, volatility, cap)
+    top = np.argsort(-scores, kind='stable')[:k]
+    return [Pick(round(float(scores[i]), 2), tickers[i], sectors[i],
+                 *(round(float(f[name][i]), 4) for name in Pick._fields[3:]))
+            for i in top if np.isfinite(scores[i])]
+
+def _rank(pick):
+    return -pick.score, pick.ticker
+
+def select_tickers(tickers=None, sectors=None):
+    """tickers (default: the stockData.js universe), restricted to sectors when given"""
+    universe = {s.ticker: s.sector for s in load_universe()}
+    tickers = tuple(tickers or universe)
+    if sectors:
+        tickers = tuple(t for t in tickers if universe.get(t) in sectors)
+    return tickers, universe
+
+def scan(tickers=None, strategy='momentum', volatility='medium', sectors=None, cap=None, k=10,
+         jobs=None, start=FIXTURE_START, end=FIXTURE_END, seed=0, store=None):
+    """Best k Daily Picks, highest score first (ties by ticker)
+
+    Prices come from the OHLCV store at directory store (default: the
+    fixture store) where it has the symbol, and are seeded synthetic bars
+    with one factor per sector otherwise, so a scan is reproducible.
+    jobs > 1 scores shards in that many worker processes.
+    """
+    tickers, universe = select_tickers(tickers, sectors)
+    store = store or fixture_store().directory
+    shards = [tickers[i:i + SHARD_SIZE] for i in range(0, len(tickers), SHARD_SIZE)]
+    args = [(shard, tuple(universe.get(t) for t in shard), strategy, volatility, cap, k, start, end, seed, store)
+            for shard in shards]
+    if jobs is None:
+        jobs = min(len(shards), os.cpu_count() or 1)
+
+    # Each shard's picks are folded into the running top k as the shard finishes
+    best = []
+    if jobs <= 1 or len(shards) <= 1:
+        for a in args:
+            best = heapq.nsmallest(k, best + scan_shard(*a), key=_rank)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for future in as_completed([pool.submit(scan_shard, *a) for a in args]):
+                best = heapq.nsmallest(k, best + future.result(), key=_rank)
+    return best
+
+def print_picks(picks):
+    print(f"{'#':>2}  {'ticker':<9}{'sector':<15}{'score':>7}{'close':>10}{'ATR %':>7}{'RSI':>6}{'20d':>8}{'rel vol':>9}")
+    for i, p in enumerate(picks, 1):
+        print(f"{i:>2}  {p.ticker:<9}{p.sector or '-':<15}{p.score:>7.1f}{p.close:>10.2f}{p.atr_pct:>7.2f}"
+              f"{p.rsi:>6.1f}{p.change_20d:>8.1%}{p.rel_volume:>9.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan the universe for Daily Pick candidates")
+    parser.add_argument('--strategy', choices=('momentum', 'meanreversion', 'breakout'), default='momentum')
+    parser.add_argument('--volatility', choices=VOLATILITY_LEVELS, default='medium')
+    parser.add_argument('--sector', action='append', help="only this sector (repeatable)")
+    parser.add_argument('--cap', choices=CAP_TIERS)
+    parser.add_argument('-k', type=int, default=10, help="picks to return (default: 10)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="worker processes (default: one per CPU, up to one per shard)")
+    parser.add_argument('--synthetic', type=int, metavar='SYMBOLS',
+                        help="scan this many synthetic symbols instead of the stockData.js universe")
+    args = parser.parse_args(argv)
+
+    tickers, _ = select_tickers(tuple(f"SYN{i}" for i in range(args.synthetic)) if args.synthetic else None,
+                                args.sector)
+    start = time.perf_counter()
+    picks = scan(tickers, args.strategy, args.volatility, None, args.cap, args.k, args.jobs)
+    elapsed = time.perf_counter() - start
+    print_picks(picks)
+    print(f"\nScanned {len(tickers)} symbols in {elapsed:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
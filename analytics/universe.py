@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Symbol Universe
+The dashboard's ticker universe, read from src/constants/stockData.js:
+COMPANY_NAMES supplies names and, through its "// Sector" comment headers,
+sectors; PRIORITY_STOCKS adds the symbols scanned without a name entry,
+taking their sector from its "// Tier N" headers
+
+The parsed symbols are cached in .analytics_cache/symbols.bin (marshal
+data behind a small header), so tools only parse the JavaScript when it
+has changed. The cache records the source's mtime, size and SHA-256: a
+matching mtime and size is trusted as is, and a changed mtime only forces
+a re-parse if the content hash differs too.
+
+Usage:
+    python -m analytics.universe AAPL NVDA          # look up symbols
+    python -m analytics.universe --prefix NV        # ticker or company name prefix
+    python -m analytics.universe --sector Energy
+    python -m analytics.universe --rebuild          # re-parse and time it
+"""
+
+import argparse
+import bisect
+import functools
+import hashlib
+import marshal
+import os
+import re
+import struct
+import sys
+import time
+from collections import namedtuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STOCK_DATA = os.path.join(ROOT_DIR, 'src', 'constants', 'stockData.js')
+# Same default as analytics.ohlcv.CACHE_DIR; not imported from there so
+# symbol lookups do not have to load NumPy
+CACHE_DIR = os.environ.get('MODUS_ANALYTICS_CACHE', os.path.join(ROOT_DIR, '.analytics_cache'))
+
+INDEX_MAGIC = b'MSYM'
+INDEX_FORMAT = 1
+# magic, format, source mtime_ns, source size, source SHA-256
+_INDEX_HEADER = struct.Struct('<4sHqq32s')
+
+# COMPANY_NAMES comment header -> sector
+SECTORS = {
+    'Mega Cap Tech': 'Technology',
+    'Semiconductors': 'Technology',
+    'AI / Cloud': 'Technology',
+    'Financial': 'Financials',
+    'Additional Fintech & Insurance': 'Financials',
+    'Healthcare': 'Healthcare',
+    'Biotech': 'Healthcare',
+    'Additional Biotech & Pharma (volatile)': 'Healthcare',
+    'Consumer': 'Consumer',
+    'Additional Consumer & Retail': 'Consumer',
+    'Industrial': 'Industrials',
+    'Additional Industrials & Defense': 'Industrials',
+    'Energy': 'Energy',
+    'Communication Services': 'Communication',
+    'Additional Telecom & Media': 'Communication',
+    'Materials': 'Materials',
+    'Real Estate': 'Real Estate',
+    'Additional REITs & Real Estate': 'Real Estate',
+    'Utilities': 'Utilities',
+    'ETFs': 'ETFs',
+    'Additional ETFs & Leveraged': 'ETFs',
+    'Crypto-related': 'Crypto',
+    'Additional Crypto Mining & Blockchain': 'Crypto',
+    'Additional International ADRs': 'International',
+    'Meme Stocks / Popular Trading': 'Speculative',
+    'Additional Small/Mid-Cap Growth & High Volatility': 'Speculative',
+    'Additional Cannabis & Specialty': 'Speculative',
+    'Additional Small-Cap Movers': 'Speculative',
+}
+
+# PRIORITY_STOCKS "// Tier N: ..." header -> sector, for symbols without a name entry
+TIER_SECTORS = {
+    'Large-Cap Tech': 'Technology',
+    'Software & Cloud': 'Technology',
+    'E-commerce & Internet': 'Consumer',
+    'Streaming & Entertainment': 'Communication',
+    'Fintech & Payments': 'Financials',
+    'Major Banks & Finance': 'Financials',
+    'Healthcare & Pharma': 'Healthcare',
+    'Energy - Oil & Gas': 'Energy',
+    'Clean Energy & EV': 'Energy',
+    'Consumer & Retail': 'Consumer',
+    'Industrial & Aerospace': 'Industrials',
+    'Travel & Leisure': 'Consumer',
+    'Materials & Mining': 'Materials',
+    'ETFs for market context': 'ETFs',
+    'AI & Quantum Computing (high volatility)': 'Technology',
+    'Crypto Mining & Bitcoin ETFs (high volatility)': 'Crypto',
+    'Leveraged ETFs (extreme volatility)': 'ETFs',
+    'Additional Biotech (volatile)': 'Healthcare',
+    'Space, Defense & Aviation (volatile growth)': 'Industrials',
+    'Cannabis & Meme Stocks (high volatility)': 'Speculative',
+    'Small-Cap Movers & SPACs (high volatility)': 'Speculative',
+    'Additional Software & SaaS': 'Technology',
+    'Additional Consumer Growth': 'Consumer',
+    'International ADRs': 'International',
+    'Additional REITs': 'Real Estate',
+    'Additional Finance & Insurance': 'Financials',
+    'Additional Telecom & Media': 'Communication',
+    'Additional Utilities & Staples': 'Utilities',
+}
+
+# Sectors of operating companies, in the order the guides list them
+CORE_SECTORS = (
+    'Technology', 'Communication', 'Consumer', 'Financials', 'Healthcare',
+    'Industrials', 'Energy', 'Materials', 'Real Estate', 'Utilities',
+)
+
+UNKNOWN_SECTOR = 'Other'
+
+Symbol = namedtuple('Symbol', 'ticker name sector')
+
+_BLOCK = r"export const {}\s*=\s*[\[{{](.*?)[\]}}];"
+_HEADER = re.compile(r"^\s*//\s*(.+?)\s*$")
+_ENTRY = re.compile(r"'([A-Z0-9.\-]+)'\s*:\s*'((?:[^'\\]|\\.)*)'")
+_TICKER = re.compile(r"'([A-Z0-9.\-]+)'")
+_TIER = re.compile(r"^Tier \d+:\s*")
+
+def _block(source, name):
+    match = re.search(_BLOCK.format(name), source, re.S)
+    if match is None:
+        raise ValueError(f"{STOCK_DATA}: {name} not found")
+    return match.group(1)
+
+def parse_stock_data(source):
+    """Symbols in stockData.js source, in COMPANY_NAMES order then PRIORITY_STOCKS order"""
+    symbols = {}
+    header = None
+    for line in _block(source, 'COMPANY_NAMES').splitlines():
+        comment = _HEADER.match(line)
+        if comment:
+            header = comment.group(1)
+            continue
+        for ticker, name in _ENTRY.findall(line):
+            if ticker not in symbols:
+                symbols[ticker] = Symbol(ticker, name.replace("\\'", "'"), SECTORS.get(header, UNKNOWN_SECTOR))
+    header = None
+    for line in _block(source, 'PRIORITY_STOCKS').splitlines():
+        comment = _HEADER.match(line)
+        if comment:
+            header = _TIER.sub('', comment.group(1))
+            continue
+        for ticker in _TICKER.findall(line):
+            if ticker not in symbols:
+                symbols[ticker] = Symbol(ticker, None, TIER_SECTORS.get(header, UNKNOWN_SECTOR))
+    return tuple(symbols.values())
+
+# Section 1: Symbol index
+
+class SymbolIndex:
+    """Symbols by ticker, by sector, and searchable by ticker or name prefix"""
+
+    def __init__(self, symbols):
+        self.symbols = tuple(symbols)
+        self._by_ticker = {s.ticker: s for s in self.symbols}
+        self.by_sector = {}
+        for s in self.symbols:
+            self.by_sector.setdefault(s.sector, []).append(s.ticker)
+        self.by_sector = {sector: tuple(tickers) for sector, tickers in self.by_sector.items()}
+        # Sorted (upper-cased key, ticker) pairs for bisecting on a prefix
+        self._tickers = sorted((s.ticker, s.ticker) for s in self.symbols)
+        self._names = sorted((s.name.upper(), s.ticker) for s in self.symbols if s.name)
+
+    def __getitem__(self, ticker):
+        return self._by_ticker[ticker.upper()]
+
+    def __contains__(self, ticker):
+        return ticker.upper() in self._by_ticker
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def get(self, ticker, default=None):
+        return self._by_ticker.get(ticker.upper(), default)
+
+    def sector(self, ticker):
+        """Sector of a ticker, UNKNOWN_SECTOR for tickers not in the universe"""
+        symbol = self.get(ticker)
+        return symbol.sector if symbol else UNKNOWN_SECTOR
+
+    def search(self, prefix, limit=None):
+        """Symbols whose ticker, then whose company name, starts with prefix (case-insensitive)"""
+        prefix = prefix.upper()
+        found = []
+        for keys in (self._tickers, self._names):
+            i = bisect.bisect_left(keys, (prefix,))
+            while i < len(keys) and keys[i][0].startswith(prefix):
+                if keys[i][1] not in found:
+                    found.append(keys[i][1])
+                i += 1
+        return [self._by_ticker[t] for t in found[:limit]]
+
+# Section 2: Binary cache
+
+def _source_hash(data):
+    return hashlib.sha256(data).digest()
+
+def write_index(path, symbols, stat, digest):
+    """Write symbols to a cache file stamped with their source's stat and hash"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_FORMAT, stat.st_mtime_ns, stat.st_size, digest))
+        f.write(marshal.dumps(tuple(tuple(s) for s in symbols)))
+    os.replace(tmp, path)
+
+def read_index(path, source=STOCK_DATA):
+    """Symbols from a cache file, or None if it is missing, unreadable or stale for source"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_INDEX_HEADER.size)
+            magic, version, mtime_ns, size, digest = _INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC or version != INDEX_FORMAT:
+                return None
+            stat = os.stat(source)
+            if stat.st_size != size:
+                return None
+            if stat.st_mtime_ns != mtime_ns:
+                # Touched but possibly unchanged: compare content before re-parsing
+                with open(source, 'rb') as src:
+                    if _source_hash(src.read()) != digest:
+                        return None
+                symbols = tuple(Symbol(*s) for s in marshal.loads(f.read()))
+                write_index(path, symbols, stat, digest)
+                return symbols
+            return tuple(Symbol(*s) for s in marshal.loads(f.read()))
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+def index_path(path=STOCK_DATA):
+    """Cache file for a stockData.js path"""
+    if os.path.abspath(path) == STOCK_DATA:
+        return os.path.join(CACHE_DIR, 'symbols.bin')
+    tag = hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"symbols-{tag}.bin")
+
+def build_index(path=STOCK_DATA):
+    """Parse stockData.js and rewrite its cache file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+        stat = os.fstat(f.fileno())
+    symbols = parse_stock_data(data.decode('utf-8'))
+    write_index(index_path(path), symbols, stat, _source_hash(data))
+    return SymbolIndex(symbols)
+
+@functools.lru_cache(maxsize=None)
+def symbol_index(path=STOCK_DATA):
+    """SymbolIndex for stockData.js, from the cache file when it is current"""
+    symbols = read_index(index_path(path), path)
+    return SymbolIndex(symbols) if symbols is not None else build_index(path)
+
+def load_universe(path=STOCK_DATA):
+    """Every symbol the dashboard knows about, in stockData.js order"""
+    return symbol_index(path).symbols
+
+def sector_members(universe, sectors=CORE_SECTORS):
+    """sector -> tuple of tickers, for the given sectors"""
+    return {sector: tuple(s.ticker for s in universe if s.sector == sector) for sector in sectors}
+
+def print_symbols(symbols):
+    for s in symbols:
+        print(f"{s.ticker:<8}{s.sector:<15}{s.name or '-'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up symbols in the stockData.js universe")
+    parser.add_argument('tickers', nargs='*', metavar='TICKER')
+    parser.add_argument('--prefix', help="ticker or company name prefix")
+    parser.add_argument('--sector', help="list a sector's tickers")
+    parser.add_argument('--rebuild', action='store_true', help="re-parse stockData.js and time cached vs parsed loads")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        start = time.perf_counter()
+        index = build_index()
+        parsed = time.perf_counter()
+        read_index(index_path())
+        cached = time.perf_counter()
+        print(f"Created: {os.path.relpath(index_path(), ROOT_DIR)} ({len(index)} symbols)")
+        print(f"parse {(parsed - start) * 1000:.2f}ms, cached load {(cached - parsed) * 1000:.2f}ms")
+        return 0
+
+    index = symbol_index()
+    if args.prefix:
+        print_symbols(index.search(args.prefix))
+    if args.sector:
+        print_symbols(index[t] for t in index.by_sector.get(args.sector, ()))
+    missing = [t for t in args.tickers if t not in index]
+    print_symbols(index[t] for t in args.tickers if t in index)
+    if missing:
+        print(f"Not in the universe: {', '.join(missing)}")
+        return 1
+    if not (args.tickers or args.prefix or args.sector):
+        counts = sorted(((len(t), s) for s, t in index.by_sector.items()), reverse=True)
+        print(f"{len(index)} symbols: " + ", ".join(f"{s} {n}" for n, s in counts))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Guide Generation Benchmarks
+Times each stage of the create_guides.py pipeline for every guide, plus
+synthetic stress guides, and compares the results against a saved baseline
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from reportlab import Version as REPORTLAB_VERSION
+from reportlab.pdfgen import canvas
+
+import create_guides as guides
+from guide_stream import FlowableStream, StreamingCanvas
+
+STAGES = ('styles', 'assembly', 'layout', 'serialize')
+
+# Timing changes smaller than this are treated as noise when comparing
+MIN_DELTA_SECONDS = 0.001
+
+# Paragraph counts of the synthetic stress guides; every tenth block is a table
+STRESS_SIZES = (500, 2000, 5000)
+
+LOREM = (
+    "Support and resistance levels mark prices where buyers or sellers have "
+    "previously stepped in. Volume confirms the move when it expands in the "
+    "direction of the breakout, and multi-timeframe alignment filters noise."
+)
+
+def stress_spec(paragraphs):
+    """Content spec for a synthetic guide with the given number of paragraphs"""
+    sections = []
+    per_section = 100
+    for first in range(0, paragraphs, per_section):
+        blocks = [{'subsection': f"Block {first // per_section + 1}"}]
+        for i in range(first, min(first + per_section, paragraphs)):
+            if i % 10 == 9:
+                rows = [["Symbol", "Entry", "Stop", "Target"]]
+                rows += [[f"T{i}{r}", f"{50 + r:.2f}", f"{48 + r:.2f}", f"{56 + r:.2f}"] for r in range(8)]
+                blocks.append({'table': rows, 'col_widths': [1.5, 1.2, 1.2, 1.2]})
+            else:
+                blocks.append({'body': f"{i + 1}. {LOREM}"})
+        sections.append({'title': f"Stress Section {len(sections) + 1}", 'blocks': blocks})
+    return {
+        'output': f"stress-{paragraphs}.pdf",
+        'title': f"Stress Guide ({paragraphs} paragraphs)",
+        'subtitle': "Synthetic benchmark content",
+        'accent': 'VIOLET',
+        'sections': sections,
+    }
+
+class _ByteCounter:
+    """Write-only sink that keeps the output size but not the output"""
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+def _timed_canvas(timings, base=canvas.Canvas):
+    """Canvas class that records how long the final PDF serialization takes"""
+    class TimedCanvas(base):
+        def save(self):
+            start = time.perf_counter()
+            base.save(self)
+            timings['serialize'] = time.perf_counter() - start
+    return TimedCanvas
+
+def run_pipeline(name, spec=None, stream=False):
+    """Run every stage of one guide build from cold caches
+
+    Returns (stage timings, stats) where stats holds the page, paragraph
+    and table counts and the size of the PDF produced. In stream mode
+    flowables are created during layout and pages are written as they are
+    finished, so 'assembly' only covers compiling the content and
+    'serialize' only the final pass after the last page.
+    """
+    guides.create_styles.cache_clear()
+    guides.level_style.cache_clear()
+    guides.data_table_style.cache_clear()
+    guides.load_guide.cache_clear()
+    timings = {}
+
+    start = time.perf_counter()
+    guides.create_styles()
+    timings['styles'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    guide = guides.load_guide(name) if spec is None else guides.compile_guide(name, spec)
+    if stream:
+        story = FlowableStream(guides.iter_story(guide.ops))
+    else:
+        story = guides.render_story(guide.ops)
+    timings['assembly'] = time.perf_counter() - start
+
+    # doc.build lays out and draws each page, then saves the canvas; the
+    # layout stage is everything except that final save
+    out = _ByteCounter()
+    doc = guides.guide_document(out)
+    start = time.perf_counter()
+    doc.build(story, canvasmaker=_timed_canvas(timings, StreamingCanvas if stream else canvas.Canvas))
+    timings['layout'] = time.perf_counter() - start - timings['serialize']
+
+    ops = [op[0] for op in guide.ops]
+    stats = {
+        'pages': doc.page,
+        'paragraphs': sum(ops.count(kind) for kind in ('para', 'brand', 'level')),
+        'tables': ops.count('table'),
+        'output_bytes': out.size,
+    }
+    return timings, stats
+
+def peak_memory(name, spec=None, stream=False):
+    """Peak traced allocation in bytes for one full build"""
+    tracemalloc.start()
+    try:
+        run_pipeline(name, spec, stream)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_guide(name, spec=None, repeat=5, stream=False):
+    """Benchmark one guide, returning a JSON-serializable result"""
+    # Untimed: a guide's first build also pays for importing NumPy and the
+    # analytics modules its generated blocks use, and for loading fixtures
+    run_pipeline(name, spec, stream)
+    samples = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        timings, stats = run_pipeline(name, spec, stream)
+        for stage in STAGES:
+            samples[stage].append(timings[stage])
+    totals = [sum(samples[stage][i] for stage in STAGES) for i in range(repeat)]
+
+    def summary(values):
+        return {'min': min(values), 'median': statistics.median(values)}
+
+    return {
+        'guide': name,
+        **stats,
+        'stages': {stage: summary(samples[stage]) for stage in STAGES},
+        'total': summary(totals),
+        'peak_memory': peak_memory(name, spec, stream),
+    }
+
+def run_benchmarks(names=None, stress_sizes=STRESS_SIZES, repeat=5, stream=False):
+    """Benchmark the selected guides and stress guides"""
+    results = [bench_guide(name, repeat=repeat, stream=stream) for name in names or guides.list_guides()]
+    for size in stress_sizes:
+        results.append(bench_guide(f"stress-{size}", stress_spec(size), max(1, repeat // 2), stream))
+    return {
+        'reportlab': REPORTLAB_VERSION,
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'stream': stream,
+        'results': results,
+    }
+
+def compare(report, baseline, threshold):
+    """Regressions of report against baseline as (guide, metric, old, new) tuples
+
+    Timings are compared on their minimum, which is the least noisy sample.
+    A metric regresses when it grows by more than threshold (0.25 = 25%);
+    timings must also grow by at least MIN_DELTA_SECONDS.
+    """
+    previous = {r['guide']: r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(result['guide'])
+        if old is None:
+            continue
+        metrics = [(stage, old['stages'][stage]['min'], result['stages'][stage]['min'], MIN_DELTA_SECONDS)
+                   for stage in STAGES]
+        metrics.append(('total', old['total']['min'], result['total']['min'], MIN_DELTA_SECONDS))
+        metrics.append(('peak_memory', old['peak_memory'], result['peak_memory'], 0))
+        metrics.append(('output_bytes', old['output_bytes'], result['output_bytes'], 0))
+        for metric, old_value, new_value, min_delta in metrics:
+            if old_value and new_value > old_value * (1 + threshold) and new_value - old_value > min_delta:
+                regressions.append((result['guide'], metric, old_value, new_value))
+    return regressions
+
+def print_report(report):
+    width = max([14] + [len(r['guide']) + 2 for r in report['results']])
+    print(f"{'guide':<{width}}{'pages':>6}{'paras':>7}{'styles':>9}{'assembly':>10}"
+          f"{'layout':>9}{'serialize':>11}{'total':>9}{'peak MB':>9}{'KB':>8}")
+    for r in report['results']:
+        ms = {stage: r['stages'][stage]['min'] * 1000 for stage in STAGES}
+        print(f"{r['guide']:<{width}}{r['pages']:>6}{r['paragraphs']:>7}"
+              f"{ms['styles']:>7.1f}ms{ms['assembly']:>8.1f}ms{ms['layout']:>7.1f}ms"
+              f"{ms['serialize']:>9.1f}ms{r['total']['min'] * 1000:>7.1f}ms"
+              f"{r['peak_memory'] / 2**20:>9.1f}{r['output_bytes'] / 1024:>8.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MODUS guide generation")
+    parser.add_argument('guides', nargs='*', metavar='GUIDE',
+                        help="guides to benchmark (default: all)")
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                        help="timed runs per guide (default: 5)")
+    parser.add_argument('--stress', type=int, nargs='*', default=list(STRESS_SIZES), metavar='PARAGRAPHS',
+                        help="paragraph counts of synthetic stress guides (none to skip)")
+    parser.add_argument('--stream', action='store_true',
+                        help="benchmark streaming builds (pages written as they are laid out)")
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON")
+    parser.add_argument('--baseline', metavar='PATH', help="compare against a saved JSON result")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed growth before a metric counts as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.guides, args.stress, args.repeat, args.stream)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for guide, metric, old, new in regressions:
+                print(f"  {guide:<14} {metric:<13} {old:.4g} -> {new:.4g} ({new / old - 1:+.0%})")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,26 +2,142 @@
 """
 MODUS Trading Dashboard - User Guides Generator
 Creates professional PDF guides for Beginner, Amateur, and Advanced users
+
+Usage:
+    python create_guides.py [build] [GUIDE ...] [options]    # build (default: all guides)
+    python create_guides.py list                             # guides and their output files
+    python create_guides.py check [GUIDE ...]                # compile and validate, no rendering
+    python create_guides.py bench [GUIDE ...] [options]      # see bench_guides.py
 """
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.colors import HexColor, white, black
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, ListFlowable, ListItem
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.pdfgen import canvas
-
-# Custom Colors (matching MODUS theme)
-VIOLET = HexColor('#8B5CF6')
-PURPLE = HexColor('#A855F7')
-DARK_BG = HexColor('#1E1B4B')
-SLATE = HexColor('#64748B')
-EMERALD = HexColor('#10B981')
-AMBER = HexColor('#F59E0B')
-
-def create_styles():
-    """Create custom paragraph styles"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import traceback
+from collections import namedtuple
+from types import MappingProxyType
+
+import guide_fonts
+
+# Custom Colors (matching MODUS theme), under the names content files and
+# tenant brandings refer to them by. They are kept as hex strings so that
+# commands which never render (list, check) do not have to import reportlab;
+# Branding.palette turns them into reportlab colours.
+PALETTE = {
+    'VIOLET': '#8B5CF6',
+    'PURPLE': '#A855F7',
+    'DARK_BG': '#1E1B4B',
+    'SLATE': '#64748B',
+    'EMERALD': '#10B981',
+    'AMBER': '#F59E0B',
+    'ROSE': '#F43F5E',
+}
+
+# Brandings whose styles each process keeps; a render service sees brandings
+# from its clients, so the per-branding caches must not grow without bound
+BRANDING_CACHE_SIZE = 32
+
+class Branding(namedtuple('Branding', 'name product tagline version url colours fonts')):
+    """White-label settings for a guide build
+
+    colours is a sorted tuple of (PALETTE name, '#RRGGBB') pairs and fonts
+    a sorted tuple of (role, base-14 name or .ttf path) pairs, see
+    guide_fonts. Brandings are hashable so styles and build cache keys can
+    be memoized per tenant.
+    """
+    __slots__ = ()
+
+    @property
+    def palette(self):
+        from reportlab.lib.colors import HexColor
+        return {name: HexColor(value) for name, value in self.colours}
+
+    @property
+    def font_names(self):
+        """role -> reportlab font name, registering any .ttf fonts on first use"""
+        return guide_fonts.register_family(self.fonts)
+
+DEFAULT_BRANDING = Branding(
+    name='modus',
+    product="MODUS",
+    tagline="Trading Dashboard",
+    version="Version 35 - Complete Edition",
+    url="https://modus-trading.vercel.app",
+    colours=tuple(sorted(PALETTE.items())),
+    fonts=tuple(sorted(guide_fonts.BASE14_FAMILY.items())),
+)
+
+# Page geometry shared by every guide
+INCH = 72.0
+PAGE_SIZE = (8.5*INCH, 11*INCH)    # US Letter
+PAGE_MARGIN = 0.75*INCH
+
+# Where builds write PDFs unless told otherwise (-o/--output-dir)
+OUTPUT_DIR = os.environ.get('MODUS_GUIDES_DIR', '.')
+TENANT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tenants')
+CACHE_DIR = os.environ.get(
+    'MODUS_GUIDE_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.guide_cache')
+)
+
+def tenant_path(tenant):
+    """Branding file for a tenant name, or the tenant itself if it is a .json path"""
+    return tenant if tenant.endswith('.json') else os.path.join(TENANT_DIR, f"{tenant}.json")
+
+def load_branding(tenant=None):
+    """Branding for a tenant: None, a tenants/<name>.json name or path, or a dict
+
+    Any field left out falls back to DEFAULT_BRANDING; "colours" only needs
+    the PALETTE entries the tenant overrides, e.g. {"VIOLET": "#0EA5E9"},
+    and "fonts" maps roles to .ttf files, e.g. {"regular": "Inter-Regular.ttf",
+    "bold": "Inter-Bold.ttf"} (relative paths are under fonts/).
+    """
+    if tenant is None:
+        return DEFAULT_BRANDING
+    if isinstance(tenant, Branding):
+        return tenant
+    if isinstance(tenant, str):
+        path = tenant_path(tenant)
+        with open(path, encoding='utf-8') as f:
+            spec = json.load(f)
+        spec.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+        return _branding_from_dict(spec)
+    return _branding_from_dict(tenant)
+
+def _branding_from_dict(spec):
+    colours = dict(DEFAULT_BRANDING.colours)
+    unknown = set(spec.get('colours', {})) - set(colours)
+    if unknown:
+        raise ValueError(f"unknown colour(s) in branding: {', '.join(sorted(unknown))}")
+    colours.update(spec.get('colours', {}))
+    fonts = guide_fonts.font_family(spec.get('fonts'))
+    fields = {k: spec[k] for k in Branding._fields if k in spec and k not in ('colours', 'fonts')}
+    return DEFAULT_BRANDING._replace(colours=tuple(sorted(colours.items())),
+                                     fonts=tuple(sorted(fonts.items())), **fields)
+
+@functools.lru_cache(maxsize=BRANDING_CACHE_SIZE)
+def create_styles(branding=DEFAULT_BRANDING):
+    """Create custom paragraph styles, once per process and branding
+
+    Returns a read-only name -> ParagraphStyle mapping shared by every build.
+    Derive a new ParagraphStyle instead of modifying one of these in place.
+    """
+    from reportlab.lib.colors import black
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    palette = branding.palette
+    fonts = branding.font_names
     styles = getSampleStyleSheet()
 
     # Title style
@@ -29,18 +145,19 @@ def create_styles():
         name='CustomTitle',
         parent=styles['Title'],
         fontSize=28,
-        textColor=VIOLET,
+        textColor=palette['VIOLET'],
         spaceAfter=30,
         alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
+        fontName=fonts['bold']
     ))
 
     # Subtitle
     styles.add(ParagraphStyle(
         name='Subtitle',
         parent=styles['Normal'],
+        fontName=fonts['regular'],
         fontSize=14,
-        textColor=SLATE,
+        textColor=palette['SLATE'],
         spaceAfter=20,
         alignment=TA_CENTER
     ))
@@ -50,10 +167,10 @@ def create_styles():
         name='SectionHeader',
         parent=styles['Heading1'],
         fontSize=18,
-        textColor=VIOLET,
+        textColor=palette['VIOLET'],
         spaceBefore=20,
         spaceAfter=12,
-        fontName='Helvetica-Bold'
+        fontName=fonts['bold']
     ))
 
     # Subsection Header
@@ -61,16 +178,17 @@ def create_styles():
         name='SubsectionHeader',
         parent=styles['Heading2'],
         fontSize=14,
-        textColor=PURPLE,
+        textColor=palette['PURPLE'],
         spaceBefore=15,
         spaceAfter=8,
-        fontName='Helvetica-Bold'
+        fontName=fonts['bold']
     ))
 
     # Body text
     styles.add(ParagraphStyle(
         name='CustomBody',
         parent=styles['Normal'],
+        fontName=fonts['regular'],
         fontSize=11,
         textColor=black,
         spaceAfter=8,
@@ -82,8 +200,9 @@ def create_styles():
     styles.add(ParagraphStyle(
         name='TipText',
         parent=styles['Normal'],
+        fontName=fonts['regular'],
         fontSize=10,
-        textColor=EMERALD,
+        textColor=palette['EMERALD'],
         spaceAfter=6,
         leftIndent=10
     ))
@@ -92,8 +211,9 @@ def create_styles():
     styles.add(ParagraphStyle(
         name='WarningText',
         parent=styles['Normal'],
+        fontName=fonts['regular'],
         fontSize=10,
-        textColor=AMBER,
+        textColor=palette['AMBER'],
         spaceAfter=6,
         leftIndent=10
     ))
@@ -102,828 +222,1053 @@ def create_styles():
     styles.add(ParagraphStyle(
         name='BulletText',
         parent=styles['Normal'],
+        fontName=fonts['regular'],
         fontSize=11,
         textColor=black,
         leftIndent=20,
         spaceAfter=4
     ))
 
-    return styles
-
-def add_cover_page(story, styles, title, subtitle, level_color):
-    """Add a cover page to the guide"""
-    story.append(Spacer(1, 2*inch))
+    return MappingProxyType(dict(styles.byName))
 
-    # Main title
-    story.append(Paragraph("MODUS", styles['CustomTitle']))
-    story.append(Paragraph("Trading Dashboard", styles['Subtitle']))
-    story.append(Spacer(1, 0.5*inch))
+@functools.lru_cache(maxsize=BRANDING_CACHE_SIZE * len(PALETTE))
+def level_style(accent, branding=DEFAULT_BRANDING):
+    """Cover-page level title style in one of the PALETTE colours"""
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle
 
-    # Guide level
-    level_style = ParagraphStyle(
+    return ParagraphStyle(
         name='LevelTitle',
-        parent=styles['Title'],
+        parent=create_styles(branding)['Title'],
         fontSize=24,
-        textColor=level_color,
+        fontName=branding.font_names['bold'],
+        textColor=branding.palette[accent],
         alignment=TA_CENTER
     )
-    story.append(Paragraph(title, level_style))
-    story.append(Spacer(1, 0.3*inch))
-    story.append(Paragraph(subtitle, styles['Subtitle']))
 
-    story.append(Spacer(1, 2*inch))
-
-    # Version info
-    story.append(Paragraph("Version 35 - Complete Edition", styles['Subtitle']))
-    story.append(Paragraph("https://modus-trading.vercel.app", styles['Subtitle']))
-
-    story.append(PageBreak())
+# ============================================================
+# Guide content
+# ============================================================
+#
+# Guide text lives in guides/<name>.json. Each file is compiled once per
+# process into a tuple of flat, immutable ops:
+#
+#   ('para', style_name, text)     Paragraph in one of create_styles()
+#   ('brand', style_name, field)   Paragraph showing a field of the Branding
+#   ('level', colour_name, text)   cover-page level title in an accent colour
+#   ('spacer', height_in_inches)
+#   ('table', rows, col_widths_in_inches)
+#   ('heatmap', row_labels, col_labels, values, col_widths_in_inches)
+#   ('chart', chart_data, width_in_inches, height_in_inches)
+#                                  candlestick chart (analytics.decimation.ChartData)
+#   ('pagebreak',)
+#
+# and render_story() turns the ops into fresh flowables for each build.
+# Ops never depend on the tenant; branding is applied while rendering.
+
+GUIDE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'guides')
+
+CompiledGuide = namedtuple('CompiledGuide', 'name output ops')
+
+def add_cover_page(ops, title, subtitle, accent):
+    """Add a cover page to the guide"""
+    ops += [
+        ('spacer', 2),
+        # Main title
+        ('brand', 'CustomTitle', 'product'),
+        ('brand', 'Subtitle', 'tagline'),
+        ('spacer', 0.5),
+        # Guide level
+        ('level', accent, title),
+        ('spacer', 0.3),
+        ('para', 'Subtitle', subtitle),
+        ('spacer', 2),
+        # Version info
+        ('brand', 'Subtitle', 'version'),
+        ('brand', 'Subtitle', 'url'),
+        ('pagebreak',),
+    ]
 
-def add_toc(story, styles, sections):
+def add_toc(ops, sections):
     """Add table of contents"""
-    story.append(Paragraph("Table of Contents", styles['SectionHeader']))
-    story.append(Spacer(1, 0.2*inch))
-
+    ops += [('para', 'SectionHeader', "Table of Contents"), ('spacer', 0.2)]
     for i, section in enumerate(sections, 1):
-        story.append(Paragraph(f"{i}. {section}", styles['CustomBody']))
-
-    story.append(PageBreak())
-
-def create_beginner_guide():
-    """Create the Beginner's Guide PDF"""
-    doc = SimpleDocTemplate(
-        "/sessions/gifted-charming-curie/mnt/Tradevision_MODUS/MODUS_Beginners_Guide.pdf",
-        pagesize=letter,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch
-    )
-
-    styles = create_styles()
-    story = []
-
-    # Cover Page
-    add_cover_page(story, styles, "Beginner's Guide", "Your First Steps to Smarter Trading", EMERALD)
-
-    # Table of Contents
-    sections = [
-        "What is MODUS?",
-        "Getting Started",
-        "Understanding the Dashboard",
-        "Your First Chart Analysis",
-        "Setting Up Price Alerts",
-        "Using Ask AI",
-        "Essential Tips for Beginners"
-    ]
-    add_toc(story, styles, sections)
-
-    # Section 1: What is MODUS?
-    story.append(Paragraph("1. What is MODUS?", styles['SectionHeader']))
-    story.append(Paragraph(
-        "MODUS is an AI-powered trading dashboard designed to help traders make informed decisions. "
-        "It combines real-time market data with artificial intelligence to provide chart analysis, "
-        "price alerts, and trading insights - all in one intuitive interface.",
-        styles['CustomBody']
-    ))
-    story.append(Spacer(1, 0.1*inch))
-
-    story.append(Paragraph("Key Features:", styles['SubsectionHeader']))
-    features = [
-        "Live stock charts with real-time price updates",
-        "AI-powered chart analysis that identifies patterns and trends",
-        "Price alerts with SMS and browser notifications",
-        "Daily Pick - AI selects the best trading opportunity each day",
-        "Ask AI - Get answers to any trading question",
-        "Position sizing calculator for risk management",
-        "Trading journal to track your trades"
-    ]
-    for feature in features:
-        story.append(Paragraph(f"• {feature}", styles['BulletText']))
-
-    story.append(PageBreak())
-
-    # Section 2: Getting Started
-    story.append(Paragraph("2. Getting Started", styles['SectionHeader']))
-
-    story.append(Paragraph("Step 1: Access the App", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "Open your web browser and navigate to modus-trading.vercel.app. The app works on any device - "
-        "desktop, tablet, or mobile phone. No download or installation required!",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Step 2: Enable Notifications", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "When prompted, click 'Allow' to enable browser notifications. This lets MODUS alert you "
-        "when your price alerts trigger, even if you're in another tab.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Step 3: Add Your API Key (Optional)", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "For AI features, click the Settings gear icon and enter your Anthropic API key. "
-        "You can also enable 'Backend API' mode if available, which stores your key securely on the server.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("TIP: Keep the browser tab open for alerts to work!", styles['TipText']))
-
-    story.append(PageBreak())
-
-    # Section 3: Understanding the Dashboard
-    story.append(Paragraph("3. Understanding the Dashboard", styles['SectionHeader']))
-
-    story.append(Paragraph("The Sidebar (Left Side)", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "The sidebar contains all navigation options organized into categories:",
-        styles['CustomBody']
-    ))
-
-    nav_items = [
-        ("Live Ticker", "View real-time charts for any stock"),
-        ("Market Overview", "See overall market conditions and indices"),
-        ("Chart Analysis", "Get AI-powered analysis of any chart"),
-        ("Alerts", "Set and manage price alerts"),
-        ("Daily Pick", "AI's top trading pick for the day"),
-        ("Ask AI", "Ask any trading question"),
-        ("Journal", "Track and analyze your trades"),
-        ("Portfolio", "Monitor your holdings")
-    ]
-
-    for item, desc in nav_items:
-        story.append(Paragraph(f"<b>{item}</b> - {desc}", styles['BulletText']))
-
-    story.append(Paragraph("The Header (Top)", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "The header shows the current time, a status indicator showing background activity, "
-        "and quick access buttons for Position Sizer, History, and Settings.",
-        styles['CustomBody']
-    ))
-
-    story.append(PageBreak())
-
-    # Section 4: Your First Chart Analysis
-    story.append(Paragraph("4. Your First Chart Analysis", styles['SectionHeader']))
-
-    steps = [
-        ("Click 'Live Ticker'", "Select it from the sidebar to open the chart view."),
-        ("Enter a Stock Symbol", "Type a ticker symbol like AAPL, TSLA, or SPY in the search box."),
-        ("Click 'Get Live Data'", "This loads the real-time chart for your selected stock."),
-        ("Choose a Timeframe", "Select from 1 minute to 1 month views. Start with '1 Day' for beginners."),
-        ("Click 'Chart Analysis'", "Navigate to the Chart Analysis section in the sidebar."),
-        ("Run the Analysis", "Click 'Analyze Chart' and wait 5-10 seconds for the AI to process."),
-        ("Read the Results", "The AI provides trend direction, support/resistance levels, and trade suggestions.")
-    ]
-
-    for i, (step, desc) in enumerate(steps, 1):
-        story.append(Paragraph(f"<b>Step {i}: {step}</b>", styles['CustomBody']))
-        story.append(Paragraph(desc, styles['BulletText']))
-
-    story.append(Spacer(1, 0.2*inch))
-    story.append(Paragraph("TIP: The AI works best with 1-hour or 1-day timeframes for clearer patterns.", styles['TipText']))
-
-    story.append(PageBreak())
-
-    # Section 5: Setting Up Price Alerts
-    story.append(Paragraph("5. Setting Up Price Alerts", styles['SectionHeader']))
-
-    story.append(Paragraph(
-        "Price alerts notify you when a stock reaches your target price. You'll hear 3 rapid beeps "
-        "and can optionally receive SMS notifications.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Creating an Alert:", styles['SubsectionHeader']))
-    alert_steps = [
-        "Go to 'Alerts' in the sidebar",
-        "Click 'Create Alert'",
-        "Enter the stock symbol (e.g., AAPL)",
-        "Choose condition: Above, Below, or Equals",
-        "Enter your target price",
-        "Click 'Create Alert'"
-    ]
-    for step in alert_steps:
-        story.append(Paragraph(f"• {step}", styles['BulletText']))
-
-    story.append(Paragraph("Setting Up SMS Alerts:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "In Settings, enable SMS Alerts, enter your phone number, and select your carrier. "
-        "When an alert triggers, you'll receive a text message!",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("WARNING: Keep the browser tab open - alerts only work when the app is running.", styles['WarningText']))
-
-    story.append(PageBreak())
-
-    # Section 6: Using Ask AI
-    story.append(Paragraph("6. Using Ask AI", styles['SectionHeader']))
-
-    story.append(Paragraph(
-        "Ask AI is your personal trading mentor. You can ask any question about trading, "
-        "technical analysis, chart patterns, risk management, and more.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Example Questions to Ask:", styles['SubsectionHeader']))
-    questions = [
-        "What is a head and shoulders pattern?",
-        "How do I calculate position size?",
-        "What does RSI mean and how do I use it?",
-        "Explain support and resistance levels",
-        "What's the difference between a limit and market order?",
-        "How much should I risk per trade?"
-    ]
-    for q in questions:
-        story.append(Paragraph(f"• \"{q}\"", styles['BulletText']))
-
-    story.append(Spacer(1, 0.2*inch))
-    story.append(Paragraph("TIP: Be specific in your questions for more detailed answers.", styles['TipText']))
-
-    story.append(PageBreak())
-
-    # Section 7: Essential Tips
-    story.append(Paragraph("7. Essential Tips for Beginners", styles['SectionHeader']))
-
-    tips = [
-        ("Start with Paper Trading", "Practice with simulated money before risking real capital."),
-        ("Use Longer Timeframes", "1-hour and daily charts are easier to read than 1-minute charts."),
-        ("Set Stop Losses", "Always know your exit point before entering a trade."),
-        ("Don't Overtrade", "Quality over quantity - wait for good setups."),
-        ("Keep a Trading Journal", "Use the Journal feature to track and learn from your trades."),
-        ("Trust the Process", "Consistent small gains beat occasional big wins."),
-        ("Keep Learning", "Use Ask AI to continuously expand your trading knowledge.")
-    ]
-
-    for title, desc in tips:
-        story.append(Paragraph(f"<b>{title}</b>", styles['CustomBody']))
-        story.append(Paragraph(desc, styles['BulletText']))
-        story.append(Spacer(1, 0.1*inch))
-
-    # Build PDF
-    doc.build(story)
-    print("Created: MODUS_Beginners_Guide.pdf")
-
-def create_amateur_guide():
-    """Create the Amateur Guide PDF"""
-    doc = SimpleDocTemplate(
-        "/sessions/gifted-charming-curie/mnt/Tradevision_MODUS/MODUS_Amateur_Guide.pdf",
-        pagesize=letter,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch
-    )
-
-    styles = create_styles()
-    story = []
-
-    # Cover Page
-    add_cover_page(story, styles, "Amateur Guide", "Level Up Your Trading Game", AMBER)
-
-    # Table of Contents
-    sections = [
-        "Multi-Timeframe Analysis",
-        "Advanced Chart Analysis Features",
-        "Optimizing Daily Pick",
-        "Position Sizing Mastery",
-        "Options Trading Module",
-        "Portfolio Management",
-        "Backtesting Strategies",
-        "Market Overview Deep Dive"
-    ]
-    add_toc(story, styles, sections)
-
-    # Section 1: Multi-Timeframe Analysis
-    story.append(Paragraph("1. Multi-Timeframe Analysis", styles['SectionHeader']))
-    story.append(Paragraph(
-        "Multi-timeframe analysis involves looking at the same asset across different time periods "
-        "to gain a complete picture. This technique helps identify the overall trend while finding "
-        "precise entry points.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("How to Use It in MODUS:", styles['SubsectionHeader']))
-    steps = [
-        "Go to 'Multi-Timeframe' in the sidebar",
-        "Enter your stock symbol",
-        "Click 'Analyze All Timeframes'",
-        "Review the analysis for each timeframe (5m, 15m, 1h, 4h, Daily)",
-        "Look for alignment - when all timeframes agree on direction"
-    ]
-    for step in steps:
-        story.append(Paragraph(f"• {step}", styles['BulletText']))
-
-    story.append(Paragraph("The Golden Rule:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "Trade in the direction of the higher timeframe. If the daily chart shows an uptrend, "
-        "look for buy signals on the 1-hour chart. Going against the larger trend is risky.",
-        styles['CustomBody']
-    ))
-
-    story.append(PageBreak())
-
-    # Section 2: Advanced Chart Analysis
-    story.append(Paragraph("2. Advanced Chart Analysis Features", styles['SectionHeader']))
-
-    story.append(Paragraph("Understanding the Analysis Output:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "The AI chart analysis provides several key pieces of information:",
-        styles['CustomBody']
-    ))
-
-    analysis_parts = [
-        ("Trend Direction", "Whether the stock is in an uptrend, downtrend, or ranging"),
-        ("Support Levels", "Price levels where buying pressure may increase"),
-        ("Resistance Levels", "Price levels where selling pressure may increase"),
-        ("Key Patterns", "Chart patterns like triangles, flags, or head & shoulders"),
-        ("Volume Analysis", "Whether volume confirms the price action"),
-        ("Trade Setup", "Specific entry, stop loss, and target prices"),
-        ("Confidence Score", "How confident the AI is in its analysis")
-    ]
-
-    for term, definition in analysis_parts:
-        story.append(Paragraph(f"<b>{term}:</b> {definition}", styles['BulletText']))
-
-    story.append(Paragraph("Consistent Mode:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "MODUS uses a 5-pass analysis system for maximum consistency. The AI analyzes the chart "
-        "multiple times and reconciles any differences, giving you more reliable results.",
-        styles['CustomBody']
-    ))
-
-    story.append(PageBreak())
-
-    # Section 3: Optimizing Daily Pick
-    story.append(Paragraph("3. Optimizing Daily Pick", styles['SectionHeader']))
-
-    story.append(Paragraph(
-        "Daily Pick scans hundreds of stocks to find the best trading opportunity. You can customize "
-        "it to match your trading style.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Filter Options:", styles['SubsectionHeader']))
-    filters = [
-        ("Sector", "Focus on specific sectors like Technology, Healthcare, or Energy"),
-        ("Strategy", "Choose between momentum, mean reversion, or breakout strategies"),
-        ("Volatility", "Select low, medium, or high volatility stocks"),
-        ("Market Cap", "Filter by company size (small, mid, or large cap)")
-    ]
-    for name, desc in filters:
-        story.append(Paragraph(f"<b>{name}:</b> {desc}", styles['BulletText']))
-
-    story.append(Paragraph("Best Practices:", styles['SubsectionHeader']))
-    practices = [
-        "Run Daily Pick before market open (9:30 AM EST)",
-        "Cross-reference with Chart Analysis for confirmation",
-        "Check the stock's earnings date to avoid surprises",
-        "Start with medium volatility if you're new to Daily Pick"
-    ]
-    for p in practices:
-        story.append(Paragraph(f"• {p}", styles['BulletText']))
-
-    story.append(PageBreak())
-
-    # Section 4: Position Sizing
-    story.append(Paragraph("4. Position Sizing Mastery", styles['SectionHeader']))
-
-    story.append(Paragraph(
-        "Proper position sizing is the difference between surviving and thriving in trading. "
-        "The Position Sizer tool helps you calculate exactly how many shares to buy.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("The Formula:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "Position Size = (Account Risk) / (Entry Price - Stop Loss)",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Example:", styles['SubsectionHeader']))
-    example = [
-        "Account Size: $10,000",
-        "Risk per Trade: 2% = $200",
-        "Entry Price: $50.00",
-        "Stop Loss: $48.00",
-        "Risk per Share: $2.00",
-        "Position Size: $200 / $2 = 100 shares"
-    ]
-    for line in example:
-        story.append(Paragraph(f"• {line}", styles['BulletText']))
-
-    story.append(Paragraph("TIP: Never risk more than 2% of your account on a single trade.", styles['TipText']))
-
-    story.append(PageBreak())
-
-    # Section 5: Options Trading
-    story.append(Paragraph("5. Options Trading Module", styles['SectionHeader']))
-
-    story.append(Paragraph(
-        "MODUS includes a powerful options trading module for those looking to trade derivatives. "
-        "Access it through 'Options Trading' in the sidebar.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Features:", styles['SubsectionHeader']))
-    features = [
-        "Options chain visualization",
-        "Greeks calculation (Delta, Gamma, Theta, Vega)",
-        "Probability of profit analysis",
-        "Options strategy builder",
-        "P/L visualization at different prices"
+        ops.append(('para', 'CustomBody', f"{i}. {section}"))
+    ops.append(('pagebreak',))
+
+def _bullets(items, block):
+    fmt = block.get('format', "• {text}")
+    return [('para', 'BulletText', fmt.format(text=item)) for item in items]
+
+def _terms(items, block):
+    fmt = block.get('format', "<b>{term}:</b> {text}")
+    return [('para', 'BulletText', fmt.format(term=term, text=text)) for term, text in items]
+
+def _steps(items, block):
+    ops = []
+    for i, (step, desc) in enumerate(items, 1):
+        ops += [('para', 'CustomBody', f"<b>Step {i}: {step}</b>"), ('para', 'BulletText', desc)]
+    return ops
+
+def _highlights(items, block):
+    ops = []
+    for title, desc in items:
+        ops += [('para', 'CustomBody', f"<b>{title}</b>"), ('para', 'BulletText', desc), ('spacer', 0.1)]
+    return ops
+
+def _table(rows, block):
+    return [('table', tuple(tuple(row) for row in rows), tuple(block['col_widths']))]
+
+# Computed content: {"generated": "<source>"} blocks are expanded by these
+# functions at compile time. Their ops end up in the build cache key, so a
+# guide is rebuilt whenever the data behind it changes. The analytics
+# imports stay inside each function so guides without generated blocks do
+# not need NumPy.
+
+def _backtest_results(block):
+    from analytics import backtest, fixtures, ohlcv
+    bars = ohlcv.fixture_store().panel(fixtures.FIXTURE_SYMBOLS)
+    rows = [("Strategy", "Trades", "Win Rate", "Profit Factor", "Max Drawdown", "Sharpe Ratio")]
+    for r in backtest.run_backtests(bars):
+        rows.append((backtest.STRATEGIES[r.strategy][0], str(r.trades), f"{r.win_rate:.1%}",
+                     f"{r.profit_factor:.2f}", f"{r.max_drawdown:.1%}", f"{r.sharpe:.2f}"))
+    first, last = bars.dates[0].item(), bars.dates[-1].item()
+    caption = (f"Results over {len(bars.symbols)} symbols of daily bars from {first:%b %Y} to "
+               f"{last:%b %Y}, equal capital per symbol, long only. The bars are the synthetic "
+               f"fixtures in data/ohlcv, so treat the numbers as a worked example, not a forecast.")
+    return [('table', tuple(rows), (1.4, 0.8, 1.0, 1.2, 1.3, 1.1)), ('spacer', 0.1),
+            ('para', 'BulletText', caption)]
+
+# Short column labels for the sector heatmap
+SECTOR_LABELS = {
+    'Technology': "Tech", 'Communication': "Comm", 'Consumer': "Cons", 'Financials': "Fin",
+    'Healthcare': "Health", 'Industrials': "Ind", 'Energy': "Energy", 'Materials': "Mat",
+    'Real Estate': "RE", 'Utilities': "Util",
+}
+
+def _sector_correlation(block):
+    from analytics import correlation, universe
+    sectors = universe.CORE_SECTORS
+    matrix = correlation.sector_correlation(sectors)
+    values = tuple(tuple(round(float(v), 2) for v in row) for row in matrix)
+    members = universe.sector_members(universe.load_universe(), sectors)
+    caption = (f"Mean daily return correlation within (diagonal) and between sectors for the "
+               f"{sum(len(m) for m in members.values())} stockData.js symbols in these sectors, "
+               f"computed over synthetic fixture prices. Darker cells move together more.")
+    return [('heatmap', tuple(sectors), tuple(SECTOR_LABELS[s] for s in sectors), values,
+             (1.2,) + (0.55,) * len(sectors)),
+            ('spacer', 0.1), ('para', 'BulletText', caption)]
+
+def _money(value, cents=False):
+    return f"${value:,.2f}" if cents else f"${value:,.0f}"
+
+def _percent(value):
+    return f"{value * 100:g}%"
+
+def _position_size_example(block):
+    from analytics import risk
+    account, fraction, entry, stop = block['account'], block['risk'], block['entry'], block['stop']
+    sizing = risk.position_size(account, fraction, entry, stop)
+    items = [
+        f"Account Size: {_money(account)}",
+        f"Risk per Trade: {_percent(fraction)} = {_money(account * fraction)}",
+        f"Entry Price: {_money(entry, True)}",
+        f"Stop Loss: {_money(stop, True)}",
+        f"Risk per Share: {_money(sizing.risk_per_share, True)}",
+        f"Position Size: {_money(account * fraction)} / ${sizing.risk_per_share:g} = {sizing.shares:,.0f} shares",
     ]
-    for f in features:
-        story.append(Paragraph(f"• {f}", styles['BulletText']))
-
-    story.append(Paragraph("WARNING: Options are complex instruments. Make sure you understand them before trading.", styles['WarningText']))
-
-    story.append(PageBreak())
-
-    # Section 6: Portfolio Management
-    story.append(Paragraph("6. Portfolio Management", styles['SectionHeader']))
-
-    story.append(Paragraph(
-        "Track all your holdings in one place with the Portfolio feature. Add positions manually "
-        "and watch them update in real-time.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Adding a Position:", styles['SubsectionHeader']))
-    steps = [
-        "Go to 'Portfolio' in the sidebar",
-        "Click 'Add Position'",
-        "Enter symbol, quantity, and entry price",
-        "Click 'Save'"
+    return _bullets(items, block)
+
+def _position_size_grid(block):
+    from analytics import risk
+    accounts, stops, entry = block['accounts'], block['stop_distances'], block['entry']
+    shares = risk.sizing_grid(accounts, [block['risk']], stops, entry).shares[:, 0, :]
+    rows = [("Account",) + tuple(f"{_money(d, True)} stop" for d in stops)]
+    rows += [(_money(a),) + tuple(f"{n:,.0f}" for n in row) for a, row in zip(accounts, shares)]
+    basis = f"{_money(entry, True)} entry, {_percent(block['risk'])} risk per trade."
+    widths = (1.4,) + (min(1.2, 5.6 / len(stops)),) * len(stops)
+    return [('table', tuple(rows), widths), ('spacer', 0.1),
+            ('para', 'BulletText', f"Shares to buy for a {basis} Tight stops on small accounts are "
+                                   f"limited by buying power rather than by risk.")]
+
+def _risk_profiles(block):
+    from analytics import risk
+    account = block['account']
+    per_trade = [p.risk_per_trade for p in risk.RISK_PROFILES]
+    heat = [p.max_heat for p in risk.RISK_PROFILES]
+    positions = risk.max_positions(per_trade, heat)
+    rows = [("Risk Level", "Per Trade", "Total Heat", "Max Positions", f"Risk on {_money(account)}")]
+    for profile, count in zip(risk.RISK_PROFILES, positions):
+        rows.append((profile.name, _percent(profile.risk_per_trade), _percent(profile.max_heat),
+                     str(count), _money(account * profile.risk_per_trade)))
+    return [('table', tuple(rows), (1.5, 1.0, 1.0, 1.2, 1.5)), ('spacer', 0.1),
+            ('para', 'BulletText', "Max Positions counts trades open at full risk. Moving a stop to "
+                                   "breakeven takes that trade's risk out of the heat total.")]
+
+def _sizing_appendix(block):
+    from analytics import risk
+    accounts, risks, stops = block['accounts'], block['risks'], block['stop_distances']
+    # One batched pass over every account x risk x stop combination
+    shares = risk.sizing_grid(accounts, risks, stops).shares
+    ops = []
+    header = ("Stop Distance",) + tuple(f"{_percent(r)} risk" for r in risks)
+    widths = (1.4,) + (1.0,) * len(risks)
+    for account, table in zip(accounts, shares):
+        rows = [header] + [(_money(d, True),) + tuple(f"{n:,.0f}" for n in table[:, j])
+                           for j, d in enumerate(stops)]
+        ops += [('para', 'SubsectionHeader', f"Account: {_money(account)}"),
+                ('table', tuple(rows), widths), ('spacer', 0.2)]
+    return ops
+
+def _heat_table(block):
+    import numpy as np
+    from analytics import risk
+    account = block['account']
+    counts = np.arange(1, block['positions'] + 1)
+    dollar_risk = account * np.array([p.risk_per_trade for p in risk.RISK_PROFILES])
+    # (open positions, profile, position slot): each row has its first n slots open
+    open_slots = np.arange(counts[-1]) < counts[:, None]
+    heat = risk.portfolio_heat(open_slots[:, None, :] * dollar_risk[None, :, None], account)
+    rows = [("Open Positions",) + tuple(p.name for p in risk.RISK_PROFILES)]
+    for n, row in zip(counts, heat):
+        rows.append((str(n),) + tuple(_percent(round(h, 4)) + (" (over)" if h > p.max_heat + 1e-9 else "")
+                                      for h, p in zip(row, risk.RISK_PROFILES)))
+    return [('table', tuple(rows), (1.5, 1.6, 1.6, 1.6))]
+
+def _indicator_snapshot(block):
+    import numpy as np
+    from analytics import indicators, ohlcv
+    symbol = block['symbol']
+    bars = ohlcv.fixture_store().bars(symbol)
+    high, low, close, volume = (np.asarray(a) for a in (bars.high, bars.low, bars.close, bars.volume))
+    last = close[-1]
+    sma20, sma50 = indicators.sma(close, 20)[-1], indicators.sma(close, 50)[-1]
+    histogram = indicators.macd(close).histogram[-1]
+    rsi = indicators.rsi(close)[-1]
+    atr = indicators.atr(high, low, close)[-1]
+    vwap = indicators.vwap(high, low, close, volume, 20)[-1]
+    support, resistance = indicators.support_resistance(high, low, close)
+    pivots = indicators.pivot_points(high[-1], low[-1], close[-1])
+
+    if last > sma20 > sma50:
+        trend = "Uptrend: price above both averages"
+    elif last < sma20 < sma50:
+        trend = "Downtrend: price below both averages"
+    else:
+        trend = "Ranging: averages not aligned"
+    rsi_reading = "Overbought (above 70)" if rsi > 70 else "Oversold (below 30)" if rsi < 30 else "Neutral (30-70)"
+
+    def levels(values):
+        return ", ".join(_money(v, True) for v in values) or "None nearby"
+
+    rows = [
+        ("Indicator", "Value", "Reading"),
+        ("Close", _money(last, True), f"Last bar, {bars.dates[-1].item():%b %d, %Y}"),
+        ("SMA 20 / SMA 50", f"{_money(sma20, True)} / {_money(sma50, True)}", trend),
+        ("MACD Histogram", f"{histogram:+.2f}", "Momentum rising" if histogram > 0 else "Momentum fading"),
+        ("RSI (14)", f"{rsi:.1f}", rsi_reading),
+        ("ATR (14)", _money(atr, True), f"Typical daily range, {atr / last:.1%} of price"),
+        ("VWAP (20 day)", _money(vwap, True), "Price above VWAP" if last > vwap else "Price below VWAP"),
+        ("Support", levels(support), "Nearest swing lows below price"),
+        ("Resistance", levels(resistance), "Nearest swing highs above price"),
+        ("Pivot / R1 / S1", " / ".join(_money(v, True) for v in pivots[:3]), "Floor pivots for the next session"),
     ]
-    for step in steps:
-        story.append(Paragraph(f"• {step}", styles['BulletText']))
-
-    story.append(Paragraph("Portfolio Metrics:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "View total value, daily P/L, overall return percentage, and individual position performance. "
-        "The portfolio automatically updates prices every 10 seconds during market hours.",
-        styles['CustomBody']
-    ))
-
-    story.append(PageBreak())
-
-    # Section 7: Backtesting
-    story.append(Paragraph("7. Backtesting Strategies", styles['SectionHeader']))
-
-    story.append(Paragraph(
-        "The Backtest feature lets you test trading strategies against historical data to see how "
-        "they would have performed.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("How to Backtest:", styles['SubsectionHeader']))
-    steps = [
-        "Go to 'Backtest' in the sidebar",
-        "Select a stock symbol",
-        "Choose your strategy parameters",
-        "Set the time period to test",
-        "Click 'Run Backtest'",
-        "Review the results and performance metrics"
-    ]
-    for step in steps:
-        story.append(Paragraph(f"• {step}", styles['BulletText']))
-
-    story.append(Paragraph("Key Metrics to Watch:", styles['SubsectionHeader']))
-    metrics = [
-        ("Win Rate", "Percentage of profitable trades"),
-        ("Profit Factor", "Gross profit / Gross loss (above 1.5 is good)"),
-        ("Max Drawdown", "Largest peak-to-trough decline"),
-        ("Sharpe Ratio", "Risk-adjusted returns")
-    ]
-    for name, desc in metrics:
-        story.append(Paragraph(f"<b>{name}:</b> {desc}", styles['BulletText']))
-
-    story.append(PageBreak())
-
-    # Section 8: Market Overview
-    story.append(Paragraph("8. Market Overview Deep Dive", styles['SectionHeader']))
-
-    story.append(Paragraph(
-        "The Market Overview provides a bird's-eye view of overall market conditions. "
-        "Check it before trading to understand the market environment.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("What You'll See:", styles['SubsectionHeader']))
-    overview_items = [
-        ("Market Status", "Pre-market, Open, After-hours, or Closed"),
-        ("Major Indices", "S&P 500, NASDAQ, DOW performance"),
-        ("Sector Performance", "Which sectors are leading or lagging"),
-        ("VIX (Fear Index)", "Market volatility indicator"),
-        ("Market Breadth", "Advance/decline ratio"),
-        ("Economic Calendar", "Upcoming events that may impact markets")
-    ]
-    for name, desc in overview_items:
-        story.append(Paragraph(f"<b>{name}:</b> {desc}", styles['BulletText']))
-
-    story.append(Paragraph("TIP: High VIX (above 20) indicates fear - be cautious with position sizes.", styles['TipText']))
-
-    # Build PDF
-    doc.build(story)
-    print("Created: MODUS_Amateur_Guide.pdf")
-
-def create_advanced_guide():
-    """Create the Advanced Guide PDF"""
-    doc = SimpleDocTemplate(
-        "/sessions/gifted-charming-curie/mnt/Tradevision_MODUS/MODUS_Advanced_Guide.pdf",
-        pagesize=letter,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch
+    caption = (f"Computed from the {symbol} fixture bars (synthetic data) with the analytics.indicators "
+               f"module, the same calculations the readings above describe.")
+    return [('table', tuple(rows), (1.4, 2.2, 3.0)), ('spacer', 0.1), ('para', 'BulletText', caption)]
+
+# Overlay name -> indicator function of (close, period), and the colours
+# overlays take in order
+CHART_OVERLAYS = {'SMA': 'sma', 'EMA': 'ema'}
+OVERLAY_COLOURS = ('VIOLET', 'AMBER', 'PURPLE')
+
+def _price_chart(block):
+    from analytics import decimation, indicators, ohlcv
+    symbol = block['symbol']
+    bars = ohlcv.fixture_store().bars(symbol)
+    days = block.get('days', len(bars.close))
+    width, height = block.get('width', 7.0), block.get('height', 3.0)
+    overlays = []
+    for label, colour in zip(block.get('overlays', ()), OVERLAY_COLOURS):
+        kind, period = label.split()
+        if kind not in CHART_OVERLAYS:
+            raise ValueError(f"unknown chart overlay {label!r}")
+        # Computed over the whole history so the first visible values are warmed up
+        values = getattr(indicators, CHART_OVERLAYS[kind])(bars.close.astype(float), int(period))
+        overlays.append((label, colour, values[-days:]))
+    window = slice(len(bars.close) - days, None)
+    data = decimation.chart_data(bars.dates[window], bars.open[window], bars.high[window], bars.low[window],
+                                 bars.close[window], bars.volume[window], overlays, width * INCH,
+                                 block.get('title', f"{symbol} Daily"))
+    caption = (f"{symbol} daily candles with volume, {bars.dates[window][0].item():%b %d, %Y} to "
+               f"{bars.dates[-1].item():%b %d, %Y}. Synthetic fixture prices, drawn the way the "
+               f"Live Ticker chart shows them: green candles closed up, red closed down.")
+    return [('chart', data, width, height), ('spacer', 0.1), ('para', 'BulletText', caption)]
+
+# Timeframes shown in the multi-timeframe table, with their display names
+ALIGNMENT_TIMEFRAMES = (('5m', "5 Minute"), ('15m', "15 Minute"), ('1h', "1 Hour"), ('4h', "4 Hour"),
+                        ('1d', "Daily"), ('1w', "Weekly"))
+
+def _timeframe_alignment(block):
+    from analytics import indicators, resample
+    symbol = block['symbol']
+    period = block.get('period', 20)
+    bars = resample.fixture_resampler(symbol)
+    rows = [("Timeframe", "Last Close", f"SMA {period}", "Trend")]
+    trends = []
+    for timeframe, label in ALIGNMENT_TIMEFRAMES:
+        close = bars[timeframe].close
+        average = indicators.sma(close, period)[-1]
+        trends.append("Up" if close[-1] > average else "Down")
+        rows.append((label, _money(close[-1], True), _money(average, True), trends[-1]))
+    higher = trends[-2]
+    agree = sum(trend == higher for trend in trends)
+    caption = (f"{symbol} resampled from 1-minute bars to each timeframe; trend is the last close "
+               f"against its {period}-bar average. {agree} of {len(trends)} timeframes agree with the "
+               f"daily trend ({higher.lower()}). The minute bars are synthetic, built from the "
+               f"fixture daily bars.")
+    return [('table', tuple(rows), (1.5, 1.5, 1.5, 1.2)), ('spacer', 0.1), ('para', 'BulletText', caption)]
+
+def _daily_pick(block):
+    from analytics import scanner
+    strategy, volatility = block.get('strategy', 'momentum'), block.get('volatility', 'medium')
+    picks = scanner.scan(strategy=strategy, volatility=volatility, k=block.get('count', 5), jobs=1)
+    rows = [("Rank", "Symbol", "Sector", "Score", "ATR %", "RSI", "20-Day Change")]
+    for i, p in enumerate(picks, 1):
+        rows.append((str(i), p.ticker, p.sector, f"{p.score:.1f}", f"{p.atr_pct:.2f}%", f"{p.rsi:.1f}",
+                     f"{p.change_20d:+.1%}"))
+    caption = (f"Top picks for the {strategy} strategy at {volatility} volatility, scanned across all "
+               f"{len(scanner.select_tickers()[0])} stockData.js symbols with the analytics.scanner module. "
+               f"Fixture symbols are priced from the same OHLCV store as the other tables; all prices are "
+               f"synthetic and seeded, so the same scan always returns the same picks.")
+    return [('table', tuple(rows), (0.5, 0.8, 1.3, 0.7, 0.8, 0.7, 1.3)), ('spacer', 0.1),
+            ('para', 'BulletText', caption)]
+
+def _scan_combinations(block):
+    from analytics import scanner
+    rows = [("Combination", "Top Pick", "Sector", "Score", "ATR %")]
+    for combo in block['combinations']:
+        picks = scanner.scan(strategy=combo['strategy'], volatility=combo.get('volatility', 'any'),
+                             sectors=combo.get('sectors'), cap=combo.get('cap'), k=1, jobs=1)
+        if picks:
+            p = picks[0]
+            rows.append((combo['label'], p.ticker, p.sector, f"{p.score:.1f}", f"{p.atr_pct:.2f}%"))
+        else:
+            rows.append((combo['label'], "No match", "-", "-", "-"))
+    return [('table', tuple(rows), (2.6, 0.9, 1.3, 0.7, 0.8))]
+
+def _consistency_passes(block):
+    from analytics import consensus
+    image = block.get('chart', 'MODUS example chart').encode('utf-8')
+    analyses, _ = asyncio.run(consensus.Reconciler(consensus.StubBackend()).analyses(image))
+    result = consensus.reconcile(analyses)
+
+    def prices(levels):
+        return ', '.join(f"{p:,.2f}" for p in levels) or "-"
+
+    rows = [("Pass", "Trend", "Setup", "Confidence", "Support", "Resistance")]
+    for i, a in enumerate(analyses, 1):
+        rows.append((str(i), a.trend, a.setup, f"{a.confidence:.0f}", prices(a.support), prices(a.resistance)))
+    rows.append(("Consensus", result.trend, result.setup, f"{result.confidence:.0f}",
+                 prices(level.price for level in result.support),
+                 prices(level.price for level in result.resistance)))
+    caption = (f"Five passes over one chart, reconciled with the analytics.consensus module: trend and "
+               f"setup by confidence-weighted vote ({result.trend_agreement:.0%} and "
+               f"{result.setup_agreement:.0%} agreement), and a level is kept where at least "
+               f"{len(analyses) // 2 + 1} passes put one within {consensus.LEVEL_TOLERANCE:.1%} of each "
+               f"other. One-off levels drop out. The passes are synthetic, from the module's seeded "
+               f"stub backend.")
+    return [('table', tuple(rows), (0.9, 0.85, 0.7, 0.95, 1.8, 1.8)), ('spacer', 0.1),
+            ('para', 'BulletText', caption)]
+
+def _alert_engine(block):
+    import numpy as np
+    from analytics import alerts
+    tickers = [f"SYN{i}" for i in range(block.get('symbols', 50))]
+    symbol, price = alerts.synthetic_ticks(tickers, block.get('ticks', 10_000))
+    rows = [("Alerts", "Triggers", "Scan All Alerts", "Scan Symbol's Alerts", "Search Steps")]
+    for count in block.get('alerts', (100, 1_000, 10_000)):
+        book = alerts.AlertBook()
+        book.add(*alerts.synthetic_alerts(tickers, count))
+        ids = book.symbol_ids(tickers)[symbol]
+        triggers, _ = alerts.replay(book, ids, alerts.to_fixed(price))
+        scanned = np.bincount(book.symbol, minlength=len(book.tickers))[ids].mean()
+        # Two binary searches per range: one for above, one for below, two for equals
+        kind_sizes = np.bincount(book.kind, minlength=3)
+        steps = 2 * sum(n * int(np.ceil(np.log2(size + 1))) for n, size in zip((1, 1, 2), kind_sizes))
+        rows.append((f"{count:,}", f"{len(triggers.alert):,}", f"{count:,}", f"{scanned:,.0f}", str(steps)))
+    caption = (f"Checks per price tick for synthetic alerts within 5% of {len(tickers)} symbols' prices, "
+               f"replayed against {len(price):,} seeded ticks with the analytics.alerts module. Scanning "
+               f"every alert, as the browser does, or every alert on the ticking symbol grows with the "
+               f"number of alerts; the sorted index needs a few more binary search steps each time the "
+               f"alert count grows tenfold.")
+    return [('table', tuple(rows), (1.0, 1.0, 1.5, 1.8, 1.7)), ('spacer', 0.1), ('para', 'BulletText', caption)]
+
+def _option_chain(block):
+    """Spot, strikes around the money, expiry and volatilities for a fixture symbol's options"""
+    import numpy as np
+    from analytics import ohlcv, options
+    close = np.asarray(ohlcv.fixture_store().bars(block['symbol']).close)
+    spot = float(close[-1])
+    step = options.strike_increment(spot)
+    strikes = round(spot / step) * step + step * np.arange(-2, 3)
+    expiry = block.get('days', 30) / options.DAYS_PER_YEAR
+    return spot, strikes, expiry, options.vol_surface(spot, strikes, expiry, options.realized_vol(close))
+
+def _option_greeks(block):
+    from analytics import options
+    spot, strikes, expiry, vol = _option_chain(block)
+    rate = options.RISK_FREE_RATE
+    call = options.greeks(spot, strikes, expiry, rate, vol, american=True)
+    put = options.greeks(spot, strikes, expiry, rate, vol, call=False, american=True)
+    iv = options.implied_vol(put.price, spot, strikes, expiry, rate, call=False, american=True)
+    rows = [("Strike", "IV", "Call", "Put", "Call Delta", "Put Delta", "Gamma", "Theta/Day", "Vega/1%")]
+    for i, strike in enumerate(strikes):
+        rows.append((_money(strike, True), f"{iv[i]:.1%}", _money(call.price[i], True), _money(put.price[i], True),
+                     f"{call.delta[i]:.2f}", f"{put.delta[i]:.2f}", f"{call.gamma[i]:.3f}",
+                     f"{call.theta[i] / options.DAYS_PER_YEAR:.3f}", f"{call.vega[i] / 100:.3f}"))
+    caption = (f"{block['symbol']} options {block.get('days', 30)} days from expiration with the stock at "
+               f"{_money(spot, True)}, priced as American options with the analytics.options module at a "
+               f"{options.RISK_FREE_RATE:.1%} rate. Volatility is the fixture bars' 20-day realized volatility "
+               f"with a synthetic skew; IV is what the implied volatility solver recovers from each put's price. "
+               f"Theta, gamma and vega are the call's, per share; one contract is "
+               f"{options.CONTRACT_SIZE} shares.")
+    return [('table', tuple(rows), (0.75, 0.65, 0.7, 0.7, 0.85, 0.85, 0.7, 0.9, 0.9)), ('spacer', 0.1),
+            ('para', 'BulletText', caption)]
+
+def _signed_money(value):
+    return f"{'+' if value >= 0 else '-'}{_money(abs(value))}"
+
+def _option_payoffs(block):
+    import numpy as np
+    from analytics import options
+    spot, strikes, expiry, vol = _option_chain(block)
+    rate, Leg = options.RISK_FREE_RATE, options.Leg
+    calls = options.price(spot, strikes, expiry, rate, vol, american=True)
+    puts = options.price(spot, strikes, expiry, rate, vol, call=False, american=True)
+    # At the money and two strikes up
+    low, high = len(strikes) // 2, len(strikes) - 1
+    strategies = (
+        ("Long Call", (Leg('call', strikes[low], 1, calls[low]),)),
+        ("Long Put", (Leg('put', strikes[low], 1, puts[low]),)),
+        ("Bull Call Spread", (Leg('call', strikes[low], 1, calls[low]), Leg('call', strikes[high], -1, calls[high]))),
+        ("Covered Call", (Leg('stock', 0.0, 1, spot), Leg('call', strikes[high], -1, calls[high]))),
+        ("Long Straddle", (Leg('call', strikes[low], 1, calls[low]), Leg('put', strikes[low], 1, puts[low]))),
     )
+    moves = np.asarray(block.get('moves', (-0.2, -0.1, -0.05, 0.0, 0.05, 0.1, 0.2)))
+    size = options.CONTRACT_SIZE
+    pnl = np.array([options.payoff(legs, spot * (1 + moves)) for _, legs in strategies]) * size
+    # Breakevens are where the payoff changes sign on a fine price grid
+    grid = np.linspace(spot * 0.5, spot * 1.5, 100001)
+    breakevens = []
+    for _, legs in strategies:
+        curve = options.payoff(legs, grid)
+        crossings = np.flatnonzero(np.diff(np.sign(curve)) != 0)
+        breakevens.append(" / ".join(_money(grid[i]) for i in crossings) or "-")
+
+    rows = [("At Expiration",) + tuple(name for name, _ in strategies)]
+    rows.append(("Cost",) + tuple(_money(sum(leg.quantity * leg.premium for leg in legs) * size)
+                                  for _, legs in strategies))
+    for j, move in enumerate(moves):
+        rows.append((f"{_money(spot * (1 + move), True)} ({move:+.0%})",) + tuple(_signed_money(v) for v in pnl[:, j]))
+    rows.append(("Breakeven",) + tuple(breakevens))
+    caption = (f"Profit or loss per contract if held to expiration, from the prices above. The long call, "
+               f"long put and straddle use the {_money(strikes[low], True)} strike; the spread buys it and "
+               f"sells the {_money(strikes[high], True)} call, which the covered call sells against "
+               f"{size} shares bought at {_money(spot, True)}.")
+    return [('table', tuple(rows), (1.2, 1.125, 1.125, 1.3, 1.125, 1.125)), ('spacer', 0.1),
+            ('para', 'BulletText', caption)]
+
+# Generated content source -> function returning a list of ops
+GENERATED_CONTENT = {
+    'backtest_results': _backtest_results,
+    'sector_correlation': _sector_correlation,
+    'position_size_example': _position_size_example,
+    'position_size_grid': _position_size_grid,
+    'risk_profiles': _risk_profiles,
+    'sizing_appendix': _sizing_appendix,
+    'heat_table': _heat_table,
+    'indicator_snapshot': _indicator_snapshot,
+    'price_chart': _price_chart,
+    'timeframe_alignment': _timeframe_alignment,
+    'daily_pick': _daily_pick,
+    'scan_combinations': _scan_combinations,
+    'consistency_passes': _consistency_passes,
+    'alert_engine': _alert_engine,
+    'option_greeks': _option_greeks,
+    'option_payoffs': _option_payoffs,
+}
+
+def _generated(source, block):
+    if source not in GENERATED_CONTENT:
+        raise ValueError(f"unknown generated content {source!r}")
+    return GENERATED_CONTENT[source](block)
+
+# Content block key -> compiler returning a list of ops
+BLOCK_TYPES = {
+    'body': lambda text, block: [('para', 'CustomBody', text)],
+    'subsection': lambda text, block: [('para', 'SubsectionHeader', text)],
+    'tip': lambda text, block: [('para', 'TipText', f"TIP: {text}")],
+    'warning': lambda text, block: [('para', 'WarningText', f"WARNING: {text}")],
+    'spacer': lambda height, block: [('spacer', height)],
+    'bullets': _bullets,
+    'terms': _terms,
+    'steps': _steps,
+    'highlights': _highlights,
+    'table': _table,
+    'generated': _generated,
+}
+
+def compile_guide(name, spec):
+    """Compile a parsed guide content file into render ops"""
+    if spec.get('accent') not in PALETTE:
+        raise ValueError(f"{name}: unknown accent colour {spec.get('accent')!r}")
+
+    ops = []
+    add_cover_page(ops, spec['title'], spec['subtitle'], spec['accent'])
+    sections = spec['sections']
+    add_toc(ops, [section['title'] for section in sections])
 
-    styles = create_styles()
-    story = []
-
-    # Cover Page
-    add_cover_page(story, styles, "Advanced Guide", "Master the Markets with MODUS", VIOLET)
-
-    # Table of Contents
-    sections = [
-        "API Configuration & Backend Mode",
-        "SMS Alert System Architecture",
-        "Advanced AI Analysis Techniques",
-        "Custom Scanning Strategies",
-        "Risk Management Framework",
-        "Correlation & Sector Analysis",
-        "Deployment & Customization",
-        "Performance Optimization"
-    ]
-    add_toc(story, styles, sections)
-
-    # Section 1: API Configuration
-    story.append(Paragraph("1. API Configuration & Backend Mode", styles['SectionHeader']))
-
-    story.append(Paragraph("Direct API Mode:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "In Direct mode, your API key is stored locally in your browser. Each AI request sends "
-        "the key directly to Anthropic's servers. This is simple but means you need to enter "
-        "your key on each device.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Backend API Mode:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "Backend mode stores your API key securely on Vercel's servers as an environment variable. "
-        "Benefits include: no key exposure in browser, works across all devices, centralized management.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Setting Up Backend Mode:", styles['SubsectionHeader']))
-    steps = [
-        "Fork the MODUS repository on GitHub",
-        "Deploy to Vercel",
-        "Add ANTHROPIC_API_KEY to Vercel Environment Variables",
-        "Enable 'Use Backend API' in MODUS settings"
-    ]
-    for step in steps:
-        story.append(Paragraph(f"• {step}", styles['BulletText']))
-
-    story.append(PageBreak())
-
-    # Section 2: SMS Architecture
-    story.append(Paragraph("2. SMS Alert System Architecture", styles['SectionHeader']))
-
-    story.append(Paragraph("How It Works:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "MODUS uses email-to-SMS gateways to send free text messages. When an alert triggers, "
-        "the app sends an email to your carrier's gateway (e.g., 5551234567@tmomail.net), "
-        "which converts it to an SMS.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Supported Carriers:", styles['SubsectionHeader']))
-    carriers = [
-        "AT&T (txt.att.net)",
-        "Verizon (vtext.com)",
-        "T-Mobile (tmomail.net)",
-        "Sprint (messaging.sprintpcs.com)",
-        "US Cellular (email.uscc.net)",
-        "Metro PCS (mymetropcs.net)",
-        "Cricket (sms.cricketwireless.net)",
-        "Google Fi (msg.fi.google.com)"
-    ]
-    for c in carriers:
-        story.append(Paragraph(f"• {c}", styles['BulletText']))
-
-    story.append(Paragraph("EmailJS Configuration:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "MODUS uses EmailJS to send emails from the browser. The service ID, template ID, and "
-        "public key are configured in the app. Free tier allows 200 emails/month.",
-        styles['CustomBody']
-    ))
-
-    story.append(PageBreak())
-
-    # Section 3: Advanced AI Techniques
-    story.append(Paragraph("3. Advanced AI Analysis Techniques", styles['SectionHeader']))
-
-    story.append(Paragraph("5-Pass Consistency System:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "MODUS runs the AI analysis 5 times and reconciles the results. This eliminates random "
-        "variations in AI output, giving you consistent and reliable analysis every time.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Maximizing AI Accuracy:", styles['SubsectionHeader']))
-    tips = [
-        "Use clean, trending charts - AI performs better with clear patterns",
-        "Avoid very short timeframes (1m) - more noise, less signal",
-        "Check during high-volume periods for better price action",
-        "Cross-reference with multi-timeframe analysis",
-        "Use the confidence score to gauge reliability"
-    ]
-    for tip in tips:
-        story.append(Paragraph(f"• {tip}", styles['BulletText']))
-
-    story.append(Paragraph("Prompt Engineering:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "When using Ask AI, frame your questions with context for better answers. Instead of "
-        "'Is AAPL good?', try 'Given the current tech sector rotation and AAPL's recent earnings, "
-        "what technical levels should I watch for a swing trade entry?'",
-        styles['CustomBody']
-    ))
-
-    story.append(PageBreak())
-
-    # Section 4: Custom Scanning
-    story.append(Paragraph("4. Custom Scanning Strategies", styles['SectionHeader']))
-
-    story.append(Paragraph("Daily Pick Optimization:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "The Daily Pick scanner analyzes 220+ stocks across multiple sectors. You can customize "
-        "the scan by adjusting filters to match your strategy.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Strategy Combinations:", styles['SubsectionHeader']))
-    strategies = [
-        ("Momentum + High Volatility", "Aggressive day trading setups"),
-        ("Mean Reversion + Low Volatility", "Conservative swing trades"),
-        ("Breakout + Technology Sector", "Tech momentum plays"),
-        ("Any Strategy + Small Cap", "Higher risk/reward opportunities")
-    ]
-    for name, desc in strategies:
-        story.append(Paragraph(f"<b>{name}:</b> {desc}", styles['BulletText']))
-
-    story.append(Paragraph("Scan Timing:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "Run scans at different times for different opportunities: pre-market (gap plays), "
-        "market open (momentum), midday (mean reversion), end of day (swing setups).",
-        styles['CustomBody']
-    ))
-
-    story.append(PageBreak())
-
-    # Section 5: Risk Management
-    story.append(Paragraph("5. Risk Management Framework", styles['SectionHeader']))
-
-    story.append(Paragraph("The 2% Rule:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "Never risk more than 2% of your total account on any single trade. This ensures that "
-        "even a series of losses won't significantly damage your capital.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Portfolio Heat:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "Total portfolio heat is the sum of all open position risks. Keep total heat under 6% "
-        "to maintain adequate diversification and survive correlated moves.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Risk Metrics Table:", styles['SubsectionHeader']))
-
-    risk_data = [
-        ["Risk Level", "Per Trade", "Total Heat", "Max Positions"],
-        ["Conservative", "1%", "3%", "3"],
-        ["Moderate", "2%", "6%", "4-5"],
-        ["Aggressive", "3%", "9%", "5-6"]
-    ]
-
-    t = Table(risk_data, colWidths=[1.5*inch, 1.2*inch, 1.2*inch, 1.2*inch])
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), VIOLET),
+    for i, section in enumerate(sections, 1):
+        ops.append(('para', 'SectionHeader', f"{i}. {section['title']}"))
+        for block in section['blocks']:
+            kinds = [key for key in block if key in BLOCK_TYPES]
+            if len(kinds) != 1:
+                raise ValueError(f"{name}: section {i} has an invalid block {block!r}")
+            ops += BLOCK_TYPES[kinds[0]](block[kinds[0]], block)
+        if i < len(sections):
+            ops.append(('pagebreak',))
+
+    return CompiledGuide(name, spec['output'], tuple(ops))
+
+def list_guides():
+    """Names of all guides with a content file"""
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(GUIDE_DIR) if f.endswith('.json'))
+
+def read_guide_spec(name):
+    """Parsed content file of a guide, uncompiled"""
+    with open(os.path.join(GUIDE_DIR, f"{name}.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+@functools.lru_cache(maxsize=None)
+def load_guide(name):
+    """Parse and compile a guide's content file, once per process"""
+    return compile_guide(name, read_guide_spec(name))
+
+@functools.lru_cache(maxsize=BRANDING_CACHE_SIZE)
+def data_table_style(branding=DEFAULT_BRANDING):
+    """Table style for data tables: accent header row over a light grid"""
+    from reportlab.lib.colors import HexColor, white
+    from reportlab.platypus import TableStyle
+
+    palette = branding.palette
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), palette['VIOLET']),
         ('TEXTCOLOR', (0, 0), (-1, 0), white),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 0), (-1, 0), branding.font_names['bold']),
+        ('FONTNAME', (0, 1), (-1, -1), branding.font_names['regular']),
         ('FONTSIZE', (0, 0), (-1, -1), 10),
         ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
         ('BACKGROUND', (0, 1), (-1, -1), HexColor('#F8FAFC')),
-        ('GRID', (0, 0), (-1, -1), 1, SLATE)
-    ]))
-    story.append(t)
-
-    story.append(PageBreak())
-
-    # Section 6: Correlation Analysis
-    story.append(Paragraph("6. Correlation & Sector Analysis", styles['SectionHeader']))
-
-    story.append(Paragraph("Understanding Correlation:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "Correlation measures how two assets move in relation to each other. A correlation of "
-        "+1 means they move identically, -1 means opposite, and 0 means no relationship.",
-        styles['CustomBody']
-    ))
-
-    story.append(Paragraph("Using MODUS Correlation Tool:", styles['SubsectionHeader']))
-    steps = [
-        "Access via Market Overview or dedicated Correlation section",
-        "Enter two or more symbols to compare",
-        "View the correlation matrix",
-        "Use for diversification - avoid highly correlated positions"
-    ]
-    for step in steps:
-        story.append(Paragraph(f"• {step}", styles['BulletText']))
-
-    story.append(Paragraph("Sector Rotation:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "The Sector Performance view shows which sectors are leading. In early bull markets, "
-        "cyclicals lead. In late bull markets, defensives outperform. Use this to time entries.",
-        styles['CustomBody']
-    ))
-
-    story.append(PageBreak())
-
-    # Section 7: Deployment
-    story.append(Paragraph("7. Deployment & Customization", styles['SectionHeader']))
-
-    story.append(Paragraph("Self-Hosting MODUS:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "MODUS is open for deployment on your own infrastructure. This gives you full control "
-        "over the application and your data.",
-        styles['CustomBody']
-    ))
+        ('GRID', (0, 0), (-1, -1), 1, palette['SLATE'])
+    ])
+
+def heatmap_style(values, branding=DEFAULT_BRANDING):
+    """Data table style with each value cell shaded from white towards the accent colour"""
+    from reportlab.lib.colors import linearlyInterpolatedColor, white
+    from reportlab.platypus import TableStyle
+
+    palette = branding.palette
+    style = TableStyle(data_table_style(branding).getCommands() + [
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BACKGROUND', (0, 1), (0, -1), palette['DARK_BG']),
+        ('TEXTCOLOR', (0, 1), (0, -1), white),
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ])
+    # Strongest cell gets 60% of the accent so black text stays readable
+    top = max(abs(v) for row in values for v in row) or 1
+    for r, row in enumerate(values, 1):
+        for c, value in enumerate(row, 1):
+            shade = linearlyInterpolatedColor(white, palette['VIOLET'], 0, top, abs(value) * 0.6)
+            style.add('BACKGROUND', (c, r), (c, r), shade)
+    return style
+
+def iter_story(ops, branding=DEFAULT_BRANDING):
+    """Yield fresh flowables for compiled ops, one at a time"""
+    from reportlab.platypus import PageBreak, Paragraph, Spacer, Table
+
+    styles = create_styles(branding)
+    for op in ops:
+        kind = op[0]
+        if kind == 'para':
+            yield Paragraph(op[2], styles[op[1]])
+        elif kind == 'brand':
+            yield Paragraph(getattr(branding, op[2]), styles[op[1]])
+        elif kind == 'level':
+            yield Paragraph(op[2], level_style(op[1], branding))
+        elif kind == 'spacer':
+            yield Spacer(1, op[1]*INCH)
+        elif kind == 'table':
+            t = Table([list(row) for row in op[1]], colWidths=[w*INCH for w in op[2]])
+            t.setStyle(data_table_style(branding))
+            yield t
+        elif kind == 'heatmap':
+            _, row_labels, col_labels, values, widths = op
+            rows = [[''] + list(col_labels)]
+            rows += [[label] + [f"{v:.2f}" for v in row] for label, row in zip(row_labels, values)]
+            t = Table(rows, colWidths=[w*INCH for w in widths])
+            t.setStyle(heatmap_style(values, branding))
+            yield t
+        elif kind == 'chart':
+            import guide_charts
+            yield guide_charts.CandleChart(op[1], op[2]*INCH, op[3]*INCH, branding.palette,
+                                           branding.font_names)
+        elif kind == 'pagebreak':
+            yield PageBreak()
+        else:
+            raise ValueError(f"unknown op {kind!r}")
+
+def render_story(ops, branding=DEFAULT_BRANDING):
+    """Turn compiled ops into a fresh list of flowables"""
+    return list(iter_story(ops, branding))
+
+# ============================================================
+# Rendering
+# ============================================================
+
+BuildResult = namedtuple('BuildResult', 'name seconds error cached')
+
+def guide_path(name, branding=DEFAULT_BRANDING, output_dir=None):
+    """Output path of a guide's PDF; tenant copies go in one subdirectory per tenant"""
+    directory = output_dir or OUTPUT_DIR
+    if branding.name != DEFAULT_BRANDING.name:
+        directory = os.path.join(directory, branding.name)
+    return os.path.join(directory, read_guide_spec(name)['output'])
+
+def guide_document(target, branding=DEFAULT_BRANDING):
+    """Document template with the shared page geometry, writing to a path or file object"""
+    from reportlab.platypus import SimpleDocTemplate
+
+    return SimpleDocTemplate(
+        target,
+        pagesize=PAGE_SIZE,
+        rightMargin=PAGE_MARGIN,
+        leftMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN,
+        initialFontName=branding.font_names['regular']
+    )
 
-    story.append(Paragraph("Deployment Steps:", styles['SubsectionHeader']))
-    deploy_steps = [
-        "Clone the repository from GitHub",
-        "Run 'npm install' to install dependencies",
-        "Create .env.local with your API keys",
-        "Run 'npm run build' to create production build",
-        "Deploy to Vercel, Netlify, or your own server"
-    ]
-    for step in deploy_steps:
-        story.append(Paragraph(f"• {step}", styles['BulletText']))
-
-    story.append(Paragraph("Environment Variables:", styles['SubsectionHeader']))
-    env_vars = [
-        ("ANTHROPIC_API_KEY", "Required for AI features"),
-        ("EMAILJS_SERVICE_ID", "For SMS alerts"),
-        ("EMAILJS_TEMPLATE_ID", "For SMS alerts"),
-        ("EMAILJS_PUBLIC_KEY", "For SMS alerts")
-    ]
-    for var, desc in env_vars:
-        story.append(Paragraph(f"<b>{var}:</b> {desc}", styles['BulletText']))
+def render_guide(name, output=None, stream=False, branding=DEFAULT_BRANDING, profiler=None):
+    """Lay out a guide and write its PDF to output
+
+    output may be a file path, an existing directory (the guide's own file
+    name is used inside it) or a writable binary file object such as an
+    HTTP response body. With output=None the PDF is returned as bytes;
+    otherwise the path written (or the file object) is returned.
+
+    With stream=True flowables are generated lazily and each page is written
+    out as soon as it is laid out (see guide_stream), keeping peak memory
+    flat for very long guides.
+
+    profiler, a guide_profile.BuildProfiler, times the build's flowables
+    and pages.
+    """
+    guide = load_guide(name)
+    target = io.BytesIO() if output is None else output
+    if isinstance(target, str):
+        if os.path.isdir(target):
+            target = os.path.join(target, guide.output)
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+
+    doc = guide_document(target, branding)
+    story = iter_story(guide.ops, branding) if stream else render_story(guide.ops, branding)
+    if profiler is not None:
+        profiler.attach(doc)
+        story = profiler.instrument(story)
+    with profiler.running() if profiler is not None else contextlib.nullcontext():
+        if stream:
+            from guide_stream import build_streaming
+            build_streaming(doc, story)
+        else:
+            doc.build(list(story))
+    return target.getvalue() if output is None else target
 
-    story.append(PageBreak())
+def create_beginner_guide():
+    """Create the Beginner's Guide PDF"""
+    return render_guide('beginner', guide_path('beginner'))
 
-    # Section 8: Performance
-    story.append(Paragraph("8. Performance Optimization", styles['SectionHeader']))
+def create_amateur_guide():
+    """Create the Amateur Guide PDF"""
+    return render_guide('amateur', guide_path('amateur'))
 
-    story.append(Paragraph("Browser Performance:", styles['SubsectionHeader']))
-    tips = [
-        "Use Chrome or Edge for best performance",
-        "Close unused tabs to free memory",
-        "Disable browser extensions while trading",
-        "Use a wired internet connection for stability"
-    ]
-    for tip in tips:
-        story.append(Paragraph(f"• {tip}", styles['BulletText']))
-
-    story.append(Paragraph("App Settings:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "MODUS checks prices every 10 seconds and the clock updates every second. This is "
-        "optimized for real-time trading while maintaining smooth performance.",
-        styles['CustomBody']
+def create_advanced_guide():
+    """Create the Advanced Guide PDF"""
+    return render_guide('advanced', guide_path('advanced'))
+
+# ============================================================
+# Incremental build cache
+# ============================================================
+#
+# A guide's cache key is a hash of everything that affects its PDF: the
+# guide's content file, the branding, every paragraph style, the size and
+# mtime of any .ttf fonts, the page geometry and the reportlab version.
+# Guides with generated blocks also hash the size and mtime of the files
+# those blocks are computed from (GENERATOR_INPUTS), so the key is known
+# without compiling the guide. Finished PDFs are stored under CACHE_DIR as
+# <key>.pdf and tracked in manifest.json, so a guide whose key is
+# already known is restored by copying instead of being laid out again.
+
+CACHE_FORMAT = 5
+CACHE_KEEP_PER_GUIDE = 3
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Code and data generated content depends on, as globs under ROOT_DIR
+GENERATOR_INPUTS = ('create_guides.py', 'guide_charts.py', 'analytics/*.py', 'data/ohlcv/*',
+                    'src/constants/stockData.js')
+
+def _style_signature(style):
+    attrs = dict(vars(style))
+    if attrs.get('parent') is not None:
+        attrs['parent'] = attrs['parent'].name
+    return sorted((k, repr(v)) for k, v in attrs.items())
+
+@functools.lru_cache(maxsize=BRANDING_CACHE_SIZE)
+def _styles_signature(branding):
+    return repr((
+        branding,
+        sorted((n, _style_signature(st)) for n, st in create_styles(branding).items()),
     ))
 
-    story.append(Paragraph("Understanding Loading States:", styles['SubsectionHeader']))
-    story.append(Paragraph(
-        "The status indicator in the header shows what's currently running. AI operations "
-        "(Chart Analysis, Daily Pick, Ask AI) take 3-10 seconds due to API response times. "
-        "This is normal and expected.",
-        styles['CustomBody']
+def _generator_signature():
+    """Size and mtime of every GENERATOR_INPUTS file"""
+    signature = []
+    for pattern in GENERATOR_INPUTS:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, pattern))):
+            stat = os.stat(path)
+            signature.append((os.path.relpath(path, ROOT_DIR), stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+def _guide_signature(name):
+    """A guide's content file, plus its generated blocks' inputs if it has any"""
+    with open(os.path.join(GUIDE_DIR, f"{name}.json"), encoding='utf-8') as f:
+        text = f.read()
+    generated = any('generated' in block for section in json.loads(text)['sections'] for block in section['blocks'])
+    return text, _generator_signature() if generated else ()
+
+def guide_cache_key(name, branding=DEFAULT_BRANDING):
+    """Content hash identifying the PDF a guide would build to, computed without compiling the guide"""
+    from reportlab import Version as reportlab_version
+
+    payload = repr((
+        CACHE_FORMAT,
+        reportlab_version,
+        PAGE_SIZE,
+        PAGE_MARGIN,
+        _styles_signature(branding),
+        guide_fonts.font_signature(branding.fonts),
+        _guide_signature(name),
     ))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class GuideCache:
+    """On-disk store of built PDFs keyed by guide content hash"""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        self.entries = {}
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('format') == CACHE_FORMAT:
+                self.entries = manifest['entries']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _blob(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def restore(self, key, path):
+        """Copy the cached PDF for key to path; return False on a miss"""
+        if key not in self.entries or not os.path.exists(self._blob(key)):
+            return False
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        shutil.copyfile(self._blob(key), path)
+        self.entries[key]['used'] = time.time()
+        return True
+
+    def store(self, key, name, tenant, path):
+        """Record a freshly built PDF under key"""
+        os.makedirs(self.directory, exist_ok=True)
+        shutil.copyfile(path, self._blob(key))
+        self.entries[key] = {'guide': name, 'tenant': tenant, 'size': os.path.getsize(path), 'used': time.time()}
+
+    def evict(self, keep=CACHE_KEEP_PER_GUIDE):
+        """Drop all but the most recently used entries of each guide and tenant, and orphaned files"""
+        guides = set(list_guides())
+        by_guide = {}
+        for key, entry in self.entries.items():
+            by_guide.setdefault((entry['tenant'], entry['guide']), []).append(key)
+        for (tenant, name), keys in by_guide.items():
+            keys.sort(key=lambda k: self.entries[k]['used'], reverse=True)
+            stale = keys if name not in guides else keys[keep:]
+            for key in stale:
+                del self.entries[key]
+
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                key, ext = os.path.splitext(filename)
+                if ext == '.pdf' and key not in self.entries:
+                    os.remove(os.path.join(self.directory, filename))
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'format': CACHE_FORMAT, 'entries': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+# ============================================================
+# Build driver
+# ============================================================
+
+# Build profiling settings: where profiles go, and whether to add cProfile
+# and tracemalloc captures (see guide_profile)
+ProfileOptions = namedtuple('ProfileOptions', 'directory cprofile memory')
+
+def _timed_build(name, path, stream=False, branding=DEFAULT_BRANDING, profile=None):
+    """Build a single guide into path, returning a BuildResult"""
+    profiler = None
+    if profile is not None:
+        from guide_profile import BuildProfiler
+        profiler = BuildProfiler(name, profile.cprofile, profile.memory)
+    start = time.perf_counter()
+    try:
+        render_guide(name, path, stream, branding, profiler)
+    except Exception:
+        return BuildResult(name, time.perf_counter() - start, traceback.format_exc(), False)
+    seconds = time.perf_counter() - start
+    print(f"Created: {path}")
+    if profiler is not None:
+        for written in profiler.write(profile.directory):
+            print(f"Created: {written}")
+        print("\n".join(profiler.summary()))
+    return BuildResult(name, seconds, None, False)
+
+def _run_builds(paths, jobs, stream=False, branding=DEFAULT_BRANDING, profile=None):
+    names = list(paths)
+    if jobs <= 1 or len(names) <= 1:
+        return [_timed_build(name, paths[name], stream, branding, profile) for name in names]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [(name, pool.submit(_timed_build, name, paths[name], stream, branding, profile))
+                   for name in names]
+        for name, future in futures:
+            # A worker that dies outright (e.g. killed by the OS) never gets to
+            # report its own traceback, so record the pool error against it
+            try:
+                results.append(future.result())
+            except Exception:
+                results.append(BuildResult(name, 0.0, traceback.format_exc(), False))
+    return results
+
+def build_guides(names=None, jobs=None, use_cache=True, stream=False, branding=DEFAULT_BRANDING,
+                 output_dir=None, profile=None):
+    """Build the selected guides into output_dir, skipping any whose content hash is already cached
+
+    Stale guides are built one worker process per guide when jobs > 1.
+    The cache manifest is only touched from this process, never from workers.
+    With profile (ProfileOptions) every guide is laid out and profiled,
+    cached or not.
+    """
+    if profile is not None:
+        use_cache = False
+    names = list(names or list_guides())
+    if jobs is None:
+        jobs = min(len(names), os.cpu_count() or 1)
+    paths = {name: guide_path(name, branding, output_dir) for name in names}
+
+    results = {}
+    keys = {}
+    cache = GuideCache() if use_cache else None
+    if cache is not None:
+        for name in names:
+            start = time.perf_counter()
+            keys[name] = guide_cache_key(name, branding)
+            if cache.restore(keys[name], paths[name]):
+                results[name] = BuildResult(name, time.perf_counter() - start, None, True)
+                print(f"Cached: {paths[name]}")
+
+    stale = {name: paths[name] for name in names if name not in results}
+    for result in _run_builds(stale, jobs, stream, branding, profile):
+        results[result.name] = result
+        if cache is not None and result.error is None:
+            cache.store(keys[result.name], result.name, branding.name, paths[result.name])
+
+    if cache is not None:
+        cache.evict()
+        cache.save()
+    return [results[name] for name in names]
+
+def report_builds(results, wall_time):
+    """Print per-guide timings and failures; return the number of failures"""
+    failures = 0
+    width = max([10] + [len(result.name) for result in results])
+    print("\nBuild summary:")
+    for name, seconds, error, cached in results:
+        status = "FAILED" if error is not None else "cached" if cached else "ok"
+        print(f"  {name:<{width}} {seconds:7.2f}s  {status}")
+        if error is not None:
+            failures += 1
+            print("    " + error.rstrip().replace("\n", "\n    "))
+    print(f"  {'total':<{width}} {wall_time:7.2f}s  (wall clock)")
+    return failures
+
+# ============================================================
+# Command line
+# ============================================================
+
+# Everything below renders nothing unless asked to: list and check run
+# without importing reportlab, and bench and build import it on first use.
+
+COMMANDS = ('build', 'list', 'check', 'bench')
+
+_HEX_COLOUR = re.compile(r'^#[0-9A-Fa-f]{6}$')
+
+def check_guides(names=None, tenants=None):
+    """Compile guides and load tenant brandings without rendering; return a list of problems
+
+    tenants defaults to every branding file in tenants/.
+    """
+    problems = []
+    outputs = {}
+    for name in names or list_guides():
+        try:
+            guide = load_guide(name)
+        except Exception as e:
+            problems.append(f"{name}: {type(e).__name__}: {e}")
+            continue
+        if guide.output in outputs:
+            problems.append(f"{name}: output {guide.output} is also used by {outputs[guide.output]}")
+        outputs[guide.output] = name
+        print(f"ok      {name} ({len(guide.ops)} ops)")
+
+    if tenants is None and os.path.isdir(TENANT_DIR):
+        tenants = sorted(os.path.splitext(f)[0] for f in os.listdir(TENANT_DIR) if f.endswith('.json'))
+    for tenant in tenants or ():
+        try:
+            branding = load_branding(tenant)
+        except Exception as e:
+            problems.append(f"tenant {tenant}: {type(e).__name__}: {e}")
+            continue
+        bad = [name for name, value in branding.colours if not _HEX_COLOUR.match(value)]
+        if bad:
+            problems.append(f"tenant {tenant}: colours are not #RRGGBB: {', '.join(bad)}")
+        font_problems = guide_fonts.check_family(branding.fonts)
+        problems += [f"tenant {tenant}: font {problem}" for problem in font_problems]
+        if not bad and not font_problems:
+            print(f"ok      tenant {branding.name}")
+    return problems
+
+def list_command(args):
+    names = list_guides()
+    width = max([10] + [len(name) for name in names])
+    for name in names:
+        spec = read_guide_spec(name)
+        print(f"{name:<{width}}  {spec['output']:<36}{spec['title']} ({len(spec['sections'])} sections)")
+    return 0
+
+def check_command(args):
+    problems = check_guides(args.guides, args.tenant)
+    for problem in problems:
+        print(f"FAILED  {problem}")
+    if problems:
+        print(f"\n{len(problems)} problem(s) found.")
+        return 1
+    print("\nAll guides check out.")
+    return 0
+
+def build_command(args):
+    branding = load_branding(args.tenant)
+
+    if args.output_dir == '-':
+        if len(args.guides) != 1:
+            args.parser.error("writing to stdout needs exactly one guide")
+        render_guide(args.guides[0], sys.stdout.buffer, args.stream, branding)
+        sys.stdout.buffer.flush()
+        return 0
 
-    story.append(Spacer(1, 0.3*inch))
-    story.append(Paragraph("TIP: For fastest AI responses, use during off-peak hours (early morning or late evening).", styles['TipText']))
-
-    # Build PDF
-    doc.build(story)
-    print("Created: MODUS_Advanced_Guide.pdf")
-
-if __name__ == "__main__":
     print("Creating MODUS User Guides...")
-    create_beginner_guide()
-    create_amateur_guide()
-    create_advanced_guide()
+    start = time.perf_counter()
+    profile = ProfileOptions(args.profile, args.cprofile, args.tracemalloc) if args.profile else None
+    results = build_guides(args.guides, args.jobs, use_cache=not args.no_cache, stream=args.stream,
+                           branding=branding, output_dir=args.output_dir, profile=profile)
+    failures = report_builds(results, time.perf_counter() - start)
+
+    if failures:
+        print(f"\n{failures} guide(s) failed.")
+        return 1
     print("\nAll guides created successfully!")
+    return 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Without a command, `create_guides.py [GUIDE ...] [options]` builds as it always has
+    if not argv or argv[0] not in COMMANDS + ('-h', '--help'):
+        argv = ['build'] + argv
+    if argv[0] == 'bench':
+        import bench_guides
+        return bench_guides.main(argv[1:])
+
+    guide_names = ', '.join(list_guides())
+    parser = argparse.ArgumentParser(description="Create the MODUS user guides")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    build = commands.add_parser('build', help="build guides (the default command)")
+    build.add_argument('guides', nargs='*', metavar='GUIDE',
+                       help=f"guides to build: {guide_names} (default: all)")
+    build.add_argument('-j', '--jobs', type=int, default=None,
+                       help="worker processes (default: one per guide, 1 = build serially)")
+    build.add_argument('--no-cache', action='store_true',
+                       help="rebuild every guide, ignoring and not updating the build cache")
+    build.add_argument('--stream', action='store_true',
+                       help="write pages to disk as they are laid out (flat memory for very long guides)")
+    build.add_argument('--tenant', metavar='NAME',
+                       help="white-label branding from tenants/NAME.json (or a path to a branding file)")
+    build.add_argument('-o', '--output-dir', metavar='DIR', default=None,
+                       help=f"directory to write PDFs to (default: $MODUS_GUIDES_DIR or {OUTPUT_DIR!r}); "
+                            "'-' writes a single guide to stdout")
+    build.add_argument('--profile', metavar='DIR',
+                       help="time every flowable and page, writing <guide>.profile.json and "
+                            "<guide>.folded (flame graph input) to DIR; implies --no-cache")
+    build.add_argument('--cprofile', action='store_true',
+                       help="with --profile, also run cProfile and write <guide>.prof")
+    build.add_argument('--tracemalloc', action='store_true',
+                       help="with --profile, also record peak memory and the top allocation sites")
+    build.set_defaults(run=build_command)
+
+    commands.add_parser('list', help="list the guides and their output files").set_defaults(run=list_command)
+
+    check = commands.add_parser('check', help="compile guides and validate tenant brandings without rendering")
+    check.add_argument('guides', nargs='*', metavar='GUIDE', help=f"guides to check: {guide_names} (default: all)")
+    check.add_argument('--tenant', action='append', metavar='NAME',
+                       help="branding to validate (repeatable; default: every file in tenants/)")
+    check.set_defaults(run=check_command)
+
+    commands.add_parser('bench', help="benchmark guide generation; arguments as for bench_guides.py")
+
+    args = parser.parse_args(argv)
+    args.parser = commands.choices[args.command]
+    unknown = sorted(set(getattr(args, 'guides', [])) - set(list_guides()))
+    if unknown:
+        args.parser.error(f"unknown guide(s): {', '.join(unknown)}")
+    if args.command == 'build' and (args.cprofile or args.tracemalloc) and not args.profile:
+        args.parser.error("--cprofile and --tracemalloc need --profile DIR")
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
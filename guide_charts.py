@@ -0,0 +1,159 @@
+"""
+MODUS Trading Dashboard - Guide Charts
+Candlestick charts with volume bars and indicator overlays, drawn straight
+into the guide PDFs as vector paths with reportlab's canvas
+
+The series arrive already decimated to the chart's resolution (see
+analytics.decimation), so a ten-year daily chart draws a few hundred
+candles, and all candles of one colour go out as a single path.
+
+Usage:
+    python guide_charts.py [years]     # time a synthetic chart of that many years
+"""
+
+import sys
+import time
+
+import numpy as np
+from reportlab.lib.colors import Color
+from reportlab.platypus import Flowable
+
+import guide_fonts
+from analytics.decimation import CANDLE_POINTS, PRICE_GUTTER, chart_data
+
+# The x-axis label band and the title/legend row, in points
+AXIS_HEIGHT = 12
+TITLE_HEIGHT = 14
+
+# Fraction of the plot height given to the volume panel
+VOLUME_SHARE = 0.2
+
+class CandleChart(Flowable):
+    """Candlestick chart with a volume panel and overlay lines, as vector paths"""
+
+    def __init__(self, data, width, height, palette, fonts=None):
+        super().__init__()
+        self.data = data
+        self.width = width
+        self.height = height
+        self.palette = palette
+        self.fonts = fonts or guide_fonts.BASE14_FAMILY
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        data, c, palette = self.data, self.canv, self.palette
+        regular, bold = self.fonts['regular'], self.fonts['bold']
+        if not data.candles:
+            return
+        top = self.height - (TITLE_HEIGHT if data.title or data.overlays else 0)
+        plot_width = self.width - PRICE_GUTTER
+        plot_height = top - AXIS_HEIGHT
+        volume_height = plot_height * VOLUME_SHARE
+        price_bottom = AXIS_HEIGHT + volume_height + 4
+
+        lows = [candle[4] for candle in data.candles] + [v for _, _, pts in data.overlays for _, v in pts]
+        highs = [candle[3] for candle in data.candles] + [v for _, _, pts in data.overlays for _, v in pts]
+        lo, hi = min(lows), max(highs)
+        pad = (hi - lo) * 0.05 or 1
+        lo, hi = lo - pad, hi + pad
+        scale = (top - price_bottom) / (hi - lo)
+        max_volume = max(candle[6] for candle in data.candles) or 1
+        bar_step = plot_width / data.bars
+
+        def x(bar):
+            return (bar + 0.5) * bar_step
+
+        def y(price):
+            return price_bottom + (price - lo) * scale
+
+        c.saveState()
+        grid = palette['SLATE']
+        c.setFont(regular, 7)
+        c.setLineWidth(0.25)
+        c.setStrokeColor(grid)
+        c.setFillColor(grid)
+        for i in range(5):
+            price = lo + (hi - lo) * i / 4
+            c.line(0, y(price), plot_width, y(price))
+            c.drawString(plot_width + 4, y(price) - 2.5, f"{price:,.2f}")
+        for bar, label in data.ticks:
+            c.drawCentredString(min(max(x(bar), 15), plot_width - 15), 2, label)
+        c.setLineWidth(0.5)
+        c.rect(0, AXIS_HEIGHT, plot_width, top - AXIS_HEIGHT, stroke=1, fill=0)
+
+        body = max(0.6, min(CANDLE_POINTS, (data.candles[0][1] - data.candles[0][0] + 1) * bar_step) * 0.7)
+        up = [candle for candle in data.candles if candle[5] >= candle[2]]
+        down = [candle for candle in data.candles if candle[5] < candle[2]]
+        for candles, colour in ((up, palette['EMERALD']), (down, palette['ROSE'])):
+            if not candles:
+                continue
+            wicks, bodies, volumes = c.beginPath(), c.beginPath(), c.beginPath()
+            for first, last, o, h, l, cl, v in candles:
+                cx = (x(first) + x(last)) / 2
+                wicks.moveTo(cx, y(l))
+                wicks.lineTo(cx, y(h))
+                bodies.rect(cx - body / 2, y(min(o, cl)), body, max(abs(y(o) - y(cl)), 0.4))
+                volumes.rect(cx - body / 2, AXIS_HEIGHT, body, v / max_volume * volume_height)
+            c.setStrokeColor(colour)
+            c.setFillColor(colour)
+            c.setLineWidth(0.5)
+            c.drawPath(wicks, stroke=1, fill=0)
+            c.drawPath(bodies, stroke=0, fill=1)
+            c.setFillColor(Color(colour.red, colour.green, colour.blue, alpha=0.45))
+            c.drawPath(volumes, stroke=0, fill=1)
+
+        c.setLineWidth(1)
+        legend = 0
+        if data.title:
+            c.setFillColor(palette['DARK_BG'])
+            c.setFont(bold, 9)
+            c.drawString(0, top + 3, data.title)
+            legend = c.stringWidth(data.title, bold, 9) + 12
+        c.setFont(regular, 8)
+        for label, colour_name, points in data.overlays:
+            colour = palette[colour_name]
+            c.setStrokeColor(colour)
+            if points:
+                line = c.beginPath()
+                line.moveTo(x(points[0][0]), y(points[0][1]))
+                for bar, value in points[1:]:
+                    line.lineTo(x(bar), y(value))
+                c.drawPath(line, stroke=1, fill=0)
+            c.line(legend, top + 6, legend + 10, top + 6)
+            c.setFillColor(colour)
+            c.drawString(legend + 13, top + 3, label)
+            legend += c.stringWidth(label, regular, 8) + 25
+        c.restoreState()
+
+def main(argv=None):
+    import io
+
+    import create_guides as guides
+    from analytics.fixtures import synthetic_bars
+    from analytics.indicators import sma
+
+    argv = sys.argv[1:] if argv is None else argv
+    years = int(argv[0]) if argv else 10
+    end = np.datetime64('2026-01-01')
+    bars = synthetic_bars(['CHART'], str(end - np.timedelta64(365 * years, 'D')), str(end))
+    close = bars.close[0]
+    start = time.perf_counter()
+    data = chart_data(bars.dates, bars.open[0], bars.high[0], bars.low[0], close, bars.volume[0],
+                      [("SMA 50", 'VIOLET', sma(close, 50)), ("SMA 200", 'AMBER', sma(close, 200))],
+                      title=f"CHART daily, {years} years")
+    decimated = time.perf_counter()
+    out = io.BytesIO()
+    chart = CandleChart(data, 7 * 72, 3.5 * 72, guides.DEFAULT_BRANDING.palette,
+                        guides.DEFAULT_BRANDING.font_names)
+    guides.guide_document(out).build([chart])
+    done = time.perf_counter()
+    print(f"{len(close)} bars -> {len(data.candles)} candles, "
+          f"{sum(len(p) for _, _, p in data.overlays)} overlay points")
+    print(f"decimate {(decimated - start) * 1000:.1f}ms, draw and save {(done - decimated) * 1000:.1f}ms, "
+          f"{len(out.getvalue()) / 1024:.1f} KB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
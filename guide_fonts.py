@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Guide Fonts
+TrueType font families for branded and non-Latin guides, registered with
+reportlab once per process and embedded as per-document subsets
+
+Guides default to the base-14 Helvetica family, which every PDF viewer
+supplies, so nothing is embedded. A tenant can name .ttf files for the
+regular, bold, italic and boldItalic roles instead ("fonts" in its
+branding file). reportlab embeds a TrueType font as subsets holding only
+the glyphs a document draws, so a guide grows by the glyphs it uses, not
+by the font file.
+
+What is left per process is parsing. Reading the cmap, hmtx and glyph
+offset tables of a font with thousands of glyphs takes much longer than
+unpickling them, so every parsed face is kept under FONT_CACHE_DIR, keyed
+by the file's path, size and mtime and the reportlab version. Unpickling
+runs code, so the cache is per user: only files owned by the current user
+and writable by nobody else are loaded. A cached font is only used when it
+has exactly the attributes a freshly parsed one had; otherwise the font is
+parsed again.
+
+Usage:
+    python guide_fonts.py FONT.ttf [...]     # parse vs. cached load time of each font
+"""
+
+import functools
+import hashlib
+import operator
+import os
+import pickle
+import sys
+import time
+from types import MappingProxyType
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Relative .ttf paths in branding files are looked up here
+FONT_DIR = os.path.join(ROOT, 'fonts')
+# Parsed fonts are pickles, so they live in the user's own cache directory
+FONT_CACHE_DIR = os.environ.get('MODUS_FONT_CACHE', os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'modus-guides', 'fonts'))
+FONT_CACHE_FORMAT = 2
+
+FONT_ROLES = ('regular', 'bold', 'italic', 'boldItalic')
+BASE14_FAMILY = {
+    'regular': 'Helvetica',
+    'bold': 'Helvetica-Bold',
+    'italic': 'Helvetica-Oblique',
+    'boldItalic': 'Helvetica-BoldOblique',
+}
+BASE14_FONTS = (
+    'Courier', 'Courier-Bold', 'Courier-BoldOblique', 'Courier-Oblique',
+    'Helvetica', 'Helvetica-Bold', 'Helvetica-BoldOblique', 'Helvetica-Oblique',
+    'Times-Roman', 'Times-Bold', 'Times-BoldItalic', 'Times-Italic', 'Symbol', 'ZapfDingbats',
+)
+# A role a tenant leaves out borrows the font of another role
+ROLE_FALLBACK = {'bold': 'regular', 'italic': 'regular', 'boldItalic': 'bold'}
+
+# sfnt versions of TrueType-outline fonts; CFF (OTTO) fonts are not supported by reportlab
+TRUETYPE_MAGIC = (b'\x00\x01\x00\x00', b'true')
+
+# Section 1: Families
+
+def is_ttf(value):
+    return value.lower().endswith('.ttf')
+
+def font_path(value):
+    """Absolute path of a .ttf font value; relative paths are under FONT_DIR"""
+    return value if os.path.isabs(value) else os.path.join(FONT_DIR, value)
+
+def font_family(spec=None):
+    """Complete role -> font mapping from a branding's "fonts" (role -> base-14 name or .ttf path)
+
+    Without any fonts this is the Helvetica family; otherwise a role left
+    out falls back as in ROLE_FALLBACK.
+    """
+    spec = spec or {}
+    unknown = set(spec) - set(FONT_ROLES)
+    if unknown:
+        raise ValueError(f"unknown font role(s) in branding: {', '.join(sorted(unknown))}")
+    if not spec:
+        return dict(BASE14_FAMILY)
+    family = {}
+    for role in FONT_ROLES:
+        family[role] = spec.get(role) or family.get(ROLE_FALLBACK.get(role)) or BASE14_FAMILY[role]
+    return family
+
+def check_family(fonts):
+    """Problems with a branding's fonts, found without loading reportlab"""
+    problems = []
+    for role, value in fonts:
+        if not is_ttf(value):
+            if value not in BASE14_FONTS:
+                problems.append(f"{role}: {value} is neither a base-14 font nor a .ttf file")
+            continue
+        try:
+            with open(font_path(value), 'rb') as f:
+                magic = f.read(4)
+        except OSError as e:
+            problems.append(f"{role}: {e.strerror}: {font_path(value)}")
+            continue
+        if magic not in TRUETYPE_MAGIC:
+            problems.append(f"{role}: {value} is not a TrueType-outline font")
+    return problems
+
+def font_signature(fonts):
+    """Size and mtime of every .ttf in fonts, so the build cache notices a replaced font file"""
+    signature = []
+    for role, value in fonts:
+        if is_ttf(value):
+            stat = os.stat(font_path(value))
+            signature.append((role, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+# Section 2: Parsed font cache
+
+def _pdf_scale(units_per_em):
+    # Font units -> PDF glyph space, as TTFontFile.extractInfo builds it
+    if units_per_em == 1000:
+        return lambda x: x
+    return functools.partial(operator.mul, 1000 / units_per_em)
+
+def _cache_path(path, cache_dir):
+    from reportlab import Version as reportlab_version
+
+    stat = os.stat(path)
+    key = repr((FONT_CACHE_FORMAT, reportlab_version, os.path.abspath(path), stat.st_size, stat.st_mtime_ns))
+    return os.path.join(cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + '.pickle')
+
+def _store_font(font, cached):
+    # Everything but the raw file bytes (re-read on load) and the scale function, plus the
+    # attribute names TTFont.__init__ gave this font so a load can tell when they change
+    face = font.face
+    state = {
+        'face': {k: v for k, v in vars(face).items() if k not in ('_ttf_data', '_pdfScale')},
+        'face_attrs': sorted(vars(face)),
+        'font_attrs': sorted(vars(font)),
+    }
+    os.makedirs(os.path.dirname(cached), mode=0o700, exist_ok=True)
+    tmp_path = f"{cached}.{os.getpid()}.tmp"
+    with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cached)
+
+def _trusted(cached):
+    """Whether a cache file was written by this user and cannot be changed by anyone else"""
+    stat = os.stat(cached)
+    if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+        return False
+    return not stat.st_mode & 0o022
+
+def _load_font(name, path, cached):
+    from reportlab.pdfbase.ttfonts import TTFontFace
+
+    if not _trusted(cached):
+        raise PermissionError(f"untrusted font cache file {cached}")
+    with open(cached, 'rb') as f:
+        state = pickle.load(f)
+    face = TTFontFace.__new__(TTFontFace)
+    vars(face).update(state['face'])
+    with open(path, 'rb') as f:
+        face._ttf_data = f.read()
+    face._pdfScale = _pdf_scale(face.unitsPerEm)
+    font = _font_from_face(name, face)
+    if sorted(vars(face)) != state['face_attrs'] or sorted(vars(font)) != state['font_attrs']:
+        raise ValueError(f"cached font {cached} does not match what this reportlab builds")
+    return font
+
+def _font_from_face(name, face):
+    """A TTFont around an already parsed face: TTFont.__init__ minus the parsing"""
+    from fnmatch import fnmatch
+    from weakref import WeakKeyDictionary
+
+    from reportlab import rl_config
+    from reportlab.pdfbase.ttfonts import TTEncoding, TTFont, unShapedFontGlob
+
+    font = TTFont.__new__(TTFont)
+    font.fontName = name
+    font.face = face
+    font.encoding = TTEncoding()
+    font.state = WeakKeyDictionary()
+    font._asciiReadable = rl_config.ttfAsciiReadable
+    font.shapable = not any(fnmatch(name, glob) for glob in unShapedFontGlob)
+    return font
+
+def load_font(name, path, cache_dir=FONT_CACHE_DIR):
+    """TTFont for a .ttf file, from the parsed font cache when it has this file"""
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    cached = _cache_path(path, cache_dir)
+    if os.path.exists(cached):
+        try:
+            return _load_font(name, path, cached)
+        except Exception:
+            # Unreadable, foreign or stale: parse the font and replace the entry
+            pass
+    font = TTFont(name, path)
+    try:
+        _store_font(font, cached)
+    except OSError:
+        pass
+    return font
+
+# Section 3: Registration
+
+@functools.lru_cache(maxsize=None)
+def register_font(value):
+    """Register a .ttf font with reportlab, once per process; return its font name
+
+    Base-14 names are returned as they are.
+    """
+    if not is_ttf(value):
+        return value
+    from reportlab.pdfbase import pdfmetrics
+
+    path = font_path(value)
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name in pdfmetrics.getRegisteredFontNames():
+        if os.path.abspath(pdfmetrics.getFont(name).face.filename) != os.path.abspath(path):
+            raise ValueError(f"font name {name} is already registered for another file than {path}")
+        return name
+    pdfmetrics.registerFont(load_font(name, path))
+    return name
+
+@functools.lru_cache(maxsize=None)
+def register_family(fonts):
+    """Register a branding's fonts, once per process; return a read-only role -> font name mapping
+
+    When the regular font is a .ttf the four are also registered as a family,
+    so <b> and <i> in paragraph text pick the tenant's bold and italic.
+    """
+    family = dict(fonts)
+    names = {role: register_font(family[role]) for role in FONT_ROLES}
+    if is_ttf(family['regular']):
+        from reportlab.pdfbase import pdfmetrics
+
+        pdfmetrics.registerFontFamily(names['regular'], normal=names['regular'], bold=names['bold'],
+                                      italic=names['italic'], boldItalic=names['boldItalic'])
+    return MappingProxyType(names)
+
+def main(argv=None):
+    import shutil
+    import tempfile
+
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 2
+    cache_dir = tempfile.mkdtemp(prefix='modus-fonts-')
+    try:
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            start = time.perf_counter()
+            font = load_font(name, path, cache_dir)
+            parsed = time.perf_counter()
+            load_font(name, path, cache_dir)
+            loaded = time.perf_counter()
+            print(f"{name}: {font.face.numGlyphs:,} glyphs, {len(font.face.charToGlyph):,} characters, "
+                  f"parse {(parsed - start) * 1000:.1f}ms, cached {(loaded - parsed) * 1000:.1f}ms")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
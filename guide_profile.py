@@ -0,0 +1,239 @@
+"""
+MODUS Trading Dashboard - Guide Build Profiling
+Opt-in timing of a guide's doc.build: how long every flowable spends in
+wrap, split and draw, how long each page takes to lay out, and how many
+flowables of each kind the guide has
+
+Each flowable is instrumented on the instance (its wrap, split and drawOn
+are replaced by timing wrappers), and pieces a flowable splits into are
+instrumented in turn and charged to the original, so a table broken over
+three pages shows up as one entry. Pages are timed from the document's
+afterPage hook. Optionally the whole build also runs under cProfile and/or
+tracemalloc.
+
+Results are written as <guide>.profile.json and <guide>.folded, the
+collapsed-stack format flamegraph.pl and speedscope read (one
+"guide;page N;flowable;phase microseconds" line per stack).
+
+Usage:
+    python create_guides.py --profile profiles/ amateur
+    python create_guides.py --profile profiles/ --cprofile --tracemalloc
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+# Flowables taking longer than this in total are listed as slow
+SLOW_FLOWABLE_SECONDS = 0.02
+SLOWEST_COUNT = 10
+# Frames of allocation / function statistics kept from tracemalloc and cProfile
+TOP_COUNT = 20
+
+_TAGS = re.compile(r'<[^>]+>')
+
+def describe(flowable):
+    """Short human-readable label for a flowable"""
+    kind = type(flowable).__name__
+    if hasattr(flowable, '_nrows'):
+        return f"{kind} {flowable._nrows}x{flowable._ncols}"
+    text = getattr(flowable, 'text', None)
+    if isinstance(text, str):
+        text = ' '.join(_TAGS.sub('', text).split())
+        return f"{kind} {flowable.style.name}: {text[:40]}{'...' if len(text) > 40 else ''}"
+    if kind == 'Spacer':
+        return f"Spacer {flowable.height:g}pt"
+    return kind
+
+class FlowableRecord:
+    """Timings of one story flowable, including any pieces it was split into"""
+
+    __slots__ = ('index', 'kind', 'label', 'seconds', 'calls')
+
+    def __init__(self, index, flowable):
+        self.index = index
+        self.kind = type(flowable).__name__
+        self.label = describe(flowable)
+        self.seconds = Counter()   # (page, phase) -> seconds
+        self.calls = Counter()     # phase -> calls
+
+    @property
+    def total(self):
+        return sum(self.seconds.values())
+
+    def phase(self, name):
+        return sum(s for (_, phase), s in self.seconds.items() if phase == name)
+
+    def to_dict(self):
+        return {
+            'index': self.index,
+            'kind': self.kind,
+            'label': self.label,
+            'seconds': round(self.total, 6),
+            'wrap': round(self.phase('wrap'), 6),
+            'split': round(self.phase('split'), 6),
+            'draw': round(self.phase('draw'), 6),
+            'calls': dict(self.calls),
+            'pages': sorted({page for page, _ in self.seconds}),
+        }
+
+class BuildProfiler:
+    """Collects the timings of one guide build; see render_guide(profiler=...)"""
+
+    def __init__(self, name, cprofile=False, memory=False):
+        self.name = name
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.memory = memory
+        self.records = []
+        self.pages = []
+        self.story_seconds = 0.0
+        self.build_seconds = 0.0
+        self.peak_memory = None
+        self.allocations = []
+        self._doc = None
+        self._page_start = None
+
+    # Instrumentation
+
+    def _page(self):
+        return getattr(self._doc, 'page', 0)
+
+    def _timed(self, record, phase, method, after=None):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            record.seconds[self._page(), phase] += time.perf_counter() - start
+            record.calls[phase] += 1
+            return after(result) if after else result
+        return timed
+
+    def _attach(self, flowable, record):
+        flowable.wrap = self._timed(record, 'wrap', flowable.wrap)
+        flowable.drawOn = self._timed(record, 'draw', flowable.drawOn)
+        flowable.split = self._timed(record, 'split', flowable.split,
+                                     lambda pieces: [self._attach(p, record) for p in pieces])
+        return flowable
+
+    def instrument(self, flowables):
+        """Yield flowables with their wrap, split and draw timed"""
+        start = time.perf_counter()
+        for i, flowable in enumerate(flowables):
+            self.story_seconds += time.perf_counter() - start
+            record = FlowableRecord(i, flowable)
+            self.records.append(record)
+            yield self._attach(flowable, record)
+            start = time.perf_counter()
+
+    def attach(self, doc):
+        """Time every page of doc through its afterPage hook"""
+        self._doc = doc
+        after_page = doc.afterPage
+
+        def timed_after_page():
+            after_page()
+            now = time.perf_counter()
+            self.pages.append((doc.page, now - self._page_start))
+            self._page_start = now
+        doc.afterPage = timed_after_page
+
+    @contextmanager
+    def running(self):
+        """Wrap doc.build: starts the page clock and any cProfile / tracemalloc capture"""
+        if self.memory:
+            tracemalloc.start()
+        if self.cprofile:
+            self.cprofile.enable()
+        start = self._page_start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.build_seconds = time.perf_counter() - start
+            if self.cprofile:
+                self.cprofile.disable()
+            if self.memory:
+                snapshot = tracemalloc.take_snapshot()
+                self.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.allocations = [
+                    {'where': str(stat.traceback[0]), 'bytes': stat.size, 'blocks': stat.count}
+                    for stat in snapshot.statistics('lineno')[:TOP_COUNT]
+                ]
+
+    # Results
+
+    def slowest(self, count=SLOWEST_COUNT):
+        return sorted(self.records, key=lambda r: r.total, reverse=True)[:count]
+
+    def report(self):
+        """Everything collected, as a JSON-serialisable dict"""
+        report = {
+            'guide': self.name,
+            'build_seconds': round(self.build_seconds, 6),
+            'story_seconds': round(self.story_seconds, 6),
+            'counts': dict(Counter(r.kind for r in self.records).most_common()),
+            'pages': [{'page': page, 'seconds': round(seconds, 6)} for page, seconds in self.pages],
+            'slow': [r.to_dict() for r in self.records if r.total >= SLOW_FLOWABLE_SECONDS],
+            'slowest': [r.to_dict() for r in self.slowest()],
+            'flowables': [r.to_dict() for r in self.records],
+        }
+        if self.cprofile:
+            stats = pstats.Stats(self.cprofile)
+            functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_COUNT]
+            report['functions'] = [
+                {'function': f"{os.path.basename(path)}:{line}({func})", 'calls': calls,
+                 'self_seconds': round(own, 6), 'cumulative_seconds': round(cumulative, 6)}
+                for (path, line, func), (_, calls, own, cumulative, _) in functions
+            ]
+        if self.memory:
+            report['memory'] = {'peak_bytes': self.peak_memory, 'top_allocations': self.allocations}
+        return report
+
+    def folded(self):
+        """Collapsed stacks in microseconds: guide;page N;flowable;phase value"""
+        def frame(text):
+            return text.replace(';', ',').replace('\n', ' ')
+
+        lines = []
+        charged = Counter()
+        for r in self.records:
+            for (page, phase), seconds in sorted(r.seconds.items()):
+                charged[page] += seconds
+                micros = round(seconds * 1e6)
+                if micros:
+                    lines.append(f"{frame(self.name)};page {page};{frame(f'#{r.index} {r.label}')};{phase} {micros}")
+        # Page time not spent inside a flowable: frame handling, page templates, canvas output
+        for page, seconds in self.pages:
+            micros = round((seconds - charged[page]) * 1e6)
+            if micros > 0:
+                lines.append(f"{frame(self.name)};page {page};(layout) {micros}")
+        return lines
+
+    def write(self, directory):
+        """Write <guide>.profile.json, <guide>.folded and (with cProfile) <guide>.prof; return the paths"""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.name)
+        with open(f"{base}.profile.json", 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(f"{base}.folded", 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.folded()) + '\n')
+        paths = [f"{base}.profile.json", f"{base}.folded"]
+        if self.cprofile:
+            self.cprofile.dump_stats(f"{base}.prof")
+            paths.append(f"{base}.prof")
+        return paths
+
+    def summary(self, count=3):
+        """A few lines for the console: totals, counts and the slowest flowables"""
+        counts = ', '.join(f"{n} {kind}" for kind, n in Counter(r.kind for r in self.records).most_common())
+        lines = [f"{self.name}: {len(self.pages)} pages in {self.build_seconds:.3f}s ({counts})"]
+        for r in self.slowest(count):
+            lines.append(f"  {r.total * 1000:8.1f}ms  #{r.index} {r.label}")
+        if self.peak_memory is not None:
+            lines.append(f"  peak traced memory {self.peak_memory / 1024 / 1024:.1f} MB")
+        return lines
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Guide Render Service
+Long-lived renderer for white-labelled guides. A pool of worker processes
+keeps reportlab, font metrics, styles and compiled guide content warm, and
+finished PDFs are held in an in-memory LRU keyed by the build cache key, so
+repeat jobs for a known tenant return without laying anything out
+
+A job is a JSON object:
+
+    {"id": "acme-1", "guide": "beginner", "tenant": "acme"}
+
+"tenant" is optional: the name of a tenants/<name>.json file (letters,
+digits, "_" and "-" only) or an inline branding object such as
+{"name": "acme", "colours": {"VIOLET": "#0EA5E9"}}, whose .ttf fonts must
+be under fonts/. The PDF is always returned in the response, never written
+to a path the client names.
+
+Usage:
+    python guide_service.py                # JSON lines on stdin: one job or a list of jobs per line
+    python guide_service.py --http 8765    # POST /render with a job or a list of jobs
+                                           # GET /guides/<guide>.pdf?tenant=<name> returns the PDF
+"""
+
+import argparse
+import base64
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import create_guides as guides
+import guide_fonts
+
+# Upper bound on the rendered PDFs kept in memory by the service
+CACHE_BYTES = 256 * 2**20
+# Jobs may only name tenant files under TENANT_DIR, not arbitrary paths
+TENANT_NAME = re.compile(r'[A-Za-z0-9_-]+')
+
+def _warm_worker(names):
+    """Pool initializer: render each guide once so imports, fonts and styles are loaded"""
+    for name in names:
+        guides.render_guide(name)
+
+def _render_job(name, branding):
+    start = time.perf_counter()
+    pdf = guides.render_guide(name, branding=branding)
+    return pdf, time.perf_counter() - start
+
+def _check_inline_fonts(fonts):
+    """Reject .ttf fonts of an inline branding that are not under FONT_DIR"""
+    if not fonts:
+        return
+    if not isinstance(fonts, dict):
+        raise ValueError("branding fonts must map roles to fonts")
+    root = os.path.realpath(guide_fonts.FONT_DIR)
+    for role, value in fonts.items():
+        if not isinstance(value, str):
+            raise ValueError(f"font for {role!r} must be a string")
+        if guide_fonts.is_ttf(value):
+            path = os.path.realpath(guide_fonts.font_path(value))
+            if os.path.commonpath([root, path]) != root:
+                raise ValueError(f"font {value!r} is not under {guide_fonts.FONT_DIR}")
+
+class PDFCache:
+    """Least-recently-used PDFs by cache key, bounded by total size"""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+            return pdf
+
+    def put(self, key, pdf):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = pdf
+            self.size += len(pdf)
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+class RenderService:
+    """Renders batches of guide jobs on a pool of warm worker processes"""
+
+    def __init__(self, workers=None, cache_bytes=CACHE_BYTES):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = PDFCache(cache_bytes)
+        self._tenants = {}
+        self._tenant_lock = threading.Lock()
+        names = tuple(guides.list_guides())
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_warm_worker, initargs=(names,))
+        # Workers start lazily; make every one of them start and warm up now
+        # so the first real jobs do not pay for it
+        for future in [self.pool.submit(time.sleep, 0.05) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        self.pool.shutdown()
+
+    def branding(self, tenant):
+        """Branding for a job's tenant, re-reading tenant files only when they change"""
+        if tenant is None:
+            return guides.DEFAULT_BRANDING
+        if isinstance(tenant, dict):
+            _check_inline_fonts(tenant.get('fonts'))
+            return guides.load_branding(tenant)
+        if not isinstance(tenant, str) or not TENANT_NAME.fullmatch(tenant):
+            raise ValueError(f"invalid tenant name {tenant!r}")
+        path = os.path.join(guides.TENANT_DIR, f"{tenant}.json")
+        mtime = os.stat(path).st_mtime_ns
+        with self._tenant_lock:
+            cached = self._tenants.get(path)
+            if cached is None or cached[0] != mtime:
+                cached = self._tenants[path] = (mtime, guides.load_branding(path))
+            return cached[1]
+
+    def render_batch(self, jobs):
+        """Render a list of jobs concurrently, returning one response per job in order"""
+        received = time.perf_counter()
+        responses = [None] * len(jobs)
+        pending = []
+        for i, job in enumerate(jobs):
+            try:
+                name = job['guide']
+                if 'output' in job:
+                    raise ValueError("jobs cannot set 'output'; the PDF is returned in the response")
+                if name not in guides.list_guides():
+                    raise ValueError(f"unknown guide {name!r}")
+                branding = self.branding(job.get('tenant'))
+                key = guides.guide_cache_key(name, branding)
+                pdf = self.cache.get(key)
+                if pdf is not None:
+                    responses[i] = self._respond(job, branding, pdf, True, received, 0.0)
+                else:
+                    pending.append((i, job, branding, key, self.pool.submit(_render_job, name, branding)))
+            except Exception as exc:
+                responses[i] = self._fail(job, exc, received)
+
+        for i, job, branding, key, future in pending:
+            try:
+                pdf, render_seconds = future.result()
+                self.cache.put(key, pdf)
+                responses[i] = self._respond(job, branding, pdf, False, received, render_seconds)
+            except Exception as exc:
+                responses[i] = self._fail(job, exc, received)
+        return responses
+
+    def _respond(self, job, branding, pdf, cached, received, render_seconds):
+        response = {
+            'id': job.get('id'),
+            'guide': job['guide'],
+            'tenant': branding.name,
+            'ok': True,
+            'cached': cached,
+            'bytes': len(pdf),
+            'pdf': base64.b64encode(pdf).decode('ascii'),
+        }
+        latency = time.perf_counter() - received
+        response['render_ms'] = round(render_seconds * 1000, 2)
+        response['queue_ms'] = round((latency - render_seconds) * 1000, 2)
+        response['latency_ms'] = round(latency * 1000, 2)
+        return response
+
+    def _fail(self, job, exc, received):
+        return {
+            'id': job.get('id') if isinstance(job, dict) else None,
+            'ok': False,
+            'error': f"{type(exc).__name__}: {exc}",
+            'latency_ms': round((time.perf_counter() - received) * 1000, 2),
+        }
+
+def serve_stdin(service, infile=sys.stdin, outfile=sys.stdout):
+    """Answer one line of JSON per line of input: a job or a list of jobs"""
+    for line in infile:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            response = {'ok': False, 'error': f"invalid JSON: {exc}"}
+        else:
+            batch = request if isinstance(request, list) else [request]
+            responses = service.render_batch(batch)
+            response = responses if isinstance(request, list) else responses[0]
+        outfile.write(json.dumps(response) + '\n')
+        outfile.flush()
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type='application/json', headers=()):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status, payload):
+            self._send(status, json.dumps(payload).encode('utf-8'))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/health':
+                self._send_json(200, {'ok': True, 'workers': service.workers, 'guides': guides.list_guides()})
+                return
+            if url.path.startswith('/guides/') and url.path.endswith('.pdf'):
+                job = {'guide': url.path[len('/guides/'):-len('.pdf')]}
+                tenant = parse_qs(url.query).get('tenant')
+                if tenant:
+                    job['tenant'] = tenant[0]
+                response = service.render_batch([job])[0]
+                if not response['ok']:
+                    self._send_json(400, response)
+                    return
+                self._send(200, base64.b64decode(response['pdf']), 'application/pdf', [
+                    ('X-Render-Ms', str(response['render_ms'])),
+                    ('X-Latency-Ms', str(response['latency_ms'])),
+                    ('X-Cache', 'hit' if response['cached'] else 'miss'),
+                ])
+                return
+            self._send_json(404, {'ok': False, 'error': 'not found'})
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/render':
+                self._send_json(404, {'ok': False, 'error': 'not found'})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            except ValueError as exc:
+                self._send_json(400, {'ok': False, 'error': f"invalid JSON: {exc}"})
+                return
+            batch = request if isinstance(request, list) else [request]
+            responses = service.render_batch(batch)
+            self._send_json(200, responses if isinstance(request, list) else responses[0])
+
+        def log_message(self, format, *args):
+            sys.stderr.write("%s - %s\n" % (self.address_string(), format % args))
+
+    return Handler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve MODUS guide renders from a warm worker pool")
+    parser.add_argument('--http', type=int, metavar='PORT', help="serve HTTP on PORT instead of stdin JSON lines")
+    parser.add_argument('--host', default='127.0.0.1', help="HTTP bind address (default: 127.0.0.1)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--cache-mb', type=int, default=CACHE_BYTES // 2**20,
+                        help=f"memory for rendered PDFs (default: {CACHE_BYTES // 2**20})")
+    args = parser.parse_args(argv)
+
+    service = RenderService(args.workers, args.cache_mb * 2**20)
+    try:
+        if args.http is None:
+            serve_stdin(service)
+        else:
+            server = ThreadingHTTPServer((args.host, args.http), make_handler(service))
+            print(f"Serving guides on http://{args.host}:{args.http} with {service.workers} workers", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    finally:
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
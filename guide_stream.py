@@ -0,0 +1,164 @@
+"""
+MODUS Trading Dashboard - Streaming PDF Builds
+Lays out flowables pulled from a generator and writes each finished page
+to the output file immediately, so peak memory stays flat as page count grows
+
+reportlab normally keeps every page object (and its content stream) in the
+PDFDocument until canvas.save(), then formats the whole file at once.
+StreamingPDFDocument instead formats a page and its content stream as soon
+as the canvas finishes it, writes them out, and keeps only their object
+numbers and file offsets. Everything still shared between pages (the page
+tree, fonts, catalog, info) is written by the usual final pass, followed by
+the cross-reference table built from the recorded offsets.
+"""
+
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen import canvas
+
+# How many flowables FlowableStream keeps buffered ahead of layout. This
+# bounds how far doc.build can look ahead, e.g. for keepWithNext chains.
+LOOKAHEAD = 64
+
+class FlowableStream(list):
+    """List of flowables that refills itself from an iterator as doc.build consumes it"""
+
+    def __init__(self, flowables, lookahead=LOOKAHEAD):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+        self._fill()
+
+    def _fill(self):
+        if self._source is None:
+            return
+        while list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+                return
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+class StreamingPDFDocument(pdfdoc.PDFDocument):
+    """PDFDocument that writes each page to out as soon as it is added"""
+
+    def __init__(self, out, **kwargs):
+        super().__init__(**kwargs)
+        self._out = out
+        self._offset = 0
+        self._flushed = set()
+        # The header's version is fixed once written; features that would
+        # raise the minimum PDF version later are not used by the guides
+        self._write(pdfdoc.PDFFile(self._pdfVersion).format(self))
+
+    def _write(self, data):
+        offset = self._offset
+        self._out.write(data)
+        self._offset += len(data)
+        return offset
+
+    def _flush_object(self, oid):
+        obj = self.idToObject[oid]
+        self.idToOffset[oid] = self._write(pdfdoc.PDFIndirectObject(oid, obj).format(self))
+        self._flushed.add(oid)
+        # Keep the name registered but drop the object itself
+        self.idToObject[oid] = None
+
+    def addPage(self, page):
+        name = self.thisPageName()
+        super().addPage(page)
+        last = self.objectcounter
+        self._flush_object(name)
+        # Formatting the page registers its content stream (and, the first
+        # time, the shared page tree); only the page-local streams go out now
+        for number in range(last + 1, self.objectcounter + 1):
+            oid = self.numberToId[number]
+            if isinstance(self.idToObject[oid], pdfdoc.PDFStream):
+                self._flush_object(oid)
+        self.Pages.pages[-1] = pdfdoc.PDFObjectReference(name)
+
+    def format(self):
+        """Write every object not flushed yet, then the xref table and trailer"""
+        self.encrypt.prepare(self)
+        cat = self.Catalog
+        info = self.info
+        self.Reference(cat)
+        self.Reference(info)
+        encryptref = None
+        encryptinfo = self.encrypt.info()
+        if encryptinfo:
+            encryptref = self.Reference(encryptinfo)
+
+        # New objects may still be registered while formatting, so walk the
+        # object numbers until they run out rather than iterating a snapshot
+        ids = []
+        counter = 0
+        while True:
+            counter += 1
+            if counter not in self.numberToId:
+                break
+            oid = self.numberToId[counter]
+            if oid not in self._flushed:
+                self._flush_object(oid)
+            ids.append(oid)
+
+        xref = pdfdoc.PDFCrossReferenceTable()
+        xref.addsection(0, ids)
+        xrefoffset = self._write(xref.format(self))
+        trailer = pdfdoc.PDFTrailer(
+            startxref=xrefoffset,
+            Size=len(ids) + 1,
+            Root=self.Reference(cat),
+            Info=self.Reference(info),
+            Encrypt=encryptref,
+            ID=self.ID(),
+        )
+        self._write(trailer.format(self))
+        return b''
+
+    def SaveToFile(self, filename, canvas):
+        if getattr(self, '_savedToFile', False):
+            raise RuntimeError("class %s instances can only be saved once" % self.__class__.__name__)
+        self._savedToFile = True
+        self.GetPDFData(canvas)
+
+class StreamingCanvas(canvas.Canvas):
+    """Canvas whose pages are written to the output file as they are finished
+
+    filename may be a path or a writable binary file object; a path is
+    opened immediately and closed by save().
+    """
+
+    def __init__(self, filename, pageCompression=None, invariant=None, pdfVersion=None, lang=None, **kwargs):
+        super().__init__(filename, pageCompression=pageCompression, invariant=invariant,
+                         pdfVersion=pdfVersion, lang=lang, **kwargs)
+        if hasattr(filename, 'write'):
+            self._stream_file, self._owns_file = filename, False
+        else:
+            self._stream_file, self._owns_file = open(filename, 'wb'), True
+        self._doc = StreamingPDFDocument(
+            self._stream_file,
+            compression=pageCompression,
+            invariant=self._doc.invariant,
+            pdfVersion=pdfVersion or pdfdoc.PDF_VERSION_DEFAULT,
+            lang=lang,
+        )
+        self.setPageCompression(pageCompression)
+
+    def save(self):
+        try:
+            super().save()
+        finally:
+            if self._owns_file:
+                self._stream_file.close()
+
+def build_streaming(doc, flowables):
+    """Build doc from any iterable of flowables, writing pages as they are laid out"""
+    doc.build(FlowableStream(flowables), canvasmaker=StreamingCanvas)
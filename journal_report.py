@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+MODUS Trading Dashboard - Journal Report
+Printable PDF report of a trading journal (analytics.journal), laid out
+with the guides' cover page, styles and data tables
+
+The summary, strategy, tag and monthly tables come from the journal's
+running statistics and the recent trades table from its last few rows, so
+the report takes about as long for a journal of ten trades as for one of
+hundreds of thousands. --all-trades appends the full trade log, which is
+streamed (see guide_stream): trades are read, laid out and written a page
+at a time, so memory stays flat however long the log is.
+
+Usage:
+    python journal_report.py [JOURNAL] [-o journal_report.pdf] [--all-trades] [--tenant NAME]
+    python journal_report.py --synthetic 300000      # report on seeded synthetic trades
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import create_guides as guides
+from analytics import journal as trading_journal
+
+REPORT_PATH = 'journal_report.pdf'
+RECENT_TRADES = 20
+REPORT_TAGS = 15
+REPORT_MONTHS = 12
+# Trade log rows per table, about a page each
+LOG_ROWS = 32
+
+TRADE_COLUMNS = ("Exit Date", "Symbol", "Side", "Qty", "Entry", "Exit", "P&L", "Strategy")
+TRADE_WIDTHS = (0.95, 0.7, 0.6, 0.6, 0.8, 0.8, 0.95, 1.6)
+BREAKDOWN_COLUMNS = ("Trades", "Win Rate", "Profit Factor", "Expectancy", "Net P&L", "Max Drawdown")
+BREAKDOWN_WIDTHS = (1.3, 0.7, 0.8, 1.0, 0.95, 1.05, 1.2)
+
+# Section 1: Tables
+
+def _ratio(value):
+    # Helvetica has no infinity sign
+    return "No losses" if math.isinf(value) else f"{value:.2f}"
+
+def _streak(streak):
+    if not streak:
+        return "-"
+    if streak > 0:
+        return f"{streak} win" + ("s" if streak > 1 else "")
+    return f"{-streak} loss" + ("es" if streak < -1 else "")
+
+def summary_rows(stats):
+    return (
+        ("Metric", "Value", "Metric", "Value"),
+        ("Closed Trades", f"{stats.trades:,}", "Net P&L", guides._signed_money(stats.net)),
+        ("Win Rate", f"{stats.win_rate:.1%}", "Expectancy", f"{guides._money(stats.expectancy, True)} / trade"),
+        ("Wins / Losses", f"{stats.wins:,} / {stats.losses:,}", "Profit Factor", _ratio(stats.profit_factor)),
+        ("Average Win", guides._money(stats.avg_win, True), "Average Loss", guides._money(stats.avg_loss, True)),
+        ("Best Trade", guides._signed_money(stats.best or 0), "Worst Trade", guides._signed_money(stats.worst or 0)),
+        ("Max Drawdown", guides._money(stats.max_drawdown), "Sharpe Ratio", f"{stats.sharpe:.2f}"),
+        ("Longest Win Streak", f"{stats.longest_win:,}", "Longest Loss Streak", f"{stats.longest_loss:,}"),
+        ("Current Streak", _streak(stats.streak), "Average Hold", f"{stats.avg_hold_days:.1f} days"),
+    )
+
+def breakdown_rows(label, breakdown):
+    rows = [(label,) + BREAKDOWN_COLUMNS]
+    for key, stats in breakdown:
+        rows.append((key, f"{stats.trades:,}", f"{stats.win_rate:.1%}", _ratio(stats.profit_factor),
+                     guides._money(stats.expectancy, True), guides._signed_money(stats.net),
+                     guides._money(stats.max_drawdown)))
+    return tuple(rows)
+
+def trade_rows(trades):
+    rows = [TRADE_COLUMNS]
+    for t in trades:
+        rows.append((t.exit_date or "-", t.symbol, t.side.title(), f"{t.quantity:,g}", guides._money(t.entry, True),
+                     guides._money(t.exit, True), guides._signed_money(t.pnl), t.strategy))
+    return tuple(rows)
+
+# Section 2: Report
+
+def report_ops(journal, title="Trading Journal", recent=RECENT_TRADES, all_trades=False):
+    """Render ops of a journal's report, generated lazily so the trade log is read as it is laid out"""
+    stats = journal.stats()
+    period = f"{stats.first_exit} to {stats.last_exit}" if stats.first_exit else "no closed trades yet"
+    ops = []
+    guides.add_cover_page(ops, title, f"{stats.trades:,} closed trades, {period}", 'VIOLET')
+    yield from ops
+
+    yield ('para', 'SectionHeader', "1. Summary")
+    yield ('table', summary_rows(stats), (1.9, 1.6, 1.9, 1.6))
+    yield ('spacer', 0.1)
+    yield ('para', 'BulletText', "Profit factor is gross profit over gross loss, expectancy the average P&amp;L per "
+                                 "trade and max drawdown the largest fall from a high in cumulative P&amp;L. "
+                                 "Breakeven trades count towards the trade total but are neither wins nor losses; "
+                                 "as in the app, they extend a winning streak.")
+
+    strategies = sorted(journal.breakdown('strategy').items(), key=lambda item: -item[1].trades)
+    yield ('para', 'SectionHeader', "2. By Strategy")
+    yield ('table', breakdown_rows("Strategy", strategies), BREAKDOWN_WIDTHS)
+
+    tags = sorted(journal.breakdown('tag').items(), key=lambda item: -item[1].trades)
+    yield ('para', 'SectionHeader', "3. By Tag")
+    if tags:
+        yield ('table', breakdown_rows("Tag", tags[:REPORT_TAGS]), BREAKDOWN_WIDTHS)
+        yield ('spacer', 0.1)
+        more = f" The {len(tags) - REPORT_TAGS} least used tags are left out." if len(tags) > REPORT_TAGS else ""
+        yield ('para', 'BulletText', f"A trade counts towards every tag it has.{more}")
+    else:
+        yield ('para', 'CustomBody', "No trades are tagged yet.")
+    yield ('pagebreak',)
+
+    months = list(journal.breakdown('month').items())[-REPORT_MONTHS:]
+    yield ('para', 'SectionHeader', "4. By Month")
+    yield ('table', breakdown_rows("Month", months), BREAKDOWN_WIDTHS)
+    yield ('spacer', 0.1)
+    yield ('para', 'BulletText', f"The last {REPORT_MONTHS} months with closed trades, by exit date. Drawdown is "
+                                 f"within each month.")
+
+    yield ('para', 'SectionHeader', "5. Recent Trades")
+    yield ('table', trade_rows(journal.recent(recent)), TRADE_WIDTHS)
+
+    if all_trades:
+        yield ('pagebreak',)
+        yield ('para', 'SectionHeader', "6. Trade Log")
+        page = []
+        for trade in journal.trades():
+            page.append(trade)
+            if len(page) == LOG_ROWS:
+                yield ('table', trade_rows(page), TRADE_WIDTHS)
+                page = []
+        if page:
+            yield ('table', trade_rows(page), TRADE_WIDTHS)
+
+def render_report(journal, output=REPORT_PATH, title="Trading Journal", all_trades=False,
+                  branding=guides.DEFAULT_BRANDING):
+    """Write a journal's report to output (a path or binary file object) and return output"""
+    if isinstance(output, str):
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    doc = guides.guide_document(output, branding)
+    story = guides.iter_story(report_ops(journal, title, all_trades=all_trades), branding)
+    if all_trades:
+        from guide_stream import build_streaming
+        build_streaming(doc, story)
+    else:
+        doc.build(list(story))
+    return output
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Printable PDF report of a trading journal")
+    parser.add_argument('journal', nargs='?', default=trading_journal.JOURNAL_PATH,
+                        help="journal database (default: %(default)s)")
+    parser.add_argument('-o', '--output', default=REPORT_PATH, help="PDF to write (default: %(default)s)")
+    parser.add_argument('--title', default="Trading Journal")
+    parser.add_argument('--all-trades', action='store_true', help="append the full trade log")
+    parser.add_argument('--tenant', help="white-label branding, as for create_guides.py")
+    parser.add_argument('--synthetic', type=int, metavar='N', help="report on N seeded synthetic trades instead")
+    args = parser.parse_args(argv)
+
+    branding = guides.load_branding(args.tenant)
+    with tempfile.TemporaryDirectory() as directory:
+        if args.synthetic:
+            journal = trading_journal.Journal(os.path.join(directory, 'journal.sqlite'))
+        elif not os.path.isfile(args.journal):
+            parser.error(f"no journal at {args.journal}")
+        else:
+            journal = trading_journal.Journal(args.journal, readonly=True)
+        with journal:
+            if args.synthetic:
+                trades = list(trading_journal.synthetic_trades(args.synthetic))
+                for i in range(0, len(trades), 10000):
+                    journal.add_many(trades[i:i + 10000])
+            start = time.perf_counter()
+            render_report(journal, args.output, args.title, args.all_trades, branding)
+            print(f"Created: {args.output} ({len(journal):,} trades, {time.perf_counter() - start:.2f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from analytics.consensus import Analysis, Reconciler, ResponseCache, StubBackend, parse_analysis, reconcile
+
+
+def _analysis(trend='BULLISH', support=(100.0,), resistance=(110.0,), setup='LONG', confidence=70.0):
+    return Analysis(trend, tuple(support), tuple(resistance), setup, confidence)
+
+
+@pytest.mark.parametrize('quorum', [-1, 4, 10])
+def test_reconcile_rejects_quorum_outside_the_passes(quorum):
+    with pytest.raises(ValueError):
+        reconcile([_analysis()] * 3, quorum)
+
+
+@pytest.mark.parametrize('quorum', [-2, 6])
+def test_reconciler_rejects_quorum_outside_the_passes(quorum):
+    with pytest.raises(ValueError):
+        Reconciler(StubBackend(), passes=5, quorum=quorum)
+
+
+def test_quorum_decides_which_levels_are_kept():
+    analyses = [_analysis(support=(100.0,)), _analysis(support=(100.2,)), _analysis(support=(90.0,))]
+    assert [level.price for level in reconcile(analyses).support] == [100.1]
+    assert [level.price for level in reconcile(analyses, quorum=1).support] == [90.0, 100.1]
+    assert reconcile(analyses, quorum=3).support == ()
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('101.5', (101.5,)),
+    (101.5, (101.5,)),
+    ([103, '101.5'], (101.5, 103.0)),
+    (None, ()),
+    ('', ()),
+])
+def test_lone_levels_are_accepted(value, expected):
+    result = parse_analysis({'trend': 'bullish', 'setup': 'long', 'support': value, 'resistance': value})
+    assert result.support == result.resistance == expected
+
+
+@pytest.mark.parametrize('result', [[1, 2], 3, None, '[{"trend": "BULLISH"}]', '{"trend": "UP", "setup": "LONG"}',
+                                    {'trend': 'BULLISH', 'setup': 'LONG', 'support': {'a': 1}}])
+def test_malformed_pass_results_raise_value_error(result):
+    with pytest.raises(ValueError):
+        parse_analysis(result)
+
+
+class MixedBackend:
+    """Stub passes, except that some pass numbers return something that is not an analysis"""
+    name = 'mixed'
+
+    def __init__(self, bad):
+        self.stub = StubBackend()
+        self.bad = bad
+
+    async def analyze(self, image, prompt, index):
+        if index in self.bad:
+            return self.bad[index]
+        return await self.stub.analyze(image, prompt, index)
+
+
+def test_malformed_passes_are_dropped():
+    reconciler = Reconciler(MixedBackend({1: ['not', 'an', 'object'], 3: None}), passes=5)
+    analyses, _ = asyncio.run(reconciler.analyses(b'chart'))
+    assert len(analyses) == 3
+    assert asyncio.run(reconciler.reconcile(b'chart')).passes == 3
+
+
+def test_too_few_passes_fail_the_reconcile():
+    reconciler = Reconciler(MixedBackend({0: 1, 1: 2, 2: 3}), passes=5)
+    with pytest.raises(RuntimeError):
+        asyncio.run(reconciler.reconcile(b'chart'))
+
+
+@pytest.mark.parametrize('entry', [{}, [], {'stored': 0}, {'analyses': []}, {'stored': 'yesterday', 'analyses': []},
+                                   {'stored': 0, 'analyses': [[1]]}, {'stored': 0, 'analyses': 5}])
+def test_malformed_cache_entries_are_removed(tmp_path, entry):
+    cache = ResponseCache(str(tmp_path), clock=lambda: 10.0)
+    path = tmp_path / 'key.json'
+    path.write_text(json.dumps(entry))
+    assert cache.get('key') is None
+    assert not path.exists()
+
+
+def test_cache_round_trip_and_expiry(tmp_path):
+    now = [0.0]
+    cache = ResponseCache(str(tmp_path), ttl=60, clock=lambda: now[0])
+    analyses = [_analysis(), _analysis('BEARISH', (95.5, 99.0), (), 'SHORT', 40.0)]
+    cache.put('key', analyses)
+    assert cache.get('key') == analyses
+    now[0] = 61.0
+    assert cache.get('key') is None
+    assert not (tmp_path / 'key.json').exists()
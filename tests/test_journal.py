@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+from analytics.journal import SCOPES, Journal, synthetic_trades
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'journal.sqlite')
+
+
+def _all_stats(journal):
+    return {(scope, key): stats for scope in SCOPES for key, stats in journal.breakdown(scope).items()}
+
+
+def test_two_writers_keep_statistics_current(path):
+    trades = list(synthetic_trades(600, seed=3))
+    with Journal(path) as a, Journal(path) as b:
+        for i in range(0, len(trades), 50):
+            writer, reader = (a, b) if i // 50 % 2 == 0 else (b, a)
+            writer.add_many(trades[i:i + 50])
+            for journal in (writer, reader):
+                assert journal.stats().trades == i + 50
+                assert _all_stats(journal) == journal.recompute()
+        assert a.verify() and b.verify()
+        assert a.stats() == b.stats()
+
+
+def test_writer_with_stale_statistics_builds_on_the_other_writers_trades(path):
+    trades = list(synthetic_trades(400, seed=4))
+    with Journal(path) as a, Journal(path) as b:
+        # Neither handle reads between the other's writes, so each writes over statistics it has not loaded
+        for i in range(0, len(trades), 40):
+            (a if i // 40 % 2 == 0 else b).add_many(trades[i:i + 40])
+        assert a.verify() and b.verify()
+        assert a.stats().trades == b.stats().trades == 400
+
+
+def test_duplicate_ids_are_ignored_across_handles(path):
+    trades = list(synthetic_trades(20))
+    with Journal(path) as a, Journal(path) as b:
+        assert len(a.add_many(trades)) == 20
+        assert b.add_many(trades[5:15]) == []
+        assert len(a) == len(b) == 20
+        assert b.verify()
+
+
+def test_repair_rewrites_statistics(path):
+    with Journal(path) as journal:
+        journal.add_many(synthetic_trades(200))
+    db = sqlite3.connect(path)
+    with db:
+        db.execute("UPDATE stats SET trades = trades + 7, equity = equity + 1000 WHERE scope = 'all'")
+        db.execute("DELETE FROM stats WHERE scope = 'tag'")
+        db.execute("INSERT INTO stats (scope, key, trades) VALUES ('strategy', 'Ghost', 3)")
+    db.close()
+
+    with Journal(path) as journal, Journal(path) as other:
+        assert not journal.verify()
+        assert journal.stats().trades == 207
+        journal.repair()
+        assert journal.verify()
+        assert journal.stats().trades == 200
+        assert 'Ghost' not in journal.breakdown('strategy')
+        # The other handle sees the repaired statistics without reopening
+        assert other.verify()
+        assert _all_stats(other) == journal.recompute()
+
+
+def test_readonly_reads_without_writing(path):
+    with Journal(path) as writer:
+        writer.add_many(synthetic_trades(30))
+        with Journal(path, readonly=True) as reader:
+            assert len(reader) == 30
+            writer.add_many(synthetic_trades(10, seed=1))
+            assert len(reader) == 40
+            with pytest.raises(sqlite3.OperationalError):
+                reader.add_many(synthetic_trades(1, seed=2))
+
+
+def test_readonly_does_not_create_a_journal(tmp_path):
+    path = tmp_path / 'missing.sqlite'
+    with pytest.raises(sqlite3.OperationalError):
+        Journal(str(path), readonly=True)
+    assert not path.exists()
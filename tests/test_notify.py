@@ -0,0 +1,140 @@
+import shutil
+import smtplib
+import socketserver
+import ssl
+import subprocess
+import threading
+
+import pytest
+
+from analytics import notify
+from analytics.notify import Alert, NotificationQueue, SMTPPool, SMTPStandIn
+
+
+class RecordingSMTP(socketserver.ThreadingTCPServer):
+    """SMTP server that records the verbs it receives, optionally offering STARTTLS and AUTH"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, tls=None):
+        super().__init__(('127.0.0.1', 0), RecordingHandler)
+        self.tls = tls
+        self.verbs = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class RecordingHandler(socketserver.StreamRequestHandler):
+    def reply(self, text):
+        self.wfile.write(f"{text}\r\n".encode('ascii'))
+        self.wfile.flush()
+
+    def handle(self):
+        server = self.server
+        secure = False
+        self.reply('220 localhost test')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode('ascii').split(' ', 1)[0].strip().upper()
+            server.verbs.append(verb + ('/TLS' if secure else ''))
+            if verb == 'EHLO':
+                extensions = ['250-localhost']
+                if server.tls and not secure:
+                    extensions.append('250-STARTTLS')
+                extensions.append('250 AUTH PLAIN')
+                for extension in extensions:
+                    self.reply(extension)
+            elif verb == 'STARTTLS' and server.tls and not secure:
+                self.reply('220 Ready to start TLS')
+                self.request = server.tls.wrap_socket(self.request, server_side=True)
+                self.rfile = self.request.makefile('rb')
+                self.wfile = self.request.makefile('wb')
+                secure = True
+            elif verb == 'AUTH':
+                self.reply('235 Authentication successful')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+@pytest.fixture
+def certificate(tmp_path):
+    if not shutil.which('openssl'):
+        pytest.skip("openssl is needed to make a test certificate")
+    cert, key = tmp_path / 'cert.pem', tmp_path / 'key.pem'
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=127.0.0.1',
+                    '-addext', 'subjectAltName=IP:127.0.0.1', '-keyout', str(key), '-out', str(cert)],
+                   check=True, capture_output=True)
+    return str(cert), str(key)
+
+
+def test_starttls_is_negotiated_after_ehlo_and_before_login(certificate, monkeypatch):
+    cert, key = certificate
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.load_cert_chain(cert, key)
+    # The pool verifies the server against the default trust store; trust the test certificate instead
+    default_context = ssl.create_default_context
+    monkeypatch.setattr(notify.ssl, 'create_default_context', lambda: default_context(cafile=cert))
+    server = RecordingSMTP(server_context)
+    pool = SMTPPool('127.0.0.1', server.server_address[1], user='alerts', password='secret', timeout=5)
+    try:
+        pool.connection('vtext.com')
+        pool.close()
+    finally:
+        server.close()
+    assert server.verbs[:4] == ['EHLO', 'STARTTLS', 'EHLO/TLS', 'AUTH/TLS']
+
+
+def test_credentials_are_not_sent_without_starttls():
+    server = RecordingSMTP()
+    pool = SMTPPool('127.0.0.1', server.server_address[1], user='alerts', password='secret', timeout=5)
+    try:
+        with pytest.raises(smtplib.SMTPNotSupportedError):
+            pool.connection('vtext.com')
+    finally:
+        server.close()
+    assert 'AUTH' not in server.verbs
+    assert pool.opened == 0
+
+
+def test_plain_connection_without_credentials():
+    with SMTPStandIn() as server:
+        pool = SMTPPool('127.0.0.1', server.port, timeout=5)
+        conn = pool.connection('vtext.com')
+        assert pool.connection('vtext.com') is conn
+        pool.close()
+    assert server.connections == 1
+
+
+def _alert(key, phone='555-010-1234', carrier='verizon', symbol='AAPL'):
+    return Alert(key, phone, carrier, symbol, 'price', f"{symbol} crossed its alert price")
+
+
+def test_invalid_alerts_are_failed_individually():
+    queue = NotificationQueue(':memory:')
+    alerts = [
+        _alert('a1'),
+        _alert('bad-phone', phone='123'),
+        _alert('a2', symbol='MSFT'),
+        _alert('bad-carrier', carrier='pigeon'),
+        _alert('a1'),
+    ]
+    keys = queue.enqueue(alerts)
+    assert len(keys) == 1
+    assert queue.counts() == {'queued': 1, 'failed': 2}
+    assert [m.key for m in queue.due()] == keys
+    assert 'MSFT' in queue.due()[0].body
+    errors = sorted(row[0] for row in queue._db.execute("SELECT error FROM messages WHERE state = 'failed'"))
+    assert errors == ['invalid phone number: 123', 'unsupported carrier: pigeon']
+
+    # Every alert, valid or not, is recorded once; submitting them again adds nothing
+    assert queue.enqueue(alerts) == []
+    assert queue.counts() == {'queued': 1, 'failed': 2}
+    queue.close()